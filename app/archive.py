@@ -0,0 +1,424 @@
+"""
+Time-partitioned prediction log with a cold archive
+
+The predictions table is split into monthly periods. On PostgreSQL these
+are native range partitions (predictions_pYYYYMM, created ahead of time
+by ensure_partitions(), plus a DEFAULT partition as a safety net); on
+other databases (SQLite) a period is the range of created_at served by the
+created_at index.
+
+The retention job (archive_predictions(), scripts/archive_predictions.py)
+moves every period older than PREDICTION_RETENTION_DAYS to a compressed
+columnar file, PREDICTION_ARCHIVE_DIR/predictions-YYYYMM.npz: one
+zlib-compressed array per column, strings dictionary-encoded as in roster
+snapshots (app.snapshot), and a JSON header with the period, id and
+timestamp ranges. The partition is then dropped (a single range DELETE
+without native partitions).
+
+Archived periods are always older than the rows left in the database, so
+listings read the database first and continue into the archive files,
+newest first, skipping files outside the requested time range.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.database import FeatureVector, Prediction, canonical_json, get_predictions, count_predictions
+from app.metrics import metrics
+from app.snapshot import encode_column, decode_column
+from app.tracing import stage
+
+BASE_PATH = Path(__file__).parent.parent
+ARCHIVE_DIR = Path(os.getenv("PREDICTION_ARCHIVE_DIR", str(BASE_PATH / "archive")))
+# Periods whose end is older than this are archived
+RETENTION_DAYS = int(os.getenv("PREDICTION_RETENTION_DAYS", "180"))
+# Monthly partitions created ahead of the current one (PostgreSQL)
+PARTITIONS_AHEAD = int(os.getenv("PREDICTION_PARTITIONS_AHEAD", "2"))
+
+FORMAT_VERSION = 1
+# Decompressed archive files kept in memory for paging
+CACHE_SIZE = 4
+
+# Stored columns; created_at as int64 microseconds since the epoch
+ARCHIVE_COLUMNS = (
+    "id", "employee_id", "input_hash", "input_data", "prediction", "probability",
+    "risk_level", "model_version", "created_at",
+)
+
+
+def period_start(ts: datetime) -> datetime:
+    """First instant of the month containing ts."""
+    return datetime(ts.year, ts.month, 1)
+
+
+def next_period(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"predictions_p{start:%Y%m}"
+
+
+def archive_path(start: datetime, directory: Path = ARCHIVE_DIR) -> Path:
+    return Path(directory) / f"predictions-{start:%Y%m}.npz"
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _micros(values: pd.Series) -> np.ndarray:
+    return values.to_numpy(dtype="datetime64[us]").astype("<i8")
+
+
+def to_micros(ts: datetime) -> int:
+    """Naive UTC timestamp in microseconds since the epoch, the archive's time unit."""
+    return (ts - EPOCH) // timedelta(microseconds=1)
+
+
+def write_archive(frame: pd.DataFrame, start: datetime, directory: Path = ARCHIVE_DIR) -> Path:
+    """
+    Write the predictions of one period (ARCHIVE_COLUMNS) as a compressed
+    columnar file, replacing any previous one (atomic rename).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    frame = frame.sort_values("id")
+    created = _micros(frame["created_at"])
+
+    columns, arrays = [], {}
+    for name in ARCHIVE_COLUMNS:
+        if name == "created_at":
+            entry, values = {"kind": "timestamp"}, created
+        else:
+            entry, values = encode_column(frame[name].reset_index(drop=True))
+        columns.append({"name": name, "dtype": values.dtype.str, **entry})
+        arrays[name] = values
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "period_start": start.isoformat(),
+        "period_end": next_period(start).isoformat(),
+        "archived_at": datetime.utcnow().isoformat(),
+        "n_rows": len(frame),
+        "min_id": int(frame["id"].min()),
+        "max_id": int(frame["id"].max()),
+        "min_created_at": int(created.min()),
+        "max_created_at": int(created.max()),
+        "columns": columns,
+    }
+    header_bytes = np.frombuffer(json.dumps(header, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+    path = archive_path(start, directory)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, header=header_bytes, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_archive_header(path: Path) -> Dict[str, Any]:
+    """JSON header of an archive file (the columns are not decompressed)."""
+    with np.load(path, allow_pickle=False) as npz:
+        header = json.loads(npz["header"].tobytes().decode("utf-8"))
+    if header["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive version {header['format_version']} (expected {FORMAT_VERSION})")
+    return header
+
+
+def load_archive(path: Path) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Decompress an archive file.
+
+    Returns:
+        (DataFrame of ARCHIVE_COLUMNS, created_at as int64 microseconds; header)
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        header = json.loads(npz["header"].tobytes().decode("utf-8"))
+        columns = {entry["name"]: decode_column(entry, npz[entry["name"]]) for entry in header["columns"]}
+    return pd.DataFrame(columns), header
+
+
+def _optional(value):
+    """None for missing values (NaN employee ids, NaN category codes)."""
+    return None if pd.isna(value) else value
+
+
+def archived_row(frame: pd.DataFrame, i: int) -> Dict[str, Any]:
+    """Listing entry of row i of an archive frame (same fields as database rows)."""
+    employee_id = _optional(frame["employee_id"].iat[i])
+    created_at = EPOCH + timedelta(microseconds=int(frame["created_at"].iat[i]))
+    return {
+        "id": int(frame["id"].iat[i]),
+        "employee_id": int(employee_id) if employee_id is not None else None,
+        "prediction": int(frame["prediction"].iat[i]),
+        "probability": float(frame["probability"].iat[i]),
+        "risk_level": _optional(frame["risk_level"].iat[i]),
+        "model_version": _optional(frame["model_version"].iat[i]),
+        "created_at": created_at.isoformat(),
+        "archived": True,
+    }
+
+
+def overlaps(header: Dict[str, Any], start: Optional[datetime], end: Optional[datetime]) -> bool:
+    """Whether an archive file may hold rows created in [start, end)."""
+    return (start is None or header["max_created_at"] >= to_micros(start)) and \
+        (end is None or header["min_created_at"] < to_micros(end))
+
+
+def select_rows(frame: pd.DataFrame, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                risk_level: Optional[str] = None, employee_id: Optional[int] = None) -> np.ndarray:
+    """Positions (by id) of archived rows created in [start, end) matching the filters."""
+    created = frame["created_at"].to_numpy()
+    mask = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        mask &= created >= to_micros(start)
+    if end is not None:
+        mask &= created < to_micros(end)
+    if risk_level is not None:
+        mask &= (frame["risk_level"] == risk_level).to_numpy()
+    if employee_id is not None:
+        mask &= (frame["employee_id"] == employee_id).to_numpy()
+    return np.flatnonzero(mask)
+
+
+class PredictionArchive:
+    """Read side of the archive directory, shared across requests."""
+
+    def __init__(self, directory: Path = ARCHIVE_DIR, cache_size: int = CACHE_SIZE):
+        self.directory = Path(directory)
+        self.cache_size = cache_size
+        self._headers: Dict[Path, Tuple[float, Dict[str, Any]]] = {}
+        self._frames: "OrderedDict[Tuple[Path, float], pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def files(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        """Archive files and their headers, newest period first."""
+        files = []
+        with self._lock:
+            for path in sorted(self.directory.glob("predictions-*.npz"), reverse=True):
+                mtime = path.stat().st_mtime
+                cached = self._headers.get(path)
+                if cached is None or cached[0] != mtime:
+                    cached = self._headers[path] = (mtime, read_archive_header(path))
+                files.append((path, cached[1]))
+        return files
+
+    def boundary(self) -> Optional[datetime]:
+        """End of the newest archived period: database rows are at or after it."""
+        files = self.files()
+        return datetime.fromisoformat(files[0][1]["period_end"]) if files else None
+
+    def load(self, path: Path) -> pd.DataFrame:
+        """Decompressed archive file (kept in a small LRU cache). Treat as read-only."""
+        key = (path, path.stat().st_mtime)
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+        with stage("archive_load"):
+            frame, _ = load_archive(path)
+        with self._lock:
+            self._frames[key] = frame
+            while len(self._frames) > self.cache_size:
+                self._frames.popitem(last=False)
+        return frame
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Archived predictions in [start, end), newest first, paginated."""
+        rows = []
+        for path, header in self.files():
+            if len(rows) >= limit:
+                break
+            if not overlaps(header, start, end):
+                continue
+            frame = self.load(path)
+            selected = select_rows(frame, start, end)
+            if skip >= len(selected):
+                skip -= len(selected)
+                continue
+            created = frame["created_at"].to_numpy()
+            order = selected[np.lexsort((frame["id"].to_numpy()[selected], created[selected]))[::-1]]
+            page = order[skip:skip + limit - len(rows)]
+            skip = 0
+            rows.extend(archived_row(frame, i) for i in page)
+        return rows
+
+    def get(self, db: Session, prediction_id: int) -> Optional[Dict[str, Any]]:
+        """Archived prediction with its input data (resolved from feature_vectors)."""
+        for path, header in self.files():
+            if not header["min_id"] <= prediction_id <= header["max_id"]:
+                continue
+            frame = self.load(path)
+            ids = frame["id"].to_numpy()
+            i = int(np.searchsorted(ids, prediction_id))
+            if i == len(ids) or ids[i] != prediction_id:
+                continue
+            row = archived_row(frame, i)
+            input_hash = _optional(frame["input_hash"].iat[i])
+            if input_hash is not None:
+                input_data = db.query(FeatureVector.data).filter(FeatureVector.hash == input_hash).scalar()
+            else:
+                inline = _optional(frame["input_data"].iat[i])
+                input_data = json.loads(inline) if inline is not None else None
+            row["input_data"] = input_data
+            return row
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        files = self.files()
+        return {
+            "files": len(files),
+            "rows": sum(header["n_rows"] for _, header in files),
+            "bytes": sum(path.stat().st_size for path, _ in files),
+        }
+
+
+def list_predictions(db: Session, skip: int = 0, limit: int = 100, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, archive: Optional[PredictionArchive] = None
+                     ) -> List[Dict[str, Any]]:
+    """Predictions in [start, end) (naive UTC), newest first, from the database then the archive."""
+    archive = archive or prediction_archive
+    boundary = archive.boundary()
+    hot_start = max(start, boundary) if start and boundary else start or boundary
+    rows = [
+        {
+            "id": p.id,
+            "employee_id": p.employee_id,
+            "prediction": p.prediction,
+            "probability": p.probability,
+            "risk_level": p.risk_level,
+            "model_version": p.model_version,
+            "created_at": p.created_at.isoformat() if p.created_at else None,
+            "archived": False,
+        }
+        for p in get_predictions(db, skip=skip, limit=limit, start=hot_start, end=end)
+    ]
+    if len(rows) == limit or boundary is None or (start and start >= boundary):
+        return rows
+
+    n_hot = skip + len(rows) if rows else count_predictions(db, start=hot_start, end=end)
+    archive_end = min(end, boundary) if end else boundary
+    return rows + archive.query(start, archive_end, skip=max(skip - n_hot, 0), limit=limit - len(rows))
+
+
+def is_partitioned(db: Session) -> bool:
+    """Whether predictions is a native partitioned table (PostgreSQL)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'predictions'"
+    )).first() is not None
+
+
+def partition_periods(db: Session) -> List[datetime]:
+    """Periods that have a native partition (DEFAULT excluded), oldest first."""
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'predictions'"
+    )).scalars()
+    return sorted(datetime.strptime(name[len("predictions_p"):], "%Y%m")
+                  for name in names if name.startswith("predictions_p"))
+
+
+def ensure_partitions(db: Session, now: Optional[datetime] = None, ahead: int = PARTITIONS_AHEAD) -> List[str]:
+    """
+    Create the partitions of the current period and the next `ahead` ones,
+    before rows land in the DEFAULT partition. No-op without native partitions.
+
+    Returns:
+        Partition names (existing or created)
+    """
+    if not is_partitioned(db):
+        return []
+    start = period_start(now or datetime.utcnow())
+    names = []
+    for _ in range(ahead + 1):
+        end = next_period(start)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF predictions "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        ))
+        names.append(partition_name(start))
+        start = end
+    db.commit()
+    return names
+
+
+def archive_period(db: Session, start: datetime, directory: Path = ARCHIVE_DIR,
+                   partitioned: bool = False) -> Dict[str, Any]:
+    """
+    Move one period from the database to its archive file.
+
+    Rows already archived for the period (interrupted earlier run) are
+    merged by id. The file is written before the rows are removed, in one
+    transaction per period.
+    """
+    end = next_period(start)
+    table = Prediction.__table__
+    with stage("archive_period"):
+        frame = pd.read_sql(
+            select(*[table.c[name] for name in ARCHIVE_COLUMNS])
+            .where(table.c.created_at >= start, table.c.created_at < end).order_by(table.c.id),
+            db.connection(),
+        )
+        frame["input_data"] = frame["input_data"].map(lambda data: canonical_json(data) if data else None)
+        n_rows = len(frame)
+        path = archive_path(start, directory)
+        if n_rows:
+            if path.exists():
+                archived, _ = load_archive(path)
+                archived["created_at"] = pd.to_datetime(archived["created_at"], unit="us")
+                frame = pd.concat([archived.astype(object), frame.astype(object)])
+                frame = frame.drop_duplicates("id", keep="last")
+            frame["created_at"] = pd.to_datetime(frame["created_at"])
+            frame["employee_id"] = pd.to_numeric(frame["employee_id"])
+            for name in ("id", "prediction"):
+                frame[name] = frame[name].astype("int64")
+            frame["probability"] = frame["probability"].astype("float64")
+            write_archive(frame, start, directory)
+
+        if partitioned and start in partition_periods(db):
+            db.execute(text(f"DROP TABLE {partition_name(start)}"))
+        # Rows outside native partitions (DEFAULT partition, or no partitioning)
+        db.execute(table.delete().where(table.c.created_at >= start, table.c.created_at < end))
+        db.commit()
+    return {"period": f"{start:%Y-%m}", "n_rows": n_rows, "path": str(path) if n_rows else None}
+
+
+def archive_predictions(db: Session, retention_days: int = RETENTION_DAYS, directory: Path = ARCHIVE_DIR,
+                        now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Archive every period that ended more than retention_days ago.
+
+    Returns:
+        One summary per archived period (period, n_rows, path), oldest first
+    """
+    cutoff = period_start((now or datetime.utcnow()) - timedelta(days=retention_days))
+    partitioned = is_partitioned(db)
+    periods = set(p for p in partition_periods(db) if p < cutoff) if partitioned else set()
+    oldest = db.query(func.min(Prediction.created_at)).filter(Prediction.created_at < cutoff).scalar()
+    start = period_start(oldest) if oldest is not None else cutoff
+    while start < cutoff:
+        end = next_period(start)
+        if db.query(Prediction.id).filter(Prediction.created_at >= start, Prediction.created_at < end).first():
+            periods.add(start)
+        start = end
+    return [archive_period(db, start, directory, partitioned) for start in sorted(periods)]
+
+
+# Singleton instance
+prediction_archive = PredictionArchive()
+
+metrics.register_gauge("attrition_archive", "Archived prediction files, rows and bytes", prediction_archive.stats)
@@ -0,0 +1,198 @@
+"""
+Compact memory-mappable model artifact
+
+The fitted sklearn pipeline (StandardScaler + OneHotEncoder + LogisticRegression)
+is reduced to its numeric parameters and stored as a flat binary file:
+
+    magic (4 bytes) | format version (uint32) | header length (uint64)
+    | JSON header | padding to 64 bytes | float64 little-endian payload
+
+The JSON header holds feature names, categories and the offset/shape of each
+array in the payload. Scoring only needs numpy, so sklearn is not imported
+when serving from this artifact.
+"""
+
+import json
+import struct
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, List
+
+MAGIC = b"LRCM"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<4sIQ")
+
+
+def _payload_offset(header_len: int) -> int:
+    """Offset of the float64 payload, aligned for memory mapping."""
+    end = _PREAMBLE.size + header_len
+    return (end + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def export_pipeline(pipeline, path: Path, features_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write the numeric parameters of a fitted pipeline to a compact artifact.
+
+    Args:
+        pipeline: Fitted sklearn Pipeline (preprocessor + classifier)
+        path: Destination file
+        features_info: Content of features.json (used for feature order)
+
+    Returns:
+        The JSON header written to the file
+    """
+    import sklearn
+
+    preprocessor = pipeline.named_steps["preprocessor"]
+    classifier = pipeline.named_steps["classifier"]
+
+    transformers = {name: (step, cols) for name, step, cols in preprocessor.transformers_}
+    scaler, numerical = transformers["num"]
+    encoder, categorical = transformers["cat"]
+
+    if encoder.drop is not None and encoder.drop != "first":
+        raise ValueError(f"Unsupported OneHotEncoder drop: {encoder.drop!r}")
+
+    arrays = {
+        "mean": np.asarray(scaler.mean_, dtype="<f8"),
+        "scale": np.asarray(scaler.scale_, dtype="<f8"),
+        "coef": np.asarray(classifier.coef_[0], dtype="<f8"),
+        "intercept": np.asarray(classifier.intercept_, dtype="<f8"),
+    }
+
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = {"offset": offset, "shape": list(values.shape)}
+        offset += values.size
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "sklearn_version": sklearn.__version__,
+        "features": features_info.get("features", []),
+        "numerical_features": list(numerical),
+        "categorical_features": list(categorical),
+        "categories": [[str(c) for c in cats] for cats in encoder.categories_],
+        "drop_first": encoder.drop == "first",
+        "classes": [int(c) for c in classifier.classes_],
+        "arrays": layout,
+        "payload_size": offset,
+    }
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_offset = _payload_offset(len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_offset - f.tell()))
+        for values in arrays.values():
+            f.write(values.tobytes())
+
+    return header
+
+
+class CompactPipeline:
+    """
+    Sklearn-free scorer backed by a memory-mapped compact artifact.
+
+    Exposes predict() and predict_proba() with the same semantics as the
+    original Pipeline so it can replace it in AttritionModel.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a compact model artifact: {self.path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact model version {version} (expected {FORMAT_VERSION})")
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+
+        self._payload = np.memmap(
+            self.path,
+            dtype="<f8",
+            mode="r",
+            offset=_payload_offset(header_len),
+            shape=(self.header["payload_size"],),
+        )
+
+        self.mean = self._array("mean")
+        self.scale = self._array("scale")
+        self.coef = self._array("coef")
+        self.intercept = float(self._array("intercept")[0])
+        self.classes = np.asarray(self.header["classes"])
+
+        # One lookup table per categorical feature: value -> one-hot column
+        skip = 1 if self.header["drop_first"] else 0
+        self._category_index: List[Dict[str, int]] = []
+        column = len(self.numerical_features)
+        for cats in self.header["categories"]:
+            self._category_index.append({c: column + i for i, c in enumerate(cats[skip:])})
+            column += len(cats) - skip
+        self.n_encoded = column
+
+        if self.n_encoded != self.coef.shape[0]:
+            raise ValueError(
+                f"Compact model is inconsistent: {self.n_encoded} encoded columns, "
+                f"{self.coef.shape[0]} coefficients"
+            )
+
+    def _array(self, name: str) -> np.ndarray:
+        """View of a named array inside the memory-mapped payload."""
+        spec = self.header["arrays"][name]
+        size = int(np.prod(spec["shape"]))
+        start = spec["offset"]
+        return self._payload[start:start + size].reshape(spec["shape"])
+
+    @property
+    def numerical_features(self) -> List[str]:
+        return self.header["numerical_features"]
+
+    @property
+    def categorical_features(self) -> List[str]:
+        return self.header["categorical_features"]
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Scale numerical columns and one-hot encode categorical ones."""
+        n = len(df)
+        X = np.zeros((n, self.n_encoded), dtype=np.float64)
+
+        n_num = len(self.numerical_features)
+        numeric = df[self.numerical_features].to_numpy(dtype=np.float64)
+        X[:, :n_num] = (numeric - self.mean) / self.scale
+
+        # Unknown and dropped categories are encoded as all zeros.
+        # Each distinct value is looked up once (code -1 = missing value):
+        # Categorical columns reuse their codes, others are factorized.
+        rows = np.arange(n)
+        for col, index in zip(self.categorical_features, self._category_index):
+            column = df[col]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+            else:
+                codes, uniques = pd.factorize(column)
+            lookup = np.array([index.get(str(v), -1) for v in uniques] + [-1], dtype=np.int64)
+            positions = lookup[codes]
+            known = positions >= 0
+            X[rows[known], positions[known]] = 1.0
+
+        return X
+
+    def decision_function(self, df: pd.DataFrame) -> np.ndarray:
+        """Linear score (log-odds of class 1)."""
+        return self.transform(df) @ self.coef + self.intercept
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Class probabilities, shape (n_samples, 2)."""
+        p1 = 1.0 / (1.0 + np.exp(-self.decision_function(df)))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Predicted class labels."""
+        return self.classes[(self.decision_function(df) > 0).astype(int)]
@@ -0,0 +1,270 @@
+"""
+Counterfactual search: cheapest actionable changes that lower the risk level
+
+Only actionable features are changed (overtime, salary, satisfaction...),
+each option having a cost (weight x number of steps). The search exploits
+the logistic regression structure: the log-odds are additive over
+features, so the effect of each single change is scored once (all
+employees x all options in one batch) and combinations are explored by
+branch and bound on those deltas:
+- options that do not lower the risk, or cost more than a cheaper option
+  with a larger effect, are pruned per feature
+- a branch stops when the remaining features cannot reach the target, or
+  when it already costs more than the k-th best solution
+The retained counterfactuals are then rescored exactly in one batch.
+"""
+
+import os
+import heapq
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.explain import plain_value
+from app.feature_engineering import feature_engineer
+from app.model import RISK_LOW_THRESHOLD, RISK_HIGH_THRESHOLD, risk_level
+from app.tracing import stage
+from app.whatif import field_bounds
+
+# Default actionable features. Categorical: allowed target values and cost of
+# the change. Numerical: step, max number of steps, cost per step, optional bounds.
+ACTIONABLE_FEATURES: Dict[str, Dict[str, Any]] = {
+    "heure_supplementaires": {"values": ["Non"], "weight": 2.0},
+    "frequence_deplacement": {"values": ["Aucun", "Occasionnel"], "weight": 1.5},
+    "revenu_mensuel": {"step": 250.0, "max_steps": 20, "weight": 0.25},
+    "augementation_salaire_precedente": {"step": 0.05, "max_steps": 4, "weight": 1.0},
+    "satisfaction_employee_environnement": {"step": 1, "max_steps": 3, "max": 4, "weight": 1.0},
+    "satisfaction_employee_nature_travail": {"step": 1, "max_steps": 3, "max": 4, "weight": 1.0},
+    "satisfaction_employee_equipe": {"step": 1, "max_steps": 3, "max": 4, "weight": 1.0},
+    "satisfaction_employee_equilibre_pro_perso": {"step": 1, "max_steps": 3, "max": 4, "weight": 1.0},
+    "nb_formations_suivies": {"step": 1, "max_steps": 3, "weight": 0.5},
+    "niveau_hierarchique_poste": {"step": 1, "max_steps": 1, "weight": 3.0},
+}
+
+# Branch-and-bound node budget per employee (bounds worst-case latency)
+COUNTERFACTUAL_MAX_NODES = int(os.getenv("COUNTERFACTUAL_MAX_NODES", "20000"))
+
+TARGET_THRESHOLDS = {"low": RISK_LOW_THRESHOLD, "medium": RISK_HIGH_THRESHOLD}
+
+
+def _logit(probabilities: np.ndarray) -> np.ndarray:
+    p = np.clip(probabilities, 1e-12, 1 - 1e-12)
+    return np.log(p / (1 - p))
+
+
+class Option:
+    """One candidate change of one feature."""
+
+    __slots__ = ("feature", "value", "cost", "steps")
+
+    def __init__(self, feature: str, value: Any, cost: float, steps: int = 0):
+        self.feature = feature
+        self.value = value
+        self.cost = cost
+        self.steps = steps
+
+
+class CounterfactualEngine:
+    """Finds ranked minimal-cost counterfactuals for a batch of employees."""
+
+    def __init__(self, model, actionable: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.model = model
+        self.actionable = actionable or ACTIONABLE_FEATURES
+
+    def _specs(self, weights: Optional[Dict[str, float]]) -> Dict[str, Dict[str, Any]]:
+        """Actionable specs, restricted to and re-weighted by `weights` if given."""
+        if weights is None:
+            return self.actionable
+        unknown = sorted(set(weights) - set(self.actionable))
+        if unknown:
+            raise ValueError(f"Not actionable: {', '.join(unknown)} (allowed: {', '.join(self.actionable)})")
+        return {name: dict(self.actionable[name], weight=w) for name, w in weights.items()}
+
+    @staticmethod
+    def _options(specs: Dict[str, Dict[str, Any]]) -> List[Option]:
+        """Options shared by all employees (numeric ones are relative steps)."""
+        options = []
+        for name, spec in specs.items():
+            if "values" in spec:
+                options += [Option(name, value, spec["weight"]) for value in spec["values"]]
+            else:
+                options += [Option(name, None, spec["weight"] * k, k) for k in range(1, spec["max_steps"] + 1)]
+        return options
+
+    @staticmethod
+    def _candidate_values(base: pd.DataFrame, option: Option, spec: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """New column values for every employee, and which ones are valid changes."""
+        current = base[option.feature].to_numpy()
+        if option.steps == 0:
+            values = np.full(len(base), option.value, dtype=object)
+            return values, current != option.value
+
+        lower, upper = field_bounds(option.feature)
+        lower = spec.get("min", lower)
+        upper = spec.get("max", upper)
+        values = np.round(current.astype(np.float64) + spec["step"] * option.steps, 6)
+        valid = np.ones(len(base), dtype=bool)
+        if lower is not None:
+            valid &= values >= lower
+        if upper is not None:
+            valid &= values <= upper
+        return values, valid
+
+    def _score(self, frame: pd.DataFrame) -> np.ndarray:
+        """Probabilities of raw rows (engineered features recomputed)."""
+        _, probabilities = self.model.predict_frame(feature_engineer.engineer_features(frame))
+        return probabilities
+
+    def search(self, raw_rows: List[Dict[str, Any]], target_risk: str = "low",
+               weights: Optional[Dict[str, float]] = None, max_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Ranked counterfactuals for each employee.
+
+        Args:
+            raw_rows: Raw employee inputs (EmployeeInput fields)
+            target_risk: "low" (p < 0.20) or "medium" (p < 0.45)
+            weights: Optional {feature: cost weight} restricting the actionable set
+            max_results: Counterfactuals returned per employee
+
+        Returns:
+            One result per employee: probability, risk_level, status
+            (at_target / found / not_found) and counterfactuals ranked by cost
+
+        Raises:
+            ValueError: Unknown target or non-actionable feature
+        """
+        if target_risk not in TARGET_THRESHOLDS:
+            raise ValueError(f"target_risk must be one of {', '.join(TARGET_THRESHOLDS)}")
+        specs = self._specs(weights)
+        options = self._options(specs)
+        target_logit = float(_logit(np.array([TARGET_THRESHOLDS[target_risk]]))[0])
+
+        with stage("counterfactual_search"):
+            base = pd.DataFrame(raw_rows).reset_index(drop=True)
+            n = len(base)
+            base_probabilities = self._score(base)
+            base_logits = _logit(base_probabilities)
+            todo = np.flatnonzero(base_probabilities >= TARGET_THRESHOLDS[target_risk])
+
+            # Effect of every single change on every employee, scored in one batch
+            deltas = np.full((n, len(options)), np.inf)
+            if len(todo) and options:
+                subset = base.iloc[todo].reset_index(drop=True)
+                # Option-major tiling: block k holds every employee with option k applied
+                frame = subset.iloc[np.tile(np.arange(len(todo)), len(options))].reset_index(drop=True)
+                columns = {name: frame[name].to_numpy(dtype=object if "values" in specs[name] else np.float64,
+                                                      copy=True)
+                           for name in specs}
+                valid = []
+                for k, option in enumerate(options):
+                    values, ok = self._candidate_values(subset, option, specs[option.feature])
+                    columns[option.feature][k * len(todo):(k + 1) * len(todo)] = values
+                    valid.append(ok)
+                for name, values in columns.items():
+                    frame[name] = values
+                probabilities = self._score(frame)
+                single = _logit(probabilities).reshape(len(options), len(todo)).T - base_logits[todo, None]
+                deltas[todo] = np.where(np.column_stack(valid), single, np.inf)
+
+            found = {i: self._branch_and_bound(deltas[i], options, target_logit - base_logits[i], max_results)
+                     for i in todo}
+
+            # Exact rescoring of all retained counterfactuals in one batch
+            records = base.to_dict("records")
+            rows, owners = [], []
+            for i, solutions in found.items():
+                for solution in solutions:
+                    row = dict(records[i])
+                    for j in solution:
+                        row[options[j].feature] = self._value(records[i], options[j], specs)
+                    rows.append(row)
+                    owners.append((i, solution))
+            exact = self._score(pd.DataFrame(rows)) if rows else []
+
+        results = [
+            {
+                "probability": round(float(p), 4),
+                "risk_level": risk_level(float(p)),
+                "status": "at_target" if p < TARGET_THRESHOLDS[target_risk] else "not_found",
+                "counterfactuals": [],
+            }
+            for p in base_probabilities
+        ]
+        for (i, solution), p in zip(owners, exact):
+            if p >= TARGET_THRESHOLDS[target_risk]:
+                continue
+            results[i]["status"] = "found"
+            results[i]["counterfactuals"].append({
+                "changes": [
+                    {
+                        "feature": options[j].feature,
+                        "current": plain_value(records[i][options[j].feature]),
+                        "proposed": self._value(records[i], options[j], specs),
+                    }
+                    for j in solution
+                ],
+                "cost": round(sum(options[j].cost for j in solution), 4),
+                "probability": round(float(p), 4),
+                "risk_level": risk_level(float(p)),
+            })
+        return results
+
+    @staticmethod
+    def _value(row: Dict[str, Any], option: Option, specs: Dict[str, Dict[str, Any]]) -> Any:
+        if option.steps == 0:
+            return option.value
+        return round(float(row[option.feature]) + specs[option.feature]["step"] * option.steps, 6)
+
+    @staticmethod
+    def _branch_and_bound(deltas: np.ndarray, options: List[Option], needed: float,
+                          max_results: int) -> List[List[int]]:
+        """
+        Cheapest option sets (at most one option per feature) whose summed
+        log-odds deltas go below `needed`, ranked by cost then size.
+        """
+        # Per feature: helpful options, Pareto-pruned on (cost, delta)
+        groups: Dict[str, List[Tuple[float, float, int]]] = {}
+        for j, option in enumerate(options):
+            if deltas[j] < 0:
+                groups.setdefault(option.feature, []).append((option.cost, float(deltas[j]), j))
+        pruned = []
+        for candidates in groups.values():
+            kept, best = [], 0.0
+            for cost, delta, j in sorted(candidates):
+                if delta < best:
+                    kept.append((cost, delta, j))
+                    best = delta
+            pruned.append(kept)
+        # Most effective features first; suffix sums bound the reachable delta
+        pruned.sort(key=lambda g: g[-1][1])
+        reach = np.concatenate([np.cumsum([g[-1][1] for g in pruned][::-1])[::-1], [0.0]])
+
+        best: List[Tuple[float, int, List[int]]] = []  # max-heap on (cost, size) via negation
+        nodes = 0
+
+        def worst() -> float:
+            return -best[0][0] if len(best) >= max_results else np.inf
+
+        def visit(level: int, cost: float, delta: float, chosen: List[Tuple[float, int]]) -> None:
+            nonlocal nodes
+            nodes += 1
+            if delta < needed:
+                # Minimal only: no single change can be dropped
+                if all(delta - d >= needed for d, _ in chosen):
+                    entry = (-cost, -len(chosen), [j for _, j in chosen])
+                    if len(best) < max_results:
+                        heapq.heappush(best, entry)
+                    elif (cost, len(chosen)) < (-best[0][0], -best[0][1]):
+                        heapq.heapreplace(best, entry)
+                return
+            if level == len(pruned) or delta + reach[level] >= needed or nodes > COUNTERFACTUAL_MAX_NODES:
+                return
+            for option_cost, option_delta, j in pruned[level]:
+                if cost + option_cost > worst():
+                    break
+                visit(level + 1, cost + option_cost, delta + option_delta, chosen + [(option_delta, j)])
+            visit(level + 1, cost, delta, chosen)
+
+        visit(0, 0.0, 0.0, [])
+        return [solution for _, _, solution in sorted(best, key=lambda e: (-e[0], -e[1]))]
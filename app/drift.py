@@ -0,0 +1,220 @@
+"""
+Streaming data-drift monitor on live prediction inputs
+
+Each of the 35 model features keeps a fixed-size sketch fed from the
+predict path:
+- numerical: counts over the reference bin edges (train deciles)
+- categorical: counts per reference category, plus an "other" bucket
+
+The sketches are compared with a reference profile computed from the
+`train` rows of data/employees.csv (models/drift_reference.json, built by
+scripts/build_drift_reference.py). Updates cost one bisect or dict lookup
+per feature and memory is bounded by the number of bins, independently of
+traffic.
+
+Per feature the monitor reports:
+- PSI: sum((a - e) * ln(a / e)) over bins
+- KS: max |CDF_live - CDF_ref| over bin boundaries (numerical only)
+"""
+
+import json
+import math
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+BASE_PATH = Path(__file__).parent.parent
+REFERENCE_PATH = BASE_PATH / "models" / "drift_reference.json"
+CSV_PATH = BASE_PATH / "data" / "employees.csv"
+
+N_BINS = 10
+OTHER = "__other__"
+
+# Conventional PSI thresholds
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# Below this many observations the statistics are not reported as drift
+MIN_SAMPLES = 50
+# Smoothing for empty bins in PSI
+EPSILON = 1e-4
+
+
+def build_reference(rows: List[Dict[str, Any]], numerical: List[str], categorical: List[str],
+                    n_bins: int = N_BINS) -> Dict[str, Any]:
+    """
+    Compute the reference profile from training rows (raw + engineered features).
+
+    Numerical features get up to n_bins bins from their quantiles;
+    categorical features get the observed category proportions.
+    """
+    import numpy as np
+
+    features = {}
+    for name in numerical:
+        values = np.asarray([row[name] for row in rows], dtype=float)
+        quantiles = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])
+        edges = sorted(set(float(q) for q in quantiles))
+        counts = [0] * (len(edges) + 1)
+        for v in values:
+            counts[bisect_right(edges, v)] += 1
+        features[name] = {
+            "type": "numerical",
+            "edges": edges,
+            "proportions": [c / len(values) for c in counts],
+        }
+
+    for name in categorical:
+        counts: Dict[str, int] = {}
+        for row in rows:
+            key = str(row[name])
+            counts[key] = counts.get(key, 0) + 1
+        categories = sorted(counts)
+        features[name] = {
+            "type": "categorical",
+            "categories": categories,
+            # Last bucket is OTHER (unseen categories), empty in the reference
+            "proportions": [counts[c] / len(rows) for c in categories] + [0.0],
+        }
+
+    return {"n_reference": len(rows), "features": features}
+
+
+def build_reference_from_csv(path: Path = CSV_PATH) -> Dict[str, Any]:
+    """Reference profile from the `train` rows of the employees CSV."""
+    import pandas as pd
+    from app.feature_engineering import feature_engineer
+    from app.model import get_model
+
+    model = get_model()
+    df = pd.read_csv(path)
+    train = df[df["dataset_type"] == "train"]
+    rows = [feature_engineer.engineer_features(r) for r in train.to_dict("records")]
+    reference = build_reference(rows, model.numerical_features, model.categorical_features)
+    reference["source"] = f"{path.name} (dataset_type=train)"
+    return reference
+
+
+def psi(actual: List[float], expected: List[float]) -> float:
+    """Population Stability Index between two proportion vectors."""
+    total = 0.0
+    for a, e in zip(actual, expected):
+        a = max(a, EPSILON)
+        e = max(e, EPSILON)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def ks(actual: List[float], expected: List[float]) -> float:
+    """Max CDF difference between two binned distributions."""
+    cdf_a = cdf_e = 0.0
+    result = 0.0
+    for a, e in zip(actual, expected):
+        cdf_a += a
+        cdf_e += e
+        result = max(result, abs(cdf_a - cdf_e))
+    return result
+
+
+class FeatureSketch:
+    """Fixed-size counts for one feature."""
+
+    __slots__ = ("name", "kind", "edges", "index", "counts", "reference")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.kind = spec["type"]
+        self.reference = spec["proportions"]
+        self.counts = [0] * len(self.reference)
+        self.edges = spec.get("edges")
+        self.index = None
+        if self.kind == "categorical":
+            self.index = {c: i for i, c in enumerate(spec["categories"])}
+
+    def update(self, value: Any) -> None:
+        if self.kind == "numerical":
+            self.counts[bisect_right(self.edges, float(value))] += 1
+        else:
+            self.counts[self.index.get(str(value), len(self.counts) - 1)] += 1
+
+    def report(self) -> Dict[str, Any]:
+        n = sum(self.counts)
+        result = {"type": self.kind, "n": n}
+        if n == 0:
+            return result
+        actual = [c / n for c in self.counts]
+        result["psi"] = round(psi(actual, self.reference), 6)
+        if self.kind == "numerical":
+            result["ks"] = round(ks(actual, self.reference), 6)
+        else:
+            result["unseen_share"] = round(actual[-1], 6)
+        if n < MIN_SAMPLES:
+            result["status"] = "insufficient_data"
+        elif result["psi"] >= PSI_DRIFT:
+            result["status"] = "drift"
+        elif result["psi"] >= PSI_WARNING:
+            result["status"] = "warning"
+        else:
+            result["status"] = "ok"
+        return result
+
+
+class DriftMonitor:
+    """Holds one sketch per model feature."""
+
+    def __init__(self, reference: Optional[Dict[str, Any]] = None):
+        self._reference = reference
+        self._sketches: Optional[List[FeatureSketch]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def sketches(self) -> List[FeatureSketch]:
+        """Sketches, created on first use from the reference profile."""
+        if self._sketches is None:
+            with self._lock:
+                if self._sketches is None:
+                    self._sketches = [
+                        FeatureSketch(name, spec) for name, spec in self.reference["features"].items()
+                    ]
+        return self._sketches
+
+    @property
+    def reference(self) -> Dict[str, Any]:
+        if self._reference is None:
+            if REFERENCE_PATH.exists():
+                with open(REFERENCE_PATH, "r") as f:
+                    self._reference = json.load(f)
+            else:
+                self._reference = build_reference_from_csv()
+        return self._reference
+
+    def update(self, data: Dict[str, Any]) -> None:
+        """Add one prediction input (raw + engineered features)."""
+        for sketch in self.sketches:
+            value = data.get(sketch.name)
+            if value is not None:
+                sketch.update(value)
+
+    def reset(self) -> None:
+        """Clear live counts (e.g. to start a new observation window)."""
+        for sketch in self.sketches:
+            sketch.counts = [0] * len(sketch.counts)
+
+    def report(self) -> Dict[str, Any]:
+        """PSI/KS per feature and the list of drifting features."""
+        features = {s.name: s.report() for s in self.sketches}
+        drifted = sorted(n for n, r in features.items() if r.get("status") == "drift")
+        warnings = sorted(n for n, r in features.items() if r.get("status") == "warning")
+        n = max((r["n"] for r in features.values()), default=0)
+        return {
+            "n_observations": n,
+            "n_reference": self.reference.get("n_reference"),
+            "thresholds": {"psi_warning": PSI_WARNING, "psi_drift": PSI_DRIFT, "min_samples": MIN_SAMPLES},
+            "drifted_features": drifted,
+            "warning_features": warnings,
+            "features": features,
+        }
+
+
+# Singleton instance
+drift_monitor = DriftMonitor()
@@ -0,0 +1,150 @@
+"""
+Read-through cache of employee records
+
+Hot lookups (/employees/{id}, /employees/{id}/predict) are served from an
+in-process LRU of compact, read-only EmployeeRecord objects (__slots__, no
+ORM state), keyed by employee_id; unknown ids are cached too. The roster
+only changes on a load or sync (scripts/seed_db.py, another process), which
+stamps updated_at / deleted_at: the cache is cleared when the version stamp
+of the employees table changes, checked at most every
+EMPLOYEE_CACHE_CHECK_SECONDS. In-process writers call invalidate().
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import Employee
+from app.metrics import metrics
+
+EMPLOYEE_CACHE_SIZE = int(os.getenv("EMPLOYEE_CACHE_SIZE", "10000"))  # 0 disables the cache
+EMPLOYEE_CACHE_CHECK_SECONDS = float(os.getenv("EMPLOYEE_CACHE_CHECK_SECONDS", "5"))
+
+EMPLOYEE_FIELDS = tuple(c.name for c in Employee.__table__.columns)
+
+
+class EmployeeRecord:
+    """Read-only employee row with the attributes of Employee."""
+
+    __slots__ = EMPLOYEE_FIELDS
+
+    def __init__(self, values: Iterable):
+        for name, value in zip(EMPLOYEE_FIELDS, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EmployeeRecord is read-only")
+
+    def __repr__(self) -> str:
+        return f"EmployeeRecord(employee_id={self.employee_id})"
+
+
+def load_record(db: Session, employee_id: int) -> Optional[EmployeeRecord]:
+    """Employee row from the database, or None."""
+    table = Employee.__table__
+    row = db.execute(
+        select(*[table.c[name] for name in EMPLOYEE_FIELDS]).where(table.c.employee_id == employee_id)
+    ).first()
+    return EmployeeRecord(row) if row is not None else None
+
+
+def version_stamp(db: Session) -> Tuple:
+    """Changes whenever rows are loaded, synced or flagged deleted."""
+    return tuple(db.execute(select(
+        func.count(Employee.id), func.max(Employee.updated_at), func.max(Employee.deleted_at)
+    )).one())
+
+
+class EmployeeCache:
+    """Bounded LRU of employee records, shared across requests."""
+
+    def __init__(self, max_size: int = EMPLOYEE_CACHE_SIZE, check_interval: float = EMPLOYEE_CACHE_CHECK_SECONDS):
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self._records: "OrderedDict[int, Optional[EmployeeRecord]]" = OrderedDict()
+        self._stamp: Optional[Tuple] = None
+        self._checked_at = float("-inf")
+        self._generation = 0  # bumped on invalidation, discards loads that raced with it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def invalidate(self, employee_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop some records, or all of them (e.g. after a load or sync)."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if employee_ids is None:
+                self._records.clear()
+                self._stamp = None
+                self._checked_at = float("-inf")
+            else:
+                for employee_id in employee_ids:
+                    self._records.pop(employee_id, None)
+
+    def _check_stamp(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        stamp = version_stamp(db)
+        with self._lock:
+            if self._stamp is not None and stamp != self._stamp:
+                self._records.clear()
+                self._generation += 1
+                self.invalidations += 1
+            self._stamp = stamp
+            self._checked_at = now
+
+    def version(self, db: Session) -> Tuple:
+        """Roster version stamp, refreshed at most every check_interval."""
+        if self.max_size <= 0:
+            return version_stamp(db)
+        self._check_stamp(db)
+        return self._stamp
+
+    def get(self, db: Session, employee_id: int) -> Optional[EmployeeRecord]:
+        """Employee record (None if unknown), from the cache or the database."""
+        if self.max_size <= 0:
+            return load_record(db, employee_id)
+        self._check_stamp(db)
+        with self._lock:
+            if employee_id in self._records:
+                self._records.move_to_end(employee_id)
+                self.hits += 1
+                return self._records[employee_id]
+            self.misses += 1
+            generation = self._generation
+
+        record = load_record(db, employee_id)
+        with self._lock:
+            if generation == self._generation:
+                self._records[employee_id] = record
+                while len(self._records) > self.max_size:
+                    self._records.popitem(last=False)
+                    self.evictions += 1
+        return record
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._records),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton instance
+employee_cache = EmployeeCache()
+
+metrics.register_gauge("attrition_employee_cache", "Employee record cache size and counters", employee_cache.stats)
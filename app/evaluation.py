@@ -0,0 +1,153 @@
+"""
+Incremental online evaluation against ground-truth attrition
+
+Keeps running confusion-matrix counts and per-class histograms of the
+predicted probability. Accuracy, precision, recall and F1 come from the
+counts; AUC is estimated from the histograms (pairs falling in the same
+bin count as ties). Each labeled prediction is an O(1) update, so live
+metrics never need a scan of the predictions table.
+
+Labels come from employees.attrition_actual: predictions made through
+/employees/{id}/predict on held-out (non-train) employees are labeled on
+arrival, and backfill_test_split() rescores the `test` split in one
+vectorized call. Each employee counts once: rescoring replaces its previous
+contribution.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+# Histogram resolution for the AUC estimate
+N_SCORE_BINS = 1000
+
+
+class OnlineEvaluator:
+    """Running classification metrics for a binary attrition model."""
+
+    def __init__(self, n_bins: int = N_SCORE_BINS):
+        self.n_bins = n_bins
+        self._lock = threading.Lock()
+        # Bumped on every change (HTTP validators of /model/info)
+        self.version = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all labeled predictions."""
+        with self._lock:
+            # Rows: actual (0/1), columns: predicted (0/1)
+            self.confusion = np.zeros((2, 2), dtype=np.int64)
+            # Score histograms for actual negatives (row 0) and positives (row 1)
+            self.histograms = np.zeros((2, self.n_bins), dtype=np.int64)
+            # employee_id -> (actual, prediction, score bin) currently counted
+            self._scored: Dict[int, Tuple[int, int, int]] = {}
+            self._touch()
+
+    def _touch(self) -> None:
+        """Record a change (caller holds the lock)."""
+        self.version += 1
+        self.updated_at = datetime.utcnow()
+
+    def _bins(self, probabilities: np.ndarray) -> np.ndarray:
+        return np.minimum((probabilities * self.n_bins).astype(np.int64), self.n_bins - 1)
+
+    def _forget(self, employee_ids: Iterable[int]) -> None:
+        """Remove the counted contribution of employees (caller holds the lock)."""
+        for employee_id in employee_ids:
+            previous = self._scored.pop(employee_id, None)
+            if previous is not None:
+                actual, prediction, score_bin = previous
+                self.confusion[actual, prediction] -= 1
+                self.histograms[actual, score_bin] -= 1
+
+    def update(self, actual: int, prediction: int, probability: float, employee_id: Optional[int] = None) -> None:
+        """Add one labeled prediction (replacing the employee's previous one, if any)."""
+        score_bin = min(int(probability * self.n_bins), self.n_bins - 1)
+        with self._lock:
+            if employee_id is not None:
+                self._forget([employee_id])
+                self._scored[employee_id] = (actual, prediction, score_bin)
+            self.confusion[actual, prediction] += 1
+            self.histograms[actual, score_bin] += 1
+            self._touch()
+
+    def update_batch(self, actual: np.ndarray, predictions: np.ndarray, probabilities: np.ndarray,
+                     employee_ids: Optional[np.ndarray] = None) -> None:
+        """Add many labeled predictions at once (vectorized), one per employee."""
+        actual = np.asarray(actual, dtype=np.int64)
+        predictions = np.asarray(predictions, dtype=np.int64)
+        bins = self._bins(np.asarray(probabilities, dtype=np.float64))
+        with self._lock:
+            if employee_ids is not None:
+                ids = np.asarray(employee_ids).tolist()
+                self._forget(ids)
+                self._scored.update(zip(ids, zip(actual.tolist(), predictions.tolist(), bins.tolist())))
+            np.add.at(self.confusion, (actual, predictions), 1)
+            np.add.at(self.histograms, (actual, bins), 1)
+            self._touch()
+
+    def auc(self) -> Optional[float]:
+        """ROC AUC estimated from the binned score histograms."""
+        negatives, positives = self.histograms
+        n_neg, n_pos = negatives.sum(), positives.sum()
+        if n_neg == 0 or n_pos == 0:
+            return None
+        # Negatives strictly below each bin, plus half the ties in the same bin
+        below = np.cumsum(negatives) - negatives
+        wins = (positives * below).sum() + 0.5 * (positives * negatives).sum()
+        return float(wins / (n_pos * n_neg))
+
+    def report(self) -> Dict[str, Any]:
+        """Live metrics computed from the running counts."""
+        with self._lock:
+            (tn, fp), (fn, tp) = self.confusion.tolist()
+            auc = self.auc()
+        n = tn + fp + fn + tp
+        precision = tp / (tp + fp) if tp + fp else None
+        recall = tp / (tp + fn) if tp + fn else None
+        f1 = (2 * precision * recall / (precision + recall)
+              if precision is not None and recall is not None and precision + recall else None)
+        return {
+            "n_labeled": n,
+            "confusion_matrix": {"tn": tn, "fp": fp, "fn": fn, "tp": tp},
+            "metrics": {
+                "accuracy": (tn + tp) / n if n else None,
+                "precision": precision,
+                "recall": recall,
+                "f1_score": f1,
+                "auc_roc": auc,
+            },
+        }
+
+
+def backfill_test_split(db: Session, model, evaluator: "OnlineEvaluator") -> int:
+    """
+    Rescore every labeled `test` employee in one vectorized call.
+
+    Returns:
+        Number of rows added to the evaluator
+    """
+    from app.database import Employee
+    from app.feature_engineering import feature_engineer
+
+    query = db.query(Employee).filter(
+        Employee.dataset_type == "test",
+        Employee.attrition_actual.isnot(None),
+    )
+    df = pd.read_sql(query.statement, db.connection())
+    if df.empty:
+        return 0
+
+    full = feature_engineer.engineer_features(df)
+    predictions, probabilities = model.predict_frame(full)
+    evaluator.update_batch(df["attrition_actual"].to_numpy(), predictions, probabilities,
+                           employee_ids=df["employee_id"].to_numpy())
+    return len(df)
+
+
+# Singleton instance
+evaluator = OnlineEvaluator()
@@ -0,0 +1,138 @@
+"""
+Per-feature explanation of logistic regression predictions
+
+For a linear model the log-odds decompose exactly:
+
+    logit = intercept + sum_j coef_j * x_j
+
+where x is the transformed row (scaled numericals, one-hot categoricals).
+coef_j * x_j is the contribution of encoded column j; summing the one-hot
+columns of a categorical feature gives the contribution of that feature.
+Both steps are done for a whole batch as one elementwise product and one
+matrix product with a (n_encoded x n_features) 0/1 membership matrix.
+
+Numerical contributions are relative to the training mean (x_j = 0 after
+scaling); categorical ones are relative to the dropped first category.
+"""
+
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.feature_engineering import FeatureEngineer
+from app.tracing import stage
+
+
+class LinearExplainer:
+    """Contributions of each model feature to the log-odds of attrition."""
+
+    def __init__(self, transform, coef: np.ndarray, intercept: float,
+                 column_features: List[str], features: List[str]):
+        """
+        Args:
+            transform: Callable mapping a feature DataFrame to the encoded matrix
+            coef: Coefficients of the encoded columns
+            intercept: Model intercept (log-odds of the reference employee)
+            column_features: Source feature of each encoded column
+            features: Model features, in output order
+        """
+        self.transform = transform
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.features = list(features)
+
+        position = {name: i for i, name in enumerate(self.features)}
+        self.membership = np.zeros((len(column_features), len(self.features)))
+        for column, name in enumerate(column_features):
+            self.membership[column, position[name]] = 1.0
+
+        engineered = set(FeatureEngineer.ENGINEERED_FEATURES)
+        self.kinds = ["engineered" if f in engineered else "raw" for f in self.features]
+
+    @classmethod
+    def from_model(cls, model) -> "LinearExplainer":
+        """Build from an AttritionModel (compact artifact or sklearn pipeline)."""
+        pipeline = model.model
+        if model.model_format == "compact":
+            skip = 1 if pipeline.header["drop_first"] else 0
+            column_features = list(pipeline.numerical_features)
+            for name, cats in zip(pipeline.categorical_features, pipeline.header["categories"]):
+                column_features += [name] * (len(cats) - skip)
+            return cls(pipeline.transform, pipeline.coef, pipeline.intercept,
+                       column_features, model.feature_names)
+
+        preprocessor = pipeline.named_steps["preprocessor"]
+        classifier = pipeline.named_steps["classifier"]
+        column_features = []
+        for name, step, columns in preprocessor.transformers_:
+            if name == "num":
+                column_features += list(columns)
+            elif name == "cat":
+                for i, column in enumerate(columns):
+                    dropped = step.drop_idx_ is not None and step.drop_idx_[i] is not None
+                    column_features += [column] * (len(step.categories_[i]) - int(dropped))
+
+        def transform(df: pd.DataFrame) -> np.ndarray:
+            X = preprocessor.transform(df)
+            return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+        return cls(transform, classifier.coef_[0], classifier.intercept_[0],
+                   column_features, model.feature_names)
+
+    def contributions(self, df: pd.DataFrame) -> np.ndarray:
+        """Per-feature contributions, shape (n_rows, n_features)."""
+        X = self.transform(df[self.features])
+        return (X * self.coef) @ self.membership
+
+    def explain(self, df: pd.DataFrame, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Top-k features by absolute contribution for each row.
+
+        Returns:
+            One explanation per row: intercept and the top-k contributions
+            (feature, kind raw/engineered, input value, log-odds contribution)
+        """
+        with stage("explain"):
+            contrib = self.contributions(df)
+            k = min(top_k, len(self.features))
+            # Unordered top-k, then sort the k survivors
+            top = np.argpartition(-np.abs(contrib), k - 1, axis=1)[:, :k]
+            top_values = np.take_along_axis(contrib, top, axis=1)
+            order = np.argsort(-np.abs(top_values), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+
+            values = df[self.features].to_numpy(dtype=object)
+            explanations = []
+            for row, columns in enumerate(top):
+                explanations.append({
+                    "intercept": round(self.intercept, 6),
+                    "contributions": [
+                        {
+                            "feature": self.features[j],
+                            "kind": self.kinds[j],
+                            "value": plain_value(values[row, j]),
+                            "contribution": round(float(contrib[row, j]), 6),
+                        }
+                        for j in columns
+                    ],
+                })
+        return explanations
+
+
+def plain_value(value: Any) -> Any:
+    """numpy scalar -> Python scalar for JSON serialization."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# Singleton instance
+_explainer_instance: Optional[LinearExplainer] = None
+
+
+def get_explainer() -> LinearExplainer:
+    """Get the explainer for the loaded model (singleton pattern)."""
+    global _explainer_instance
+    if _explainer_instance is None:
+        from app.model import get_model
+        _explainer_instance = LinearExplainer.from_model(get_model())
+    return _explainer_instance
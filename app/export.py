@@ -0,0 +1,130 @@
+"""
+Streaming CSV / NDJSON export of the prediction log and the roster
+
+Rows are read with a server-side cursor (stream_results + yield_per) in
+batches of EXPORT_BATCH_SIZE and each batch is serialized and sent as soon
+as it is read: memory stays flat whatever the number of rows, and clients
+can start processing before the export ends. Predictions include archived
+periods (app.archive), read one file at a time, oldest first, so the
+export is ordered by id.
+"""
+
+import io
+import os
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.archive import PredictionArchive, archived_row, load_archive, overlaps, prediction_archive, select_rows
+from app.database import Employee, Prediction
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+PREDICTION_COLUMNS = (
+    "id", "employee_id", "prediction", "probability", "risk_level", "model_version", "created_at", "archived",
+)
+# Sync bookkeeping columns are not exported
+EMPLOYEE_COLUMNS = tuple(c.name for c in Employee.__table__.columns if c.name not in ("id", "content_hash"))
+
+
+def _cell(value) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def serialize(batches: Iterable[List[Dict[str, Any]]], columns: Iterable[str], fmt: str) -> Iterator[bytes]:
+    """Encode batches of rows as CSV (header first) or NDJSON, one chunk per batch."""
+    columns = list(columns)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        yield buffer.getvalue().encode("utf-8")
+    for batch in batches:
+        if fmt == "csv":
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_cell(row[name]) for name in columns] for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+        else:
+            lines = (json.dumps({name: _cell(row[name]) for name in columns}, ensure_ascii=False) for row in batch)
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _stream(db: Session, statement, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Rows of a SELECT, batch_size at a time, through a server-side cursor."""
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+def _archived_batches(start: Optional[datetime], end: Optional[datetime], risk_level: Optional[str],
+                      employee_id: Optional[int], batch_size: int,
+                      archive: PredictionArchive) -> Iterator[List[Dict[str, Any]]]:
+    """Archived predictions matching the filters, oldest file first, by id."""
+    for path, header in reversed(archive.files()):
+        if not overlaps(header, start, end):
+            continue
+        # Loaded directly, not through the archive's cache meant for paging
+        frame, _ = load_archive(path)
+        selected = select_rows(frame, start, end, risk_level, employee_id)
+        for offset in range(0, len(selected), batch_size):
+            yield [archived_row(frame, i) for i in selected[offset:offset + batch_size]]
+
+
+def prediction_batches(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       risk_level: Optional[str] = None, employee_id: Optional[int] = None,
+                       batch_size: int = EXPORT_BATCH_SIZE,
+                       archive: Optional[PredictionArchive] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Predictions created in [start, end) matching the filters, archive then database, by id."""
+    archive = archive or prediction_archive
+    boundary = archive.boundary()
+    if boundary is not None and (start is None or start < boundary):
+        archive_end = min(end, boundary) if end else boundary
+        yield from _archived_batches(start, archive_end, risk_level, employee_id, batch_size, archive)
+
+    table = Prediction.__table__
+    statement = select(*[table.c[name] for name in PREDICTION_COLUMNS if name != "archived"])
+    hot_start = max(start, boundary) if start and boundary else start or boundary
+    if hot_start is not None:
+        statement = statement.where(table.c.created_at >= hot_start)
+    if end is not None:
+        statement = statement.where(table.c.created_at < end)
+    if risk_level is not None:
+        statement = statement.where(table.c.risk_level == risk_level)
+    if employee_id is not None:
+        statement = statement.where(table.c.employee_id == employee_id)
+    for batch in _stream(db, statement.order_by(table.c.id), batch_size):
+        for row in batch:
+            row["archived"] = False
+        yield batch
+
+
+def employee_batches(db: Session, dataset_type: Optional[str] = None, departement: Optional[str] = None,
+                     start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     include_deleted: bool = False,
+                     batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Employees matching the filters (updated in [start, end) if given), by employee_id."""
+    table = Employee.__table__
+    statement = select(*[table.c[name] for name in EMPLOYEE_COLUMNS])
+    if not include_deleted:
+        statement = statement.where(table.c.deleted_at.is_(None))
+    if dataset_type is not None:
+        statement = statement.where(table.c.dataset_type == dataset_type)
+    if departement is not None:
+        statement = statement.where(table.c.departement == departement)
+    if start is not None:
+        statement = statement.where(table.c.updated_at >= start)
+    if end is not None:
+        statement = statement.where(table.c.updated_at < end)
+    yield from _stream(db, statement.order_by(table.c.employee_id), batch_size)
@@ -24,8 +24,19 @@ class FeatureEngineer:
     Removed (redundant):
     - faible_satisfaction: Threshold of satisfaction_globale (model can learn this)
     - surcharge_travail: Same as heure_supplementaires after one-hot encoding
+
+    The formulas only use .get() and arithmetic, so they also apply
+    column-wise to a pandas DataFrame (vectorized batch scoring).
     """
 
+    ENGINEERED_FEATURES = [
+        'ratio_poste_entreprise',
+        'evolution_evaluation',
+        'satisfaction_globale',
+        'salaire_par_experience',
+        'duree_moyenne_poste'
+    ]
+
     SATISFACTION_COLUMNS = [
         'satisfaction_employee_environnement',
         'satisfaction_employee_nature_travail',
@@ -0,0 +1,166 @@
+"""
+In-process fan-out of newly logged predictions (live feed)
+
+The logging path publishes each committed prediction once; the broadcaster
+copies it into the bounded buffer of every matching subscriber (filters on
+risk_level / employee_id are applied at publish time). Dashboards stream
+from /predictions/stream instead of polling /predictions, so connected
+clients cost no database queries.
+
+A subscriber whose buffer is full is a slow consumer: it is dropped (its
+buffer is replaced by a final "dropped" notice) rather than slowing down
+the writers or growing memory.
+"""
+
+import os
+import json
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+from app.metrics import metrics
+
+FEED_BUFFER_SIZE = int(os.getenv("FEED_BUFFER_SIZE", "256"))
+FEED_MAX_SUBSCRIBERS = int(os.getenv("FEED_MAX_SUBSCRIBERS", "100"))
+# Comment line sent on idle streams so proxies keep the connection open
+FEED_HEARTBEAT_SECONDS = float(os.getenv("FEED_HEARTBEAT_SECONDS", "15"))
+
+# Marker queued after the buffer is cleared for a dropped subscriber
+DROPPED = object()
+
+
+class Subscription:
+    """One feed client: its filters and bounded event buffer."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int,
+                 risk_level: Optional[str] = None, employee_id: Optional[int] = None):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size + 1)  # +1 for DROPPED
+        self.buffer_size = buffer_size
+        self.risk_level = risk_level
+        self.employee_id = employee_id
+        self.dropped = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return ((self.risk_level is None or event["risk_level"] == self.risk_level)
+                and (self.employee_id is None or event["employee_id"] == self.employee_id))
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Buffer an event (event loop thread only). False if the buffer overflowed."""
+        if self.queue.qsize() >= self.buffer_size:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(DROPPED)
+            return False
+        self.queue.put_nowait(event)
+        return True
+
+
+class Broadcaster:
+    """Fans out published predictions to subscribers, thread-safe."""
+
+    def __init__(self, buffer_size: int = FEED_BUFFER_SIZE, max_subscribers: int = FEED_MAX_SUBSCRIBERS):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def n_subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, risk_level: Optional[str] = None, employee_id: Optional[int] = None) -> Subscription:
+        """
+        Register a subscriber bound to the running event loop.
+
+        Raises:
+            RuntimeError: Too many subscribers
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size, risk_level, employee_id)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise RuntimeError(f"Too many feed subscribers (max {self.max_subscribers})")
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        """Deliver events to matching subscribers (callable from any thread)."""
+        if not self._subscribers:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += len(events)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        for subscription in subscribers:
+            matching = [event for event in events if subscription.matches(event)]
+            if not matching:
+                continue
+            if subscription.loop is running:
+                self._deliver(subscription, matching)
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, matching)
+
+    def _deliver(self, subscription: Subscription, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            if subscription.dropped:
+                return
+            if not subscription.offer(event):
+                self.unsubscribe(subscription)
+                with self._lock:
+                    self.dropped += 1
+                return
+
+    async def stream(self, subscription: Subscription,
+                     heartbeat: float = FEED_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+        """
+        Server-Sent Events of a subscription: one `prediction` event per
+        logged prediction, a final `dropped` event for slow consumers.
+        Unsubscribes when the client disconnects.
+        """
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is DROPPED:
+                    yield 'event: dropped\ndata: {"reason": "slow consumer"}\n\n'
+                    return
+                yield f"id: {event['id']}\nevent: prediction\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, float]:
+        return {"subscribers": self.n_subscribers, "published": self.published, "dropped": self.dropped}
+
+
+def prediction_event(prediction) -> Dict[str, Any]:
+    """Feed payload of a logged prediction (same fields as GET /predictions)."""
+    return {
+        "id": prediction.id,
+        "employee_id": prediction.employee_id,
+        "prediction": prediction.prediction,
+        "probability": prediction.probability,
+        "risk_level": prediction.risk_level,
+        "created_at": prediction.created_at.isoformat() if prediction.created_at else None,
+    }
+
+
+# Singleton instance
+broadcaster = Broadcaster()
+
+metrics.register_gauge("attrition_feed", "Live prediction feed subscribers and event counts", broadcaster.stats)
@@ -0,0 +1,92 @@
+"""
+HTTP conditional requests (ETag / Last-Modified)
+
+Read-mostly endpoints derive a strong ETag from the versions their response
+depends on (model artifacts, live evaluation counters, employee record or
+roster stamp) before computing anything. A client sending back a matching
+If-None-Match (or, without it, a recent enough If-Modified-Since) gets an
+empty 304 Not Modified; browsers do this on their own for responses carrying
+validators, so the frontend needs no change.
+"""
+
+import os
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app import __version__
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "300"))
+
+# Model artifacts only change on a deploy: cacheable for a while by anyone
+STATIC_CACHE_CONTROL = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+# Live or per-user data: always revalidated (cheap with a 304)
+REVALIDATE_CACHE_CONTROL = "no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag of the given version parts (and the API version)."""
+    digest = hashlib.sha256(repr((__version__,) + parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def http_date(ts: datetime) -> str:
+    """IMF-fixdate of a naive UTC (or aware) datetime."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return format_datetime(ts.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of If-None-Match (list, W/ prefixes or *) with an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """True if the client's cached copy is current (If-None-Match takes precedence)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        return not_modified_since(if_modified_since, last_modified)
+    return False
+
+
+def validators(etag: str, last_modified: Optional[datetime], cache_control: str) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def conditional(request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None,
+                cache_control: str = REVALIDATE_CACHE_CONTROL) -> Optional[Response]:
+    """
+    A 304 response if the client's copy is current, else None after setting
+    the validators on the endpoint's response.
+    """
+    headers = validators(etag, last_modified, cache_control)
+    if request.method in ("GET", "HEAD") and is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,172 @@
+"""
+Idempotency keys for the prediction endpoints
+
+Clients retrying POST /predict or /predict/batch after a timeout send the
+same Idempotency-Key header: the first completed response is kept in a
+bounded in-process store for IDEMPOTENCY_TTL_SECONDS and replayed (same
+prediction ids, no new rows, no inference) as long as the request body
+matches. A duplicate arriving while the first request is still running waits
+for it instead of computing again; if the first one fails, nothing is stored
+and the next attempt runs. Reusing a key for another body is rejected.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.metrics import metrics
+
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyConflict(ValueError):
+    """The key was already used for a different request."""
+
+
+def request_fingerprint(*parts) -> str:
+    """Hash of the endpoint and its canonical JSON body and parameters."""
+    content = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class IdempotencyEntry:
+    """One key: in flight until `done` is set, then holds the response."""
+
+    __slots__ = ("fingerprint", "done", "response", "expires_at")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.response: Any = None
+        self.expires_at = float("inf")
+
+
+class IdempotencyStore:
+    """Bounded, TTL-limited map of idempotency keys to responses."""
+
+    def __init__(self, max_keys: int = IDEMPOTENCY_MAX_KEYS, ttl: float = IDEMPOTENCY_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, IdempotencyEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.waits = 0
+        self.conflicts = 0
+        self.evictions = 0
+
+    def _purge(self, now: float) -> None:
+        # Completed entries are moved to the end, so expired ones sit at the front
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+    def reserve(self, key: str, fingerprint: str) -> Tuple[IdempotencyEntry, bool]:
+        """
+        Entry of the key and whether the caller owns it (must compute and
+        then call complete() or abandon()).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                entry = self._entries[key] = IdempotencyEntry(fingerprint)
+                while len(self._entries) > self.max_keys:
+                    # Waiters keep their reference to an evicted in-flight entry
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+                return entry, True
+            if entry.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict("Idempotency-Key already used for a different request")
+            if entry.done.is_set():
+                self.replays += 1
+            else:
+                self.waits += 1
+            return entry, False
+
+    def complete(self, key: str, entry: IdempotencyEntry, response: Any) -> None:
+        """Store the response of an owned entry and wake up the waiters."""
+        with self._lock:
+            entry.response = response
+            entry.expires_at = time.monotonic() + self.ttl
+            if self._entries.get(key) is entry:
+                self._entries.move_to_end(key)
+        entry.done.set()
+
+    def abandon(self, key: str, entry: IdempotencyEntry) -> None:
+        """Forget an owned entry whose computation failed (the next attempt runs)."""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._entries),
+            "max_keys": self.max_keys,
+            "replays": self.replays,
+            "waits": self.waits,
+            "conflicts": self.conflicts,
+            "evictions": self.evictions,
+        }
+
+
+async def run_idempotent(key: Optional[str], fingerprint: str, response: Response, compute: Callable[[], Any],
+                         store: Optional[IdempotencyStore] = None, wait: float = IDEMPOTENCY_WAIT_SECONDS) -> Any:
+    """
+    compute() once per key: replays a stored response, waits for an
+    in-flight one, or runs it (always runs without a key).
+    """
+    if key is None:
+        return compute()
+    store = store or idempotency_store
+    while True:
+        try:
+            entry, owner = store.reserve(key, fingerprint)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if owner:
+            break
+        if not entry.done.is_set():
+            await run_in_threadpool(entry.done.wait, wait)
+        if entry.response is not None:
+            response.headers[REPLAY_HEADER] = "true"
+            return entry.response
+        if not entry.done.is_set():
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        # The first attempt failed: run it again
+
+    try:
+        result = compute()
+    except BaseException:
+        store.abandon(key, entry)
+        raise
+    store.complete(key, entry, result)
+    return result
+
+
+# Singleton instance
+idempotency_store = IdempotencyStore()
+
+metrics.register_gauge("attrition_idempotency", "Idempotency key store size and counters", idempotency_store.stats)
@@ -2,25 +2,68 @@
 FastAPI application for Employee Attrition Prediction
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
+from fastapi.responses import PlainTextResponse, FileResponse, StreamingResponse
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app import __version__
 from app.model import get_model
-from app.database import get_db, log_prediction, get_employee_by_id, get_employees, get_predictions, Prediction, Employee
-from app.feature_engineering import feature_engineer
+from app.database import (
+    get_db, log_prediction, get_employees, get_employees_by_department,
+    log_predictions, get_prediction_rollups, get_prediction_totals, get_prediction_with_input,
+    PredictionRollup,
+)
+from app.feature_engineering import FeatureEngineer, feature_engineer
+from app.metrics import metrics, MetricsMiddleware, mark_handler_start, mark_handler_end
+from app.profiling import ProfilingMiddleware, profile_store, is_admin
+from app.tracing import TracingMiddleware, tracer, stage, span, is_traced
+from app.drift import drift_monitor
+from app.evaluation import evaluator, backfill_test_split
+from app.explain import get_explainer
+from app.whatif import axis_values, sweep
+from app.counterfactual import CounterfactualEngine
+from app.roster import roster, filter_mask, top_at_risk, risk_aggregates
+from app.simulation import simulator
+from app.feed import broadcaster
+from app.employee_cache import employee_cache, EmployeeRecord, EMPLOYEE_FIELDS
+from app.http_cache import (
+    conditional, make_etag, STATIC_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, PRIVATE_CACHE_CONTROL,
+)
+from app.idempotency import request_fingerprint, run_idempotent
+from app.archive import prediction_archive, list_predictions as list_archived_predictions
+from app.export import (
+    MEDIA_TYPES, PREDICTION_COLUMNS, EMPLOYEE_COLUMNS, serialize, prediction_batches, employee_batches,
+)
 from app.schemas import (
     EmployeeInput,
     EngineeredFeatures,
+    Explanation,
     PredictionOutput,
     PredictionResponse,
     BatchPredictionRequest,
     BatchPredictionResponse,
     ModelInfo,
     HealthCheck,
+    WhatIfRequest,
+    WhatIfResponse,
+    CounterfactualRequest,
+    CounterfactualResult,
+    DepartmentCounterfactuals,
+    RiskLevel,
+    SimulationScenario,
+    SimulationResult,
+    GroupField,
+    Leaderboard,
+    RiskAggregates,
+    StatsGranularity,
+    ExportFormat,
+    PredictionCounts,
+    PredictionStats,
 )
 
 # Initialize FastAPI app
@@ -37,10 +80,23 @@ app = FastAPI(
     - **GET /health** - Vérifier l'état de l'API
     - **POST /predict** - Prédire l'attrition pour un employé
     - **POST /predict/batch** - Prédictions pour plusieurs employés
+    - **POST /predict/whatif** - Sensibilité du risque à une ou deux variables
+    - **POST /predict/counterfactual** - Changements minimaux pour baisser le risque
+    - **GET /departments/{departement}/counterfactuals** - Idem pour tout un département
+    - **POST /simulate** - Simulation d'une politique RH sur tout l'effectif
+    - **GET /risk/leaderboard** - Top-K des employés les plus à risque
+    - **GET /risk/aggregates** - Risque agrégé par département, poste, domaine ou niveau
     - **GET /model/info** - Informations sur le modèle
     - **GET /employees** - Liste des employés en base
     - **GET /employees/{id}/predict** - Prédire pour un employé en base
     - **GET /predictions** - Historique des prédictions
+    - **GET /predictions/stats** - Statistiques des prédictions (totaux et par minute/heure/jour)
+    - **GET /predictions/stream** - Flux temps réel des nouvelles prédictions (Server-Sent Events)
+    - **GET /metrics** - Métriques Prometheus (latence par étape, compteurs)
+    - **GET /profiles** - Profils de requêtes (admin, header X-Admin-Token)
+    - **GET /traces** - Traces des requêtes récentes (admin)
+    - **GET /drift** - Dérive des entrées par rapport aux données d'entraînement (PSI/KS)
+    - **GET /evaluation** - Métriques en ligne sur les prédictions labellisées
     """,
     version=__version__,
     docs_url="/docs",
@@ -56,6 +112,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request tracing (must run inside MetricsMiddleware, see app.tracing)
+app.add_middleware(TracingMiddleware)
+
+# Request latency and per-stage timings (exposed on /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# On-demand profiling (outermost so the serialization stage is included)
+app.add_middleware(ProfilingMiddleware)
+
+
+def engineer_features_timed(raw_data: dict) -> dict:
+    """Compute engineered features and record the stage latency."""
+    with stage("engineer_features"):
+        return feature_engineer.engineer_features(raw_data)
+
+
+def monitor_drift(full_data: dict) -> None:
+    """Feed one prediction input to the drift monitor."""
+    with stage("drift_update"):
+        drift_monitor.update(full_data)
+
+
+def naive_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    """Query timestamp as naive UTC, the form stored in the database."""
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def export_response(name: str, fmt: ExportFormat, columns, batches) -> StreamingResponse:
+    """Streamed download, one chunk per batch of rows."""
+    filename = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%SZ}.{fmt.value}"
+    return StreamingResponse(
+        serialize(batches, columns, fmt.value),
+        media_type=MEDIA_TYPES[fmt.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+
+def employee_raw_data(employee: EmployeeRecord) -> dict:
+    """Raw input features (EmployeeInput fields) of an employee record."""
+    return {name: getattr(employee, name) for name in EmployeeInput.model_fields}
+
+
+def explain_rows(rows: List[dict], top_k: int) -> List[Explanation]:
+    """Top-k feature contributions for all rows in one vectorized pass."""
+    return [Explanation(**e) for e in get_explainer().explain(pd.DataFrame(rows), top_k)]
+
+
+# Optional ?explain=k query parameter of the predict endpoints
+ExplainTopK = Query(0, ge=0, le=35, description="Nombre de features explicatives a renvoyer (0 = aucune)")
+IdempotencyKey = Header(None, alias="Idempotency-Key", min_length=1, max_length=255,
+                        description="Cle de rejeu: meme cle et meme corps renvoient la premiere reponse")
+
 
 @app.get("/", tags=["Health"])
 async def root():
@@ -83,21 +193,113 @@ async def health_check():
     )
 
 
-@app.post("/predict", response_model=PredictionResponse, tags=["Predictions"])
-async def predict(employee: EmployeeInput, db: Session = Depends(get_db)):
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency, request counters, batch sizes, pool state."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
     """
-    Predict attrition risk for a single employee.
+    Dependency restricting admin endpoints to the admin token. It is read
+    from X-Admin-Token, not X-Profile-Token, so admin calls are not profiled.
+    """
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
 
-    HR provides raw employee data. Engineered features are computed server-side.
-    Returns prediction (0/1), probability, and risk level (low/medium/high).
-    All predictions are logged to the database.
+
+@app.get("/profiles", tags=["Profiling"], dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List stored request profiles (most recent first)."""
+    profiles = profile_store.list()
+    return {"profiles": profiles, "count": len(profiles)}
+
+
+@app.get("/profiles/{profile_id}", tags=["Profiling"], dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    """Get a profile: per-stage breakdown and collapsed stacks."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return profile
+
+
+@app.get("/profiles/{profile_id}/speedscope", tags=["Profiling"], dependencies=[Depends(require_admin)])
+async def get_profile_speedscope(profile_id: str):
+    """Get a profile in speedscope format (open with https://www.speedscope.app)."""
+    path = profile_store.speedscope_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
+
+
+@app.get("/traces", tags=["Profiling"], dependencies=[Depends(require_admin)])
+async def list_traces(min_duration_ms: float = 0.0, limit: int = 50):
+    """List recent traces (most recent first), optionally only the slow ones."""
+    traces = tracer.exporter.list(min_duration_ms=min_duration_ms, limit=limit)
+    return {"traces": traces, "count": len(traces)}
+
+
+@app.get("/traces/{trace_id}", tags=["Profiling"], dependencies=[Depends(require_admin)])
+async def get_trace(trace_id: str):
+    """Get all spans of a trace."""
+    trace = tracer.exporter.get(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail=f"Trace {trace_id} not found")
+    return trace
+
+
+@app.get("/drift", tags=["Model"])
+async def drift_report():
+    """
+    Data drift of live inputs against the training distribution.
+
+    PSI (and KS for numerical features) per feature, computed from
+    streaming sketches updated on every prediction.
     """
+    return drift_monitor.report()
+
+
+@app.post("/drift/reset", tags=["Model"], dependencies=[Depends(require_admin)])
+async def drift_reset():
+    """Clear the live sketches to start a new observation window."""
+    drift_monitor.reset()
+    return {"status": "reset"}
+
+
+@app.get("/evaluation", tags=["Model"])
+async def evaluation_report():
+    """
+    Live accuracy, precision, recall, F1 and AUC on labeled predictions.
+
+    Updated incrementally by /employees/{id}/predict (ground truth from
+    employees.attrition_actual) and by the test split backfill.
+    """
+    return evaluator.report()
+
+
+@app.post("/evaluation/backfill", tags=["Model"], dependencies=[Depends(require_admin)])
+async def evaluation_backfill(reset: bool = True, db: Session = Depends(get_db)):
+    """Rescore the labeled `test` split in one vectorized call."""
+    if reset:
+        evaluator.reset()
+    try:
+        n_rows = backfill_test_split(db, get_model(), evaluator)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Backfill error: {str(e)}")
+    return {"rows_scored": n_rows, **evaluator.report()}
+
+
+def score_employee(employee: EmployeeInput, explain: int, db: Session) -> PredictionResponse:
+    """Score, explain and log one employee (body of POST /predict)."""
+    mark_handler_start()
     try:
         model = get_model()
         raw_data = employee.model_dump()
 
         # Compute engineered features server-side
-        full_data = feature_engineer.engineer_features(raw_data)
+        full_data = engineer_features_timed(raw_data)
+        monitor_drift(full_data)
 
         # Make prediction with complete feature set
         result = model.predict(full_data)
@@ -120,47 +322,71 @@ async def predict(employee: EmployeeInput, db: Session = Depends(get_db)):
             duree_moyenne_poste=full_data["duree_moyenne_poste"],
         )
 
-        return PredictionResponse(
+        response = PredictionResponse(
             prediction_id=db_prediction.id,
             result=PredictionOutput(**result),
             engineered_features=engineered,
+            explanation=explain_rows([full_data], explain)[0] if explain else None,
             timestamp=datetime.now(),
         )
+        metrics.observe_batch(1)
+        mark_handler_end()
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
-@app.post("/predict/batch", response_model=BatchPredictionResponse, tags=["Predictions"])
-async def predict_batch(request: BatchPredictionRequest, db: Session = Depends(get_db)):
+@app.post("/predict", response_model=PredictionResponse, tags=["Predictions"])
+async def predict(employee: EmployeeInput, response: Response, explain: int = ExplainTopK,
+                  idempotency_key: Optional[str] = IdempotencyKey, db: Session = Depends(get_db)):
     """
-    Predict attrition risk for multiple employees.
+    Predict attrition risk for a single employee.
 
     HR provides raw employee data. Engineered features are computed server-side.
-    Accepts a list of employees and returns predictions for each.
-    All predictions are logged to the database.
+    Returns prediction (0/1), probability, and risk level (low/medium/high).
+    With ?explain=k, also returns the k features contributing most to the risk.
+    All predictions are logged to the database. Retries with the same
+    Idempotency-Key and body replay the first response.
     """
+    fingerprint = request_fingerprint("/predict", employee.model_dump(), explain)
+    return await run_idempotent(idempotency_key, fingerprint, response,
+                                lambda: score_employee(employee, explain, db))
+
+
+def score_batch(request: BatchPredictionRequest, explain: int, db: Session) -> BatchPredictionResponse:
+    """Score, explain and log a batch in one transaction (body of POST /predict/batch)."""
+    mark_handler_start()
     try:
         model = get_model()
-        predictions = []
+        rows = []
+        # Per-row spans only when the request is traced
+        traced = is_traced()
 
-        for employee in request.employees:
-            raw_data = employee.model_dump()
+        for index, employee in enumerate(request.employees):
+            with span("batch.row", index=index) if traced else nullcontext():
+                raw_data = employee.model_dump()
 
-            # Compute engineered features server-side
-            full_data = feature_engineer.engineer_features(raw_data)
+                # Compute engineered features server-side
+                full_data = engineer_features_timed(raw_data)
+                monitor_drift(full_data)
+                rows.append(full_data)
 
-            # Make prediction with complete feature set
-            result = model.predict(full_data)
+        # Score the whole batch in one vectorized pass
+        results = model.predict_batch(rows)
 
-            # Log to database (store raw + engineered data)
-            db_prediction = log_prediction(
-                db=db,
-                input_data=full_data,
-                prediction=result["prediction"],
-                probability=result["probability"],
-                risk_level=result["risk_level"]
-            )
+        # Log the whole batch in one transaction (store raw + engineered data)
+        prediction_ids = log_predictions(db, [
+            {
+                "input_data": full_data,
+                "prediction": result["prediction"],
+                "probability": result["probability"],
+                "risk_level": result["risk_level"],
+            }
+            for full_data, result in zip(rows, results)
+        ])
 
+        predictions = []
+        for full_data, result, prediction_id in zip(rows, results, prediction_ids):
             # Extract engineered features for response (5 features)
             engineered = EngineeredFeatures(
                 ratio_poste_entreprise=full_data["ratio_poste_entreprise"],
@@ -172,13 +398,19 @@ async def predict_batch(request: BatchPredictionRequest, db: Session = Depends(g
 
             predictions.append(
                 PredictionResponse(
-                    prediction_id=db_prediction.id,
+                    prediction_id=prediction_id,
                     result=PredictionOutput(**result),
                     engineered_features=engineered,
                     timestamp=datetime.now(),
                 )
             )
 
+        if explain and rows:
+            for prediction, explanation in zip(predictions, explain_rows(rows, explain)):
+                prediction.explanation = explanation
+
+        metrics.observe_batch(len(predictions))
+        mark_handler_end()
         return BatchPredictionResponse(
             predictions=predictions,
             count=len(predictions),
@@ -187,22 +419,223 @@ async def predict_batch(request: BatchPredictionRequest, db: Session = Depends(g
         raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
 
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse, tags=["Predictions"])
+async def predict_batch(request: BatchPredictionRequest, response: Response, explain: int = ExplainTopK,
+                        idempotency_key: Optional[str] = IdempotencyKey, db: Session = Depends(get_db)):
+    """
+    Predict attrition risk for multiple employees.
+
+    HR provides raw employee data. Engineered features are computed server-side.
+    Accepts a list of employees and returns predictions for each.
+    With ?explain=k, explanations are computed for the whole batch at once.
+    All predictions are logged to the database. Retries with the same
+    Idempotency-Key and body replay the first response.
+    """
+    fingerprint = request_fingerprint("/predict/batch", request.model_dump(), explain)
+    return await run_idempotent(idempotency_key, fingerprint, response,
+                                lambda: score_batch(request, explain, db))
+
+
+@app.post("/predict/whatif", response_model=WhatIfResponse, tags=["Predictions"])
+async def predict_whatif(request: WhatIfRequest):
+    """
+    How the attrition risk of an employee changes when one or two inputs vary.
+
+    Each axis sweeps a raw feature over explicit values, a numeric range
+    (start/stop/steps) or, for categoricals, all known categories. Engineered
+    features are recomputed and the whole grid is scored at once. Nothing is
+    logged to the database.
+    """
+    try:
+        model = get_model()
+        raw_data = request.employee.model_dump()
+        base = model.predict(engineer_features_timed(raw_data))
+
+        axes = [
+            {"feature": axis.feature,
+             "values": axis_values(axis.feature, axis.values, axis.start, axis.stop,
+                                   axis.steps, model.categories)}
+            for axis in request.axes
+        ]
+        if len(axes) == 2 and axes[0]["feature"] == axes[1]["feature"]:
+            raise ValueError("The two axes must sweep different features")
+        surface = sweep(model, raw_data, axes)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"What-if error: {str(e)}")
+    return WhatIfResponse(base=PredictionOutput(**base), **surface)
+
+
+@app.post("/predict/counterfactual", response_model=CounterfactualResult, tags=["Predictions"])
+async def predict_counterfactual(request: CounterfactualRequest):
+    """
+    Cheapest actionable changes that bring an employee to the target risk level.
+
+    Only actionable features are changed (overtime, travel, salary, raise,
+    satisfaction, training, promotion); `weights` restricts them and sets
+    the cost of each step. Counterfactuals are ranked by total cost.
+    """
+    if request.target_risk == RiskLevel.high:
+        raise HTTPException(status_code=422, detail="target_risk must be low or medium")
+    try:
+        engine = CounterfactualEngine(get_model())
+        result = engine.search([request.employee.model_dump()], request.target_risk.value,
+                               request.weights, request.max_results)[0]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Counterfactual error: {str(e)}")
+    return CounterfactualResult(**result)
+
+
+@app.get("/departments/{departement}/counterfactuals", response_model=DepartmentCounterfactuals,
+         tags=["Employees"])
+async def department_counterfactuals(
+    departement: str,
+    target_risk: RiskLevel = RiskLevel.low,
+    max_results: int = Query(3, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Counterfactuals for every employee of a department above the target risk.
+
+    All employees are searched in one batch; employees already at target
+    are omitted from the results.
+    """
+    if target_risk == RiskLevel.high:
+        raise HTTPException(status_code=422, detail="target_risk must be low or medium")
+    employees = get_employees_by_department(db, departement)
+    if not employees:
+        raise HTTPException(status_code=404, detail=f"Department {departement} not found")
+
+    try:
+        engine = CounterfactualEngine(get_model())
+        results = engine.search([employee_raw_data(e) for e in employees], target_risk.value,
+                                max_results=max_results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Counterfactual error: {str(e)}")
+
+    above = [
+        CounterfactualResult(employee_id=e.employee_id, **r)
+        for e, r in zip(employees, results) if r["status"] != "at_target"
+    ]
+    return DepartmentCounterfactuals(
+        departement=departement,
+        target_risk=target_risk,
+        n_employees=len(employees),
+        n_above_target=len(above),
+        n_found=sum(r.status == "found" for r in above),
+        results=above,
+    )
+
+
+def roster_filters(
+    departement: Optional[str] = None,
+    poste: Optional[str] = None,
+    domaine_etude: Optional[str] = None,
+    niveau_hierarchique_poste: Optional[int] = None,
+    dataset_type: Optional[str] = None,
+) -> dict:
+    """Optional equality filters on the roster snapshot."""
+    return {
+        "departement": departement,
+        "poste": poste,
+        "domaine_etude": domaine_etude,
+        "niveau_hierarchique_poste": niveau_hierarchique_poste,
+        "dataset_type": dataset_type,
+    }
+
+
+@app.get("/risk/leaderboard", response_model=Leaderboard, tags=["Risk"])
+async def risk_leaderboard(
+    k: int = Query(50, ge=1, le=1000),
+    filters: dict = Depends(roster_filters),
+    db: Session = Depends(get_db)
+):
+    """
+    The k employees with the highest attrition probability.
+
+    Served from the scored roster snapshot (partial sort, no rescoring);
+    optional filters on departement, poste, domaine_etude,
+    niveau_hierarchique_poste and dataset_type.
+    """
+    frame = roster.get(db)
+    mask = filter_mask(frame, filters)
+    employees = top_at_risk(frame, k, mask)
+    return Leaderboard(
+        roster_version=roster.version,
+        n_matching=int(mask.sum()),
+        count=len(employees),
+        employees=employees,
+    )
+
+
+@app.get("/risk/aggregates", response_model=RiskAggregates, tags=["Risk"])
+async def risk_by_group(
+    by: GroupField = GroupField.departement,
+    filters: dict = Depends(roster_filters),
+    db: Session = Depends(get_db)
+):
+    """
+    Count, mean probability, expected departures and risk-level mix per
+    group, from the scored roster snapshot.
+    """
+    frame = roster.get(db)
+    mask = filter_mask(frame, filters)
+    return RiskAggregates(
+        roster_version=roster.version,
+        by=by,
+        n_employees=int(mask.sum()),
+        groups=risk_aggregates(frame, by.value, mask),
+    )
+
+
+@app.post("/simulate", response_model=SimulationResult, tags=["Simulation"])
+async def simulate(scenario: SimulationScenario, db: Session = Depends(get_db)):
+    """
+    Estimate the effect of an HR policy on the whole roster.
+
+    Employees matching the filter get the actions applied, everyone is
+    rescored in one pass, and the before/after risk distribution and
+    expected departures per department are returned. Results are cached
+    by scenario hash until the roster snapshot is reloaded.
+    """
+    try:
+        frame = roster.get(db)
+        result = simulator.run(frame, roster.version, scenario.model_dump(), get_model())
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+    return SimulationResult(**result)
+
+
 @app.get("/model/info", response_model=ModelInfo, tags=["Model"])
-async def model_info():
-    """Get model information and performance metrics."""
+async def model_info(request: Request, response: Response):
+    """Get model information and performance metrics (conditional GET)."""
     try:
         model = get_model()
+        not_modified = conditional(request, response, make_etag("model_info", model.version, evaluator.version),
+                                   max(model.last_modified, evaluator.updated_at), REVALIDATE_CACHE_CONTROL)
+        if not_modified:
+            return not_modified
         info = model.get_model_info()
+        info["live_metrics"] = evaluator.report()
         return ModelInfo(**info)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting model info: {str(e)}")
 
 
 @app.get("/model/features", tags=["Model"])
-async def model_features():
-    """Get list of features used by the model."""
+async def model_features(request: Request, response: Response):
+    """Get list of features used by the model (conditional GET)."""
     try:
         model = get_model()
+        not_modified = conditional(request, response, make_etag("model_features", model.version),
+                                   model.last_modified, STATIC_CACHE_CONTROL)
+        if not_modified:
+            return not_modified
         return {
             "features": model.feature_names,
             "categorical": model.categorical_features,
@@ -215,6 +648,8 @@ async def model_features():
 
 @app.get("/employees", tags=["Employees"])
 async def list_employees(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     dataset_type: Optional[str] = None,
@@ -225,6 +660,12 @@ async def list_employees(
 
     Filter by dataset_type: 'train' or 'test' (optional)
     """
+    stamp = employee_cache.version(db)
+    last_modified = max((ts for ts in stamp[1:] if ts is not None), default=None)
+    not_modified = conditional(request, response, make_etag("employees", stamp, skip, limit, dataset_type),
+                               last_modified, PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
     employees = get_employees(db, skip=skip, limit=limit, dataset_type=dataset_type)
     return {
         "employees": [
@@ -247,12 +688,39 @@ async def list_employees(
     }
 
 
+@app.get("/employees/export", tags=["Employees"])
+async def export_employees(
+    format: ExportFormat = ExportFormat.csv,
+    dataset_type: Optional[str] = None,
+    departement: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Updated at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Updated before (UTC)"),
+    include_deleted: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Download the employees (raw columns) as CSV or NDJSON, streamed in
+    batches from a server-side cursor.
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    batches = employee_batches(db, dataset_type=dataset_type, departement=departement,
+                               start=start, end=end, include_deleted=include_deleted)
+    return export_response("employees", format, EMPLOYEE_COLUMNS, batches)
+
+
 @app.get("/employees/{employee_id}", tags=["Employees"])
-async def get_employee(employee_id: int, db: Session = Depends(get_db)):
-    """Get a specific employee by ID."""
-    employee = get_employee_by_id(db, employee_id)
+async def get_employee(employee_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Get a specific employee by ID (conditional GET, no database access on a cache hit)."""
+    employee = employee_cache.get(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail=f"Employee {employee_id} not found")
+    etag = make_etag("employee", tuple(getattr(employee, name) for name in EMPLOYEE_FIELDS))
+    not_modified = conditional(request, response, etag, employee.updated_at or employee.created_at,
+                               PRIVATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
 
     return {
         "employee_id": employee.employee_id,
@@ -263,20 +731,22 @@ async def get_employee(employee_id: int, db: Session = Depends(get_db)):
         "poste": employee.poste,
         "revenu_mensuel": employee.revenu_mensuel,
         "annees_dans_l_entreprise": employee.annees_dans_l_entreprise,
-        "satisfaction_globale": employee.satisfaction_globale,
-        "heure_supplementaires": "Oui" if employee.surcharge_travail else "Non",
+        "satisfaction_globale": FeatureEngineer.compute_satisfaction_globale(employee_raw_data(employee)),
+        "heure_supplementaires": employee.heure_supplementaires,
         "attrition_actual": employee.attrition_actual
     }
 
 
 @app.get("/employees/{employee_id}/predict", response_model=PredictionResponse, tags=["Employees"])
-async def predict_employee(employee_id: int, db: Session = Depends(get_db)):
+async def predict_employee(employee_id: int, explain: int = ExplainTopK, db: Session = Depends(get_db)):
     """
     Predict attrition for an employee from the database.
 
     Uses raw employee data from DB and computes engineered features server-side.
+    With ?explain=k, also returns the k features contributing most to the risk.
     """
-    employee = get_employee_by_id(db, employee_id)
+    mark_handler_start()
+    employee = employee_cache.get(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail=f"Employee {employee_id} not found")
 
@@ -284,41 +754,11 @@ async def predict_employee(employee_id: int, db: Session = Depends(get_db)):
         model = get_model()
 
         # Build RAW input data from employee record (no engineered features)
-        raw_data = {
-            "genre": employee.genre,
-            "statut_marital": employee.statut_marital,
-            "departement": employee.departement,
-            "poste": employee.poste,
-            "heure_supplementaires": employee.heure_supplementaires,
-            "augementation_salaire_precedente": employee.augementation_salaire_precedente,
-            "domaine_etude": employee.domaine_etude,
-            "ayant_enfants": employee.ayant_enfants,
-            "frequence_deplacement": employee.frequence_deplacement,
-            "age": employee.age,
-            "revenu_mensuel": employee.revenu_mensuel,
-            "nombre_experiences_precedentes": employee.nombre_experiences_precedentes,
-            "nombre_heures_travailless": employee.nombre_heures_travailless,
-            "annee_experience_totale": employee.annee_experience_totale,
-            "annees_dans_l_entreprise": employee.annees_dans_l_entreprise,
-            "annees_dans_le_poste_actuel": employee.annees_dans_le_poste_actuel,
-            "satisfaction_employee_environnement": employee.satisfaction_employee_environnement,
-            "note_evaluation_precedente": employee.note_evaluation_precedente,
-            "niveau_hierarchique_poste": employee.niveau_hierarchique_poste,
-            "satisfaction_employee_nature_travail": employee.satisfaction_employee_nature_travail,
-            "satisfaction_employee_equipe": employee.satisfaction_employee_equipe,
-            "satisfaction_employee_equilibre_pro_perso": employee.satisfaction_employee_equilibre_pro_perso,
-            "note_evaluation_actuelle": employee.note_evaluation_actuelle,
-            "nombre_participation_pee": employee.nombre_participation_pee,
-            "nb_formations_suivies": employee.nb_formations_suivies,
-            "nombre_employee_sous_responsabilite": employee.nombre_employee_sous_responsabilite,
-            "distance_domicile_travail": employee.distance_domicile_travail,
-            "niveau_education": employee.niveau_education,
-            "annees_depuis_la_derniere_promotion": employee.annees_depuis_la_derniere_promotion,
-            "annes_sous_responsable_actuel": employee.annes_sous_responsable_actuel,
-        }
+        raw_data = employee_raw_data(employee)
 
         # Compute engineered features server-side
-        full_data = feature_engineer.engineer_features(raw_data)
+        full_data = engineer_features_timed(raw_data)
+        monitor_drift(full_data)
 
         result = model.predict(full_data)
 
@@ -332,6 +772,12 @@ async def predict_employee(employee_id: int, db: Session = Depends(get_db)):
             employee_id=employee_id
         )
 
+        # Ground truth is known for held-out employees: update live metrics
+        # (training rows would inflate them; a repeated lookup replaces the previous one)
+        if employee.attrition_actual is not None and employee.dataset_type != "train":
+            evaluator.update(employee.attrition_actual, result["prediction"], result["probability"],
+                             employee_id=employee_id)
+
         # Extract engineered features for response (5 features)
         engineered = EngineeredFeatures(
             ratio_poste_entreprise=full_data["ratio_poste_entreprise"],
@@ -341,45 +787,132 @@ async def predict_employee(employee_id: int, db: Session = Depends(get_db)):
             duree_moyenne_poste=full_data["duree_moyenne_poste"],
         )
 
-        return PredictionResponse(
+        response = PredictionResponse(
             prediction_id=db_prediction.id,
             employee_id=employee_id,
             result=PredictionOutput(**result),
             engineered_features=engineered,
+            explanation=explain_rows([full_data], explain)[0] if explain else None,
             timestamp=datetime.now(),
         )
+        metrics.observe_batch(1)
+        mark_handler_end()
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
 @app.get("/predictions", tags=["Predictions"])
-async def list_predictions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get history of predictions from the database."""
-    predictions = get_predictions(db, skip=skip, limit=limit)
+async def list_predictions(
+    skip: int = 0,
+    limit: int = 100,
+    start: Optional[datetime] = Query(None, description="Created at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Created before (UTC)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get history of predictions, newest first, optionally over a time range.
+    Periods past the retention window are read from the archive files.
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    predictions = list_archived_predictions(db, skip=skip, limit=limit, start=start, end=end)
     return {
-        "predictions": [
-            {
-                "id": p.id,
-                "employee_id": p.employee_id,
-                "prediction": p.prediction,
-                "probability": p.probability,
-                "risk_level": p.risk_level,
-                "created_at": p.created_at.isoformat() if p.created_at else None
-            }
-            for p in predictions
-        ],
+        "predictions": predictions,
         "count": len(predictions),
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
     }
 
 
+def rollup_counts(rollup: Optional[PredictionRollup], with_bucket: bool = True) -> PredictionCounts:
+    """Response counters of a rollup bucket (zeros when absent)."""
+    n = rollup.n_predictions if rollup else 0
+    return PredictionCounts(
+        bucket_start=rollup.bucket_start if rollup and with_bucket else None,
+        total_predictions=n,
+        attrition_predicted=rollup.n_attrition if rollup else 0,
+        no_attrition_predicted=n - rollup.n_attrition if rollup else 0,
+        avg_probability=round(rollup.sum_probability / n, 4) if n else None,
+        risk_levels={level: getattr(rollup, f"n_{level}") if rollup else 0 for level in ("low", "medium", "high")},
+    )
+
+
+@app.get("/predictions/stats", response_model=PredictionStats, tags=["Predictions"])
+async def prediction_stats(
+    granularity: StatsGranularity = StatsGranularity.hour,
+    since: Optional[datetime] = None,
+    limit: int = Query(60, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """
+    Prediction counts, risk-level mix and mean probability, all time and per
+    minute/hour/day bucket (UTC).
+
+    Served from counters updated when predictions are logged: cost grows
+    with the number of buckets returned, not with the size of the log.
+    """
+    buckets = get_prediction_rollups(db, granularity.value, since=naive_utc(since), limit=limit)
+    return PredictionStats(
+        totals=rollup_counts(get_prediction_totals(db), with_bucket=False),
+        granularity=granularity,
+        buckets=[rollup_counts(rollup) for rollup in buckets],
+    )
+
+
+@app.get("/predictions/export", tags=["Predictions"])
+async def export_predictions(
+    format: ExportFormat = ExportFormat.csv,
+    start: Optional[datetime] = Query(None, description="Created at or after (UTC)"),
+    end: Optional[datetime] = Query(None, description="Created before (UTC)"),
+    risk_level: Optional[RiskLevel] = None,
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Download the prediction log, archived periods included, as CSV or
+    NDJSON ordered by id, streamed in batches from a server-side cursor.
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    batches = prediction_batches(db, start=start, end=end,
+                                 risk_level=risk_level.value if risk_level else None, employee_id=employee_id)
+    return export_response("predictions", format, PREDICTION_COLUMNS, batches)
+
+
+@app.get("/predictions/stream", tags=["Predictions"])
+async def prediction_stream(risk_level: Optional[RiskLevel] = None, employee_id: Optional[int] = None):
+    """
+    Live feed of newly logged predictions (Server-Sent Events).
+
+    Events are pushed from the logging path, optionally filtered by risk
+    level or employee; connected clients cost no database queries. A client
+    that falls more than FEED_BUFFER_SIZE events behind receives a `dropped`
+    event and is disconnected (reload /predictions, then reconnect).
+    """
+    try:
+        subscription = broadcaster.subscribe(risk_level.value if risk_level else None, employee_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(
+        broadcaster.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/predictions/{prediction_id}", tags=["Predictions"])
 async def get_prediction(prediction_id: int, db: Session = Depends(get_db)):
     """Get a specific prediction by ID."""
-    prediction = db.query(Prediction).filter(Prediction.id == prediction_id).first()
-    if not prediction:
-        raise HTTPException(status_code=404, detail=f"Prediction {prediction_id} not found")
+    row = get_prediction_with_input(db, prediction_id)
+    if row is None:
+        archived = prediction_archive.get(db, prediction_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail=f"Prediction {prediction_id} not found")
+        return archived
+    prediction, input_data = row
 
     return {
         "id": prediction.id,
@@ -387,9 +920,10 @@ async def get_prediction(prediction_id: int, db: Session = Depends(get_db)):
         "prediction": prediction.prediction,
         "probability": prediction.probability,
         "risk_level": prediction.risk_level,
-        "input_data": prediction.input_data,
+        "input_data": input_data,
         "model_version": prediction.model_version,
-        "created_at": prediction.created_at.isoformat() if prediction.created_at else None
+        "created_at": prediction.created_at.isoformat() if prediction.created_at else None,
+        "archived": False,
     }
 
 
@@ -0,0 +1,237 @@
+"""
+In-process metrics for the prediction hot path
+
+Per-stage latency histograms, request/batch counters and scrape-time gauges
+(DB pool, caches), exposed in Prometheus text format on /metrics.
+
+Recording is a bisect into a fixed bucket list plus two additions, so it
+stays well under a microsecond and can be left on in production. Updates are
+not locked: under the GIL a lost increment is possible with threaded
+workers, which is acceptable for monitoring counters.
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency buckets in seconds (50us .. 10s)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Batch size buckets (rows per request)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+PREDICT_STAGES = (
+    "validation",
+    "engineer_features",
+    "model_predict",
+    "db_log",
+    "serialization",
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with Prometheus semantics."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Counts per upper bound, cumulated as Prometheus expects."""
+        total = 0
+        result = []
+        for c in self.counts:
+            total += c
+            result.append(total)
+        return result
+
+
+class RequestTiming:
+    """Timestamps shared between the middleware and the endpoint of one request."""
+
+    __slots__ = ("start", "handler_start", "handler_end")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.handler_start: Optional[float] = None
+        self.handler_end: Optional[float] = None
+
+
+# Set by MetricsMiddleware; endpoints mark handler entry/exit on it
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("current_timing", default=None)
+
+
+class MetricsRegistry:
+    """Holds all histograms, counters and gauge callbacks."""
+
+    def __init__(self):
+        self.stages: Dict[str, Histogram] = {}
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.predictions_total = 0
+        self._gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        """Record the duration of one pipeline stage."""
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = Histogram(LATENCY_BUCKETS)
+        hist.observe(seconds)
+
+    def observe_request(self, method: str, path: str, status: int, seconds: float) -> None:
+        """Record one HTTP request."""
+        key = (method, path, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        hist = self.request_latency.get((method, path))
+        if hist is None:
+            hist = self.request_latency[(method, path)] = Histogram(LATENCY_BUCKETS)
+        hist.observe(seconds)
+
+    def observe_batch(self, size: int) -> None:
+        """Record the number of rows scored by one request."""
+        self.batch_size.observe(size)
+        self.predictions_total += size
+
+    def register_gauge(self, name: str, help_text: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """
+        Register a gauge family evaluated at scrape time.
+
+        collect() returns {label_value: value}; labels are exposed as
+        `<name>{key="<label_value>"}`.
+        """
+        self._gauges[name] = (help_text, collect)
+
+    def reset(self) -> None:
+        """Clear recorded values (gauge callbacks are kept)."""
+        self.stages.clear()
+        self.requests.clear()
+        self.request_latency.clear()
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.predictions_total = 0
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+
+        lines.append("# HELP attrition_stage_duration_seconds Duration of each prediction pipeline stage")
+        lines.append("# TYPE attrition_stage_duration_seconds histogram")
+        for stage, hist in sorted(self.stages.items()):
+            _render_histogram(lines, "attrition_stage_duration_seconds", f'stage="{stage}"', hist)
+
+        lines.append("# HELP attrition_http_requests_total HTTP requests by route and status")
+        lines.append("# TYPE attrition_http_requests_total counter")
+        for (method, path, status), count in sorted(self.requests.items()):
+            lines.append(
+                f'attrition_http_requests_total{{method="{method}",path="{path}",status="{status}"}} {count}'
+            )
+
+        lines.append("# HELP attrition_http_request_duration_seconds HTTP request latency by route")
+        lines.append("# TYPE attrition_http_request_duration_seconds histogram")
+        for (method, path), hist in sorted(self.request_latency.items()):
+            _render_histogram(
+                lines, "attrition_http_request_duration_seconds", f'method="{method}",path="{path}"', hist
+            )
+
+        lines.append("# HELP attrition_batch_size Rows scored per prediction request")
+        lines.append("# TYPE attrition_batch_size histogram")
+        _render_histogram(lines, "attrition_batch_size", "", self.batch_size)
+
+        lines.append("# HELP attrition_predictions_total Rows scored since startup")
+        lines.append("# TYPE attrition_predictions_total counter")
+        lines.append(f"attrition_predictions_total {self.predictions_total}")
+
+        for name, (help_text, collect) in sorted(self._gauges.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in sorted(values.items()):
+                lines.append(f'{name}{{key="{key}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(lines: List[str], name: str, labels: str, hist: Histogram) -> None:
+    """Append the _bucket/_sum/_count series of one histogram."""
+    sep = "," if labels else ""
+    cumulative = hist.cumulative()
+    for bound, count in zip(hist.buckets, cumulative):
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+    lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {cumulative[-1]}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {hist.sum}")
+    lines.append(f"{name}_count{suffix} {hist.count}")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and the serialization stage.
+
+    Validation time is measured from request arrival to handler entry and
+    serialization from handler exit to the response start message, using
+    the RequestTiming marks set by the endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(time.perf_counter())
+        token = current_timing.set(timing)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timing.handler_end is not None:
+                    metrics.observe_stage("serialization", time.perf_counter() - timing.handler_end)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timing.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], path, status, time.perf_counter() - timing.start)
+
+
+def mark_handler_start() -> None:
+    """Called on endpoint entry: records the validation stage."""
+    timing = current_timing.get()
+    if timing is not None:
+        timing.handler_start = time.perf_counter()
+        metrics.observe_stage("validation", timing.handler_start - timing.start)
+
+
+def mark_handler_end() -> None:
+    """Called just before the endpoint returns its response model."""
+    timing = current_timing.get()
+    if timing is not None:
+        timing.handler_end = time.perf_counter()
+
+
+# Singleton instance
+metrics = MetricsRegistry()
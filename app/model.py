@@ -2,34 +2,93 @@
 ML Model loading and prediction
 """
 
-import joblib
+import os
 import json
+import hashlib
+import numpy as np
 import pandas as pd
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+
+from app.compact_model import CompactPipeline
+from app.tracing import stage
 
 # Paths
 BASE_PATH = Path(__file__).parent.parent
 MODEL_PATH = BASE_PATH / "models" / "lr_pipeline.pkl"
+COMPACT_MODEL_PATH = BASE_PATH / "models" / "lr_pipeline.bin"
 FEATURES_PATH = BASE_PATH / "models" / "features.json"
 METADATA_PATH = BASE_PATH / "models" / "model_metadata.json"
 
+# Artifact format: "auto" (compact if present, else pickle), "compact" or "pickle"
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "auto")
+
+# Risk level thresholds (conservative to reduce false negatives)
+# Baseline attrition is ~16%, so even 20% is above average
+# FN (missed departures) are more costly than FP (extra HR meetings)
+RISK_LOW_THRESHOLD = 0.20
+RISK_HIGH_THRESHOLD = 0.45
+
+
+def risk_level(probability: float) -> str:
+    """Map an attrition probability to low/medium/high."""
+    if probability < RISK_LOW_THRESHOLD:
+        return "low"
+    elif probability < RISK_HIGH_THRESHOLD:
+        return "medium"
+    return "high"
+
+
+def risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized risk_level()."""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    return np.where(probabilities < RISK_LOW_THRESHOLD, "low",
+                    np.where(probabilities < RISK_HIGH_THRESHOLD, "medium", "high"))
+
+
+def prediction_result(prediction: int, probability: float) -> Dict[str, Any]:
+    """Prediction, rounded probability, risk level and label of one employee."""
+    return {
+        "prediction": prediction,
+        "probability": round(probability, 4),
+        "risk_level": risk_level(probability),
+        "attrition_label": "Oui" if prediction == 1 else "Non"
+    }
+
 
 class AttritionModel:
     """Wrapper for the trained attrition prediction model."""
 
     def __init__(self):
         self.model = None
+        self.model_format = None
         self.features_info = None
         self.metadata = None
         self._load_model()
         self._load_features()
         self._load_metadata()
+        self.version, self.last_modified = self._fingerprint()
 
     def _load_model(self):
-        """Load the trained pipeline."""
-        if MODEL_PATH.exists():
+        """
+        Load the trained pipeline.
+
+        The compact artifact is memory-mapped and scored with numpy only;
+        the pickle requires sklearn and is kept as a fallback.
+        """
+        use_compact = MODEL_FORMAT == "compact" or (
+            MODEL_FORMAT == "auto" and COMPACT_MODEL_PATH.exists()
+        )
+        if use_compact:
+            if not COMPACT_MODEL_PATH.exists():
+                raise FileNotFoundError(f"Compact model not found at {COMPACT_MODEL_PATH}")
+            self.model = CompactPipeline(COMPACT_MODEL_PATH)
+            self.model_format = "compact"
+        elif MODEL_PATH.exists():
+            import joblib
             self.model = joblib.load(MODEL_PATH)
+            self.model_format = "pickle"
         else:
             raise FileNotFoundError(f"Model not found at {MODEL_PATH}")
 
@@ -47,6 +106,21 @@ class AttritionModel:
             with open(METADATA_PATH, 'r') as f:
                 self.metadata = json.load(f)
 
+    def _fingerprint(self) -> Tuple[str, datetime]:
+        """
+        Content hash of the loaded artifacts (identical across replicas) and
+        their export date, used as HTTP validators.
+        """
+        path = COMPACT_MODEL_PATH if self.model_format == "compact" else MODEL_PATH
+        content = json.dumps([self.model_format, path.stat().st_size, self.features_info, self.metadata],
+                             sort_keys=True, default=str)
+        version = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        try:
+            last_modified = datetime.fromisoformat((self.metadata or {})["export_date"])
+        except (KeyError, TypeError, ValueError):
+            last_modified = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+        return version, last_modified
+
     @property
     def feature_names(self) -> List[str]:
         """Get list of feature names."""
@@ -62,6 +136,16 @@ class AttritionModel:
         """Get list of numerical feature names."""
         return self.features_info.get('numerical_features', [])
 
+    @property
+    def categories(self) -> Dict[str, List[str]]:
+        """Categories seen at training time, per categorical feature."""
+        if self.model_format == "compact":
+            cats = self.model.header["categories"]
+        else:
+            encoder = self.model.named_steps["preprocessor"].named_transformers_["cat"]
+            cats = [[str(c) for c in values] for values in encoder.categories_]
+        return dict(zip(self.categorical_features, cats))
+
     def predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Make a single prediction.
@@ -72,36 +156,22 @@ class AttritionModel:
         Returns:
             Dictionary with prediction, probability, and risk level
         """
-        # Create DataFrame with correct column order
-        df = pd.DataFrame([data])
-
-        # Ensure columns are in the right order
-        df = df[self.feature_names]
-
-        # Get prediction and probability
-        prediction = int(self.model.predict(df)[0])
-        probability = float(self.model.predict_proba(df)[0][1])
-
-        # Determine risk level (conservative thresholds to reduce false negatives)
-        # Baseline attrition is ~16%, so even 20% is above average
-        # FN (missed departures) are more costly than FP (extra HR meetings)
-        if probability < 0.20:
-            risk_level = "low"
-        elif probability < 0.45:
-            risk_level = "medium"
-        else:
-            risk_level = "high"
+        with stage("model_predict"):
+            # Create DataFrame with correct column order
+            df = pd.DataFrame([data])
 
-        return {
-            "prediction": prediction,
-            "probability": round(probability, 4),
-            "risk_level": risk_level,
-            "attrition_label": "Oui" if prediction == 1 else "Non"
-        }
+            # Ensure columns are in the right order
+            df = df[self.feature_names]
+
+            # Get prediction and probability
+            prediction = int(self.model.predict(df)[0])
+            probability = float(self.model.predict_proba(df)[0][1])
+
+        return prediction_result(prediction, probability)
 
     def predict_batch(self, data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Make batch predictions.
+        Make batch predictions in one vectorized pass (predict_frame).
 
         Args:
             data_list: List of dictionaries with feature values
@@ -109,7 +179,28 @@ class AttritionModel:
         Returns:
             List of prediction results
         """
-        return [self.predict(data) for data in data_list]
+        if not data_list:
+            return []
+        predictions, probabilities = self.predict_frame(pd.DataFrame(data_list))
+        return [prediction_result(int(prediction), float(probability))
+                for prediction, probability in zip(predictions, probabilities)]
+
+    def predict_frame(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized scoring of a DataFrame (raw + engineered features).
+
+        Args:
+            df: One row per employee, with at least the model features
+
+        Returns:
+            Tuple of (predictions, probabilities of attrition) arrays
+        """
+        with stage("model_predict"):
+            df = df[self.feature_names]
+            # One transform pass: labels follow from the class-1 probability
+            probabilities = np.asarray(self.model.predict_proba(df))[:, 1]
+            predictions = (probabilities > 0.5).astype(int)
+        return predictions, probabilities
 
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information and metrics."""
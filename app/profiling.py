@@ -0,0 +1,323 @@
+"""
+On-demand request profiling
+
+A request is profiled when it carries the admin header
+(X-Profile-Token matching PROFILING_ADMIN_TOKEN) or, with PROFILING_ENABLED,
+when it is drawn at PROFILING_SAMPLE_RATE. The request is traced with a
+deterministic profiler (sys.setprofile) and stored in a bounded on-disk ring:
+
+    <id>.json             metadata and per-stage breakdown (small, listed)
+    <id>.collapsed.txt    collapsed stacks (flamegraph input)
+    <id>.speedscope.json  evented profile for https://www.speedscope.app
+
+The profile id is returned in the X-Profile-Id response header. Admin
+endpoints authenticate with X-Admin-Token (same token) so reading profiles
+or traces does not profile the call.
+
+The tracer only follows the event-loop thread: sync dependencies run by
+FastAPI in the threadpool (e.g. get_db) are not part of the trace. Other
+requests running on the event loop while the profiled one awaits are
+filtered out (by asyncio task). sys.setprofile is per thread, so only one
+request is profiled at a time: a sampled request arriving meanwhile is just
+served, an explicitly requested profile gets a 409.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import threading
+from asyncio import current_task
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.metrics import metrics
+
+BASE_PATH = Path(__file__).parent.parent
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.0"))
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+PROFILING_DIR = Path(os.getenv("PROFILING_DIR", str(BASE_PATH / "profiles")))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "50"))
+PROFILING_MAX_EVENTS = int(os.getenv("PROFILING_MAX_EVENTS", "200000"))
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class StackTracer:
+    """
+    Deterministic tracer built on sys.setprofile.
+
+    Records open/close events (speedscope "evented" profile) and self time
+    per call stack (collapsed / flamegraph format), both in nanoseconds.
+    Started from a coroutine, it ignores calls made by other asyncio tasks.
+    """
+
+    def __init__(self, max_events: int = PROFILING_MAX_EVENTS):
+        self.max_events = max_events
+        self.frames: List[Dict[str, Any]] = []
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.truncated = False
+        self.collapsed: Dict[Tuple[int, ...], int] = {}
+        self._stack: List[int] = []
+        self._start = 0
+        self._last = 0
+        self.end = 0
+        self.task = None
+
+    def _frame_id(self, name: str, file: str, line: int) -> int:
+        key = (name, file, line)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({"name": name, "file": file, "line": line})
+        return index
+
+    def _emit(self, kind: str, frame: int, at: int) -> None:
+        if len(self.events) < self.max_events:
+            self.events.append({"type": kind, "frame": frame, "at": at})
+        else:
+            self.truncated = True
+
+    def _callback(self, frame, event, arg):
+        now = time.perf_counter_ns() - self._start
+        if self._stack:
+            key = tuple(self._stack)
+            self.collapsed[key] = self.collapsed.get(key, 0) + now - self._last
+        self._last = now
+        if self.task is not None and current_task() is not self.task:
+            return  # another request interleaved on the event loop
+
+        if event == "call":
+            code = frame.f_code
+            index = self._frame_id(code.co_qualname if hasattr(code, "co_qualname") else code.co_name,
+                                   code.co_filename, code.co_firstlineno)
+        elif event == "c_call":
+            module = getattr(arg, "__module__", None) or "builtins"
+            index = self._frame_id(f"{module}.{getattr(arg, '__qualname__', repr(arg))}", "<C>", 0)
+        else:
+            # return / c_return / c_exception: ignore frames opened before start()
+            if self._stack:
+                self._emit("C", self._stack.pop(), now)
+            return
+
+        self._stack.append(index)
+        self._emit("O", index, now)
+
+    def start(self) -> None:
+        try:
+            self.task = current_task()
+        except RuntimeError:  # no running event loop: trace the whole thread
+            self.task = None
+        self._start = time.perf_counter_ns()
+        self._last = 0
+        sys.setprofile(self._callback)
+
+    def stop(self) -> None:
+        sys.setprofile(None)
+        self.end = time.perf_counter_ns() - self._start
+        if self._stack:
+            key = tuple(self._stack)
+            self.collapsed[key] = self.collapsed.get(key, 0) + self.end - self._last
+        # Close frames still open (e.g. the middleware itself)
+        while self._stack:
+            self._emit("C", self._stack.pop(), self.end)
+
+    def collapsed_text(self) -> str:
+        """Collapsed stacks: 'outer;inner;leaf <self time in microseconds>' per line."""
+        lines = []
+        for stack, ns in sorted(self.collapsed.items(), key=lambda item: -item[1]):
+            us = ns // 1000
+            if us > 0:
+                lines.append(";".join(self.frames[i]["name"] for i in stack) + f" {us}")
+        return "\n".join(lines)
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Speedscope evented profile."""
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "evented",
+                "name": name,
+                "unit": "nanoseconds",
+                "startValue": 0,
+                "endValue": self.end,
+                "events": self.events,
+            }],
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "employee-attrition-api",
+        }
+
+
+class ProfileStore:
+    """Bounded on-disk ring of profiles (oldest files are evicted)."""
+
+    def __init__(self, directory: Path = PROFILING_DIR, max_files: int = PROFILING_MAX_FILES):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, meta: Dict[str, Any], speedscope: Dict[str, Any]) -> None:
+        """Store a profile; its `collapsed` stacks go to their own file so list() stays cheap."""
+        meta = dict(meta)
+        collapsed = meta.pop("collapsed", "")
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile_id = meta["id"]
+            with open(self.directory / f"{profile_id}.speedscope.json", "w") as f:
+                json.dump(speedscope, f)
+            (self.directory / f"{profile_id}.collapsed.txt").write_text(collapsed)
+            # Written last: list() only sees complete profiles
+            with open(self.directory / f"{profile_id}.json", "w") as f:
+                json.dump(meta, f)
+            self._evict()
+
+    def _evict(self) -> None:
+        metas = [p for p in self.directory.glob("*.json") if not p.name.endswith(".speedscope.json")]
+        metas.sort(key=lambda p: p.stat().st_mtime)
+        for path in metas[:max(0, len(metas) - self.max_files)]:
+            path.unlink(missing_ok=True)
+            (self.directory / f"{path.stem}.speedscope.json").unlink(missing_ok=True)
+            (self.directory / f"{path.stem}.collapsed.txt").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, most recent first (without stacks)."""
+        if not self.directory.exists():
+            return []
+        result = []
+        for path in self.directory.glob("*.json"):
+            if path.name.endswith(".speedscope.json"):
+                continue
+            with open(path) as f:
+                result.append(json.load(f))
+        return sorted(result, key=lambda m: m["timestamp"], reverse=True)
+
+    def _path(self, profile_id: str, suffix: str) -> Optional[Path]:
+        # Ids are uuid4 hex: reject anything else to stay inside the directory
+        if not profile_id.isalnum():
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.exists() else None
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of a profile with its collapsed stacks."""
+        path = self._path(profile_id, ".json")
+        if path is None:
+            return None
+        with open(path) as f:
+            meta = json.load(f)
+        collapsed = self._path(profile_id, ".collapsed.txt")
+        meta["collapsed"] = collapsed.read_text() if collapsed is not None else ""
+        return meta
+
+    def speedscope_path(self, profile_id: str) -> Optional[Path]:
+        """Path of the speedscope file (served as-is, it can be large)."""
+        return self._path(profile_id, ".speedscope.json")
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Check an admin token against PROFILING_ADMIN_TOKEN (disabled when unset)."""
+    return bool(PROFILING_ADMIN_TOKEN) and token == PROFILING_ADMIN_TOKEN
+
+
+def _stage_snapshot() -> Dict[str, Tuple[float, int]]:
+    return {name: (hist.sum, hist.count) for name, hist in metrics.stages.items()}
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests.
+
+    The per-stage breakdown is the difference of the stage histograms
+    before and after the request, so it is exact only when no other request
+    is in flight on the same worker.
+    """
+
+    def __init__(self, app, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or profile_store
+        self.active = False
+
+    def _selection(self, scope) -> Optional[str]:
+        """Why the request is profiled: 'requested' (admin header), 'sampled' or None."""
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                return "requested" if is_admin(value.decode("latin-1")) else None
+        return "sampled" if PROFILING_ENABLED and random.random() < PROFILING_SAMPLE_RATE else None
+
+    async def __call__(self, scope, receive, send):
+        selection = self._selection(scope) if scope["type"] == "http" else None
+        if selection is None or (self.active and selection == "sampled"):
+            await self.app(scope, receive, send)
+            return
+        if self.active:
+            response = JSONResponse({"detail": "Another request is being profiled, retry later"}, status_code=409)
+            await response(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        before = _stage_snapshot()
+        tracer = StackTracer()
+        self.active = True
+        tracer.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            tracer.stop()
+            self.active = False
+            after = _stage_snapshot()
+            stages = {}
+            for name, (total, count) in after.items():
+                prev_total, prev_count = before.get(name, (0.0, 0))
+                if count > prev_count:
+                    stages[name] = {
+                        "total_ms": round((total - prev_total) * 1000, 4),
+                        "calls": count - prev_count,
+                    }
+
+            name = f"{scope['method']} {scope['path']}"
+            meta = {
+                "id": profile_id,
+                "timestamp": datetime.now().isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(tracer.end / 1e6, 4),
+                "stages": stages,
+                "events": len(tracer.events),
+                "truncated": tracer.truncated,
+            }
+            # Files can weigh several MB: serialize and write off the event loop
+            await run_in_threadpool(self._save, meta, tracer, name)
+
+    def _save(self, meta: Dict[str, Any], tracer: StackTracer, name: str) -> None:
+        meta["collapsed"] = tracer.collapsed_text()
+        self.store.save(meta, tracer.speedscope(name))
+
+
+# Singleton instance
+profile_store = ProfileStore()
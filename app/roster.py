@@ -0,0 +1,216 @@
+"""
+Columnar in-memory snapshot of the employees roster
+
+The employees table is read once into a pandas DataFrame (one column per
+field) and scored in a single vectorized pass. Population-level features
+(simulations, rankings, aggregates) work on this snapshot instead of
+querying and rescoring employees one by one.
+
+The snapshot is reloaded after ROSTER_TTL_SECONDS or when invalidated;
+each load gets a new version number, usable as a cache key. With
+ROSTER_SOURCE=snapshot it is memory-mapped from the latest columnar
+snapshot file (app.snapshot) instead of read from the database, and only
+reloaded when a newer file appears.
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.explain import plain_value
+from app.snapshot import SNAPSHOT_DIR, latest_snapshot, load_snapshot
+from app.tracing import stage
+
+ROSTER_TTL_SECONDS = float(os.getenv("ROSTER_TTL_SECONDS", "300"))
+# Where the snapshot is loaded from: "db" or "snapshot" (falls back to db if none exists)
+ROSTER_SOURCE = os.getenv("ROSTER_SOURCE", "db")
+
+# Fields available for leaderboard filters and group-by aggregates
+GROUP_FIELDS = ("departement", "poste", "domaine_etude", "niveau_hierarchique_poste")
+RISK_LEVELS = ("low", "medium", "high")
+# Aggregate group of rows whose grouping value is missing
+UNKNOWN_GROUP = "unknown"
+
+# Columns returned for each leaderboard entry
+LEADERBOARD_COLUMNS = [
+    "employee_id", "departement", "poste", "domaine_etude", "niveau_hierarchique_poste",
+    "probability", "risk_level", "attrition_actual", "dataset_type",
+]
+
+
+def read_employees(db: Session) -> pd.DataFrame:
+    """Current employees (flagged deleted ones excluded), one column per field."""
+    from app.database import Employee
+
+    query = db.query(Employee).filter(Employee.deleted_at.is_(None)).order_by(Employee.employee_id)
+    return pd.read_sql(query.statement, db.connection())
+
+
+def score_roster(frame: pd.DataFrame) -> pd.DataFrame:
+    """Add engineered features (unless present), `probability` and `risk_level`."""
+    from app.feature_engineering import FeatureEngineer, feature_engineer
+    from app.model import get_model, risk_levels
+
+    if not set(FeatureEngineer.ENGINEERED_FEATURES) <= set(frame.columns):
+        frame = feature_engineer.engineer_features(frame)
+    probabilities = get_model().predict_frame(frame)[1] if len(frame) else []
+    frame["probability"] = probabilities
+    frame["risk_level"] = risk_levels(frame["probability"])
+    return frame
+
+
+class Roster:
+    """Employees table as a scored DataFrame, shared across requests."""
+
+    def __init__(self, ttl: float = ROSTER_TTL_SECONDS, source: str = ROSTER_SOURCE,
+                 snapshot_dir=SNAPSHOT_DIR):
+        self.ttl = ttl
+        self.source = source
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_path = None
+        self.version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Force a reload on next access (e.g. after the employees table changed)."""
+        with self._lock:
+            self._frame = None
+
+    def _expired(self) -> bool:
+        return self._frame is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def get(self, db: Session) -> pd.DataFrame:
+        """
+        Current snapshot: raw + engineered features, `probability` and
+        `risk_level` columns. Treat as read-only.
+        """
+        if self._expired():
+            with self._lock:
+                if self._expired():
+                    self._refresh(db)
+        return self._frame
+
+    def _refresh(self, db: Session) -> None:
+        path = latest_snapshot(self.snapshot_dir) if self.source == "snapshot" else None
+        if path is not None and path == self.snapshot_path and self._frame is not None:
+            self._loaded_at = time.monotonic()  # no newer file: keep the mapped frame
+            return
+        self._frame = self._load_snapshot(path) if path is not None else self._load(db)
+        self.snapshot_path = path
+        self._loaded_at = time.monotonic()
+        self.version += 1
+
+    @staticmethod
+    def _load(db: Session) -> pd.DataFrame:
+        with stage("roster_load"):
+            return score_roster(read_employees(db))
+
+    @staticmethod
+    def _load_snapshot(path) -> pd.DataFrame:
+        """Mapped snapshot, rescored only if it has no scores or they come from another model."""
+        from app.model import get_model
+
+        frame, header = load_snapshot(path)
+        metadata = header["metadata"]
+        if not metadata.get("scores") or \
+                metadata.get("model_export_date") != get_model().get_model_info()["export_date"]:
+            with stage("roster_load"):
+                frame = score_roster(frame)
+        return frame
+
+
+def filter_mask(frame: pd.DataFrame, filters: Dict[str, Any]) -> np.ndarray:
+    """Rows matching every non-None equality filter."""
+    mask = np.ones(len(frame), dtype=bool)
+    for name, value in filters.items():
+        if value is not None:
+            mask &= (frame[name] == value).to_numpy()
+    return mask
+
+
+def top_at_risk(frame: pd.DataFrame, k: int, mask: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    The k highest-probability employees among the masked rows (missing
+    values as None).
+
+    Partial sort: argpartition selects the top k in O(n), only those k are
+    sorted (ties by employee_id).
+    """
+    rows = np.flatnonzero(mask)
+    probabilities = frame["probability"].to_numpy()[rows]
+    if k < len(rows):
+        top = np.argpartition(-probabilities, k - 1)[:k]
+        rows, probabilities = rows[top], probabilities[top]
+    ids = frame["employee_id"].to_numpy()[rows]
+    rows = rows[np.lexsort((ids, -probabilities))]
+
+    selected = frame.iloc[rows][LEADERBOARD_COLUMNS].astype(object)
+    entries = selected.where(selected.notna(), None).to_dict("records")
+    for entry in entries:
+        entry["probability"] = round(entry["probability"], 4)
+        # Integer columns holding a missing value come back as floats
+        for name in ("niveau_hierarchique_poste", "attrition_actual"):
+            if entry[name] is not None:
+                entry[name] = int(entry[name])
+    return entries
+
+
+def _group_codes(column: pd.Series, mask: np.ndarray):
+    """
+    Integer group codes of the masked rows and the group values.
+
+    Categorical columns (mapped snapshots) reuse their codes; other columns
+    are factorized. Groups may include values absent from the masked rows.
+    Missing values (code -1) are remapped to a trailing UNKNOWN_GROUP.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, groups = column.cat.codes.to_numpy()[mask].astype(np.intp), column.cat.categories.to_numpy()
+    else:
+        codes, groups = pd.factorize(column.to_numpy()[mask])
+    missing = codes < 0
+    if missing.any():
+        codes = np.where(missing, len(groups), codes)
+        groups = np.concatenate([np.asarray(groups, dtype=object), [UNKNOWN_GROUP]])
+    return codes, groups
+
+
+def risk_aggregates(frame: pd.DataFrame, by: str, mask: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Count, mean probability, expected departures and risk-level mix per
+    value of `by`, using bincount over factorized group codes. Sorted by
+    decreasing mean probability.
+    """
+    codes, groups = _group_codes(frame[by], mask)
+    n_groups = len(groups)
+    probabilities = frame["probability"].to_numpy()[mask]
+    level_codes, level_names = _group_codes(frame["risk_level"], mask)
+    level_index = {name: i for i, name in enumerate(level_names)}
+
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.bincount(codes, weights=probabilities, minlength=n_groups)
+    mix = {level: np.bincount(codes[level_codes == level_index.get(level, -2)], minlength=n_groups)
+           for level in RISK_LEVELS}
+
+    result = [
+        {
+            "value": plain_value(groups[g]),
+            "count": int(counts[g]),
+            "mean_probability": round(float(sums[g] / counts[g]), 4),
+            "expected_departures": round(float(sums[g]), 2),
+            "risk_levels": {level: int(mix[level][g]) for level in RISK_LEVELS},
+        }
+        for g in range(n_groups)
+        if counts[g]
+    ]
+    return sorted(result, key=lambda group: -group["mean_probability"])
+
+
+# Singleton instance
+roster = Roster()
@@ -3,7 +3,7 @@ Pydantic schemas for API request/response validation
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 from datetime import datetime
 from enum import Enum
 
@@ -120,6 +120,22 @@ class PredictionOutput(BaseModel):
     attrition_label: str = Field(..., description="Label (Oui/Non)")
 
 
+class FeatureContribution(BaseModel):
+    """Contribution of one model feature to the log-odds of attrition."""
+
+    feature: str = Field(..., description="Nom de la feature")
+    kind: str = Field(..., description="raw (saisie RH) ou engineered (calculee)")
+    value: Union[float, str] = Field(..., description="Valeur en entree du modele")
+    contribution: float = Field(..., description="Contribution au log-odds (> 0 augmente le risque)")
+
+
+class Explanation(BaseModel):
+    """Top contributing features of a prediction."""
+
+    intercept: float = Field(..., description="Log-odds de l'employe de reference")
+    contributions: List[FeatureContribution]
+
+
 class PredictionResponse(BaseModel):
     """Full prediction response with metadata."""
 
@@ -127,6 +143,7 @@ class PredictionResponse(BaseModel):
     employee_id: Optional[int] = Field(None, description="ID de l'employe (si fourni)")
     result: PredictionOutput
     engineered_features: Optional[EngineeredFeatures] = Field(None, description="Features calculees")
+    explanation: Optional[Explanation] = Field(None, description="Top-k contributions (si explain > 0)")
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
@@ -143,6 +160,236 @@ class BatchPredictionResponse(BaseModel):
     count: int
 
 
+class WhatIfAxis(BaseModel):
+    """One swept feature: explicit values, or start/stop/steps for numericals."""
+
+    feature: str = Field(..., description="Feature brute a faire varier")
+    values: Optional[List[Union[float, str]]] = Field(None, description="Valeurs explicites (defaut: toutes les modalites)")
+    start: Optional[float] = Field(None, description="Debut de la plage (numerique)")
+    stop: Optional[float] = Field(None, description="Fin de la plage (numerique)")
+    steps: int = Field(10, ge=2, le=1000, description="Nombre de points de la plage")
+
+
+class WhatIfRequest(BaseModel):
+    """Base employee plus one or two features to sweep."""
+
+    employee: EmployeeInput
+    axes: List[WhatIfAxis] = Field(..., min_length=1, max_length=2)
+
+
+class WhatIfAxisValues(BaseModel):
+    """Resolved values of a swept feature."""
+
+    feature: str
+    values: List[Union[float, str]]
+
+
+class WhatIfResponse(BaseModel):
+    """Probability surface over the grid (last axis varies fastest)."""
+
+    base: PredictionOutput
+    axes: List[WhatIfAxisValues]
+    shape: List[int]
+    probabilities: List[Any] = Field(..., description="Probabilites (liste, ou liste de lignes pour 2 axes)")
+
+
+class CounterfactualRequest(BaseModel):
+    """Employee to move to a lower risk level."""
+
+    employee: EmployeeInput
+    target_risk: RiskLevel = Field(RiskLevel.low, description="Niveau vise: low (< 0.20) ou medium (< 0.45)")
+    weights: Optional[Dict[str, float]] = Field(
+        None, description="Features actionnables autorisees et leur cout (defaut: toutes, couts par defaut)"
+    )
+    max_results: int = Field(5, ge=1, le=20)
+
+
+class CounterfactualChange(BaseModel):
+    """One changed feature."""
+
+    feature: str
+    current: Union[float, str]
+    proposed: Union[float, str]
+
+
+class Counterfactual(BaseModel):
+    """A set of changes reaching the target risk level."""
+
+    changes: List[CounterfactualChange]
+    cost: float
+    probability: float
+    risk_level: RiskLevel
+
+
+class CounterfactualResult(BaseModel):
+    """Ranked counterfactuals of one employee (cheapest first)."""
+
+    employee_id: Optional[int] = None
+    probability: float
+    risk_level: RiskLevel
+    status: str = Field(..., description="at_target, found ou not_found")
+    counterfactuals: List[Counterfactual]
+
+
+class DepartmentCounterfactuals(BaseModel):
+    """Counterfactuals for every employee of a department above the target."""
+
+    departement: str
+    target_risk: RiskLevel
+    n_employees: int
+    n_above_target: int
+    n_found: int
+    results: List[CounterfactualResult]
+
+
+class SimulationCondition(BaseModel):
+    """Filter condition on a raw feature (or dataset_type)."""
+
+    feature: str
+    op: str = Field(..., description="eq, ne, gt, ge, lt, le ou in")
+    value: Union[float, str, List[Union[float, str]]]
+
+
+class SimulationAction(BaseModel):
+    """Change applied to the selected employees."""
+
+    feature: str
+    op: str = Field(..., description="set, add ou multiply (set seulement pour les categorielles)")
+    value: Union[float, str]
+
+
+class SimulationScenario(BaseModel):
+    """Declarative HR policy: who is affected and how."""
+
+    filter: List[SimulationCondition] = Field(default_factory=list, description="Conditions (ET); vide = tout le monde")
+    actions: List[SimulationAction] = Field(..., min_length=1)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filter": [
+                    {"feature": "departement", "op": "eq", "value": "Consulting"},
+                    {"feature": "annees_depuis_la_derniere_promotion", "op": "gt", "value": 3}
+                ],
+                "actions": [{"feature": "revenu_mensuel", "op": "multiply", "value": 1.10}]
+            }
+        }
+
+
+class RiskSummary(BaseModel):
+    """Risk distribution of a population."""
+
+    risk_distribution: Dict[str, int]
+    histogram: List[int] = Field(..., description="Effectifs par tranche de probabilite de 0.1")
+    mean_probability: Optional[float]
+    expected_departures: float
+
+
+class DepartmentImpact(BaseModel):
+    """Expected departures of a department before and after the scenario."""
+
+    departement: str
+    n_employees: int
+    n_affected: int
+    expected_departures_before: float
+    expected_departures_after: float
+    delta: float
+
+
+class SimulationResult(BaseModel):
+    """Before/after comparison of a scenario over the full roster."""
+
+    scenario_hash: str
+    roster_version: int
+    cached: bool
+    n_employees: int
+    n_affected: int
+    before: RiskSummary
+    after: RiskSummary
+    by_department: List[DepartmentImpact]
+
+
+class GroupField(str, Enum):
+    departement = "departement"
+    poste = "poste"
+    domaine_etude = "domaine_etude"
+    niveau_hierarchique_poste = "niveau_hierarchique_poste"
+
+
+class LeaderboardEntry(BaseModel):
+    """One employee of the at-risk leaderboard."""
+
+    employee_id: int
+    departement: Optional[str] = None
+    poste: Optional[str] = None
+    domaine_etude: Optional[str] = None
+    niveau_hierarchique_poste: Optional[int] = None
+    probability: float
+    risk_level: RiskLevel
+    attrition_actual: Optional[int] = None
+    dataset_type: Optional[str] = None
+
+
+class Leaderboard(BaseModel):
+    """Top-K employees by attrition probability."""
+
+    roster_version: int
+    n_matching: int = Field(..., description="Employes correspondant aux filtres")
+    count: int
+    employees: List[LeaderboardEntry]
+
+
+class RiskGroup(BaseModel):
+    """Risk aggregates of one group."""
+
+    value: Union[int, str]
+    count: int
+    mean_probability: float
+    expected_departures: float
+    risk_levels: Dict[str, int]
+
+
+class RiskAggregates(BaseModel):
+    """Risk aggregates grouped by one field (highest mean risk first)."""
+
+    roster_version: int
+    by: GroupField
+    n_employees: int
+    groups: List[RiskGroup]
+
+
+class ExportFormat(str, Enum):
+    """Serialization of streamed exports."""
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class StatsGranularity(str, Enum):
+    """Time bucket size of prediction statistics."""
+    minute = "minute"
+    hour = "hour"
+    day = "day"
+
+
+class PredictionCounts(BaseModel):
+    """Prediction counters of one time bucket (or all time)."""
+
+    bucket_start: Optional[datetime] = None
+    total_predictions: int
+    attrition_predicted: int
+    no_attrition_predicted: int
+    avg_probability: Optional[float] = None
+    risk_levels: Dict[str, int]
+
+
+class PredictionStats(BaseModel):
+    """All-time prediction statistics and recent time buckets (newest first)."""
+
+    totals: PredictionCounts
+    granularity: StatsGranularity
+    buckets: List[PredictionCounts]
+
+
 class ModelInfo(BaseModel):
     """Model information schema."""
 
@@ -151,6 +398,7 @@ class ModelInfo(BaseModel):
     n_features: int
     metrics: dict
     hyperparameters: dict
+    live_metrics: Optional[dict] = Field(None, description="Metriques en ligne (predictions labellisees)")
 
 
 class HealthCheck(BaseModel):
@@ -0,0 +1,202 @@
+"""
+Population-level HR policy simulator
+
+A scenario is declarative: a filter selecting employees and actions applied
+to them, e.g. "+10% salary in Consulting for employees without promotion
+for more than 3 years":
+
+    {"filter": [{"feature": "departement", "op": "eq", "value": "Consulting"},
+                {"feature": "annees_depuis_la_derniere_promotion", "op": "gt", "value": 3}],
+     "actions": [{"feature": "revenu_mensuel", "op": "multiply", "value": 1.10}]}
+
+The filter and actions run as column operations on the roster snapshot
+(app.roster), engineered features are recomputed and everyone is rescored
+in one pass. Results are cached by a hash of the scenario and the roster
+version.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.feature_engineering import FeatureEngineer, feature_engineer
+from app.model import risk_levels
+from app.roster import UNKNOWN_GROUP
+from app.schemas import EmployeeInput
+from app.tracing import stage
+from app.whatif import field_bounds
+
+SIMULATION_CACHE_SIZE = int(os.getenv("SIMULATION_CACHE_SIZE", "128"))
+
+FILTER_OPS = {
+    "eq": lambda col, v: col == v,
+    "ne": lambda col, v: col != v,
+    "gt": lambda col, v: col > v,
+    "ge": lambda col, v: col >= v,
+    "lt": lambda col, v: col < v,
+    "le": lambda col, v: col <= v,
+    "in": lambda col, v: col.isin(v if isinstance(v, list) else [v]),
+}
+ACTION_OPS = ("set", "add", "multiply")
+
+# Probability histogram bins of the before/after distributions
+HISTOGRAM_EDGES = np.linspace(0, 1, 11)
+
+
+def scenario_hash(scenario: Dict[str, Any]) -> str:
+    """Stable hash of a scenario (key order independent)."""
+    canonical = json.dumps(scenario, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _check_feature(feature: str) -> None:
+    if feature in FeatureEngineer.ENGINEERED_FEATURES:
+        raise ValueError(f"{feature} is computed server-side; use its raw inputs instead")
+    if feature not in EmployeeInput.model_fields:
+        raise ValueError(f"Unknown feature: {feature}")
+
+
+def select(frame: pd.DataFrame, conditions: List[Dict[str, Any]]) -> np.ndarray:
+    """Boolean mask of employees matching all conditions (empty filter = everyone)."""
+    mask = np.ones(len(frame), dtype=bool)
+    for condition in conditions:
+        if condition["op"] not in FILTER_OPS:
+            raise ValueError(f"Unknown filter op {condition['op']!r} (allowed: {', '.join(FILTER_OPS)})")
+        if condition["feature"] != "dataset_type":
+            _check_feature(condition["feature"])
+        mask &= FILTER_OPS[condition["op"]](frame[condition["feature"]], condition["value"]).to_numpy()
+    return mask
+
+
+def apply_actions(frame: pd.DataFrame, mask: np.ndarray, actions: List[Dict[str, Any]],
+                  categories: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    """
+    Copy of the raw columns with actions applied to the selected rows.
+
+    Numerical results are clipped to the EmployeeInput bounds and integer
+    fields are rounded. Categorical values must be among the model's
+    training `categories` when given.
+    """
+    changed = frame.copy()
+    for action in actions:
+        feature, op, value = action["feature"], action["op"], action["value"]
+        _check_feature(feature)
+        if op not in ACTION_OPS:
+            raise ValueError(f"Unknown action op {op!r} (allowed: {', '.join(ACTION_OPS)})")
+
+        field = EmployeeInput.model_fields[feature]
+        if field.annotation is str:
+            if op != "set":
+                raise ValueError(f"{feature} is categorical: only 'set' is allowed")
+            value = str(value)
+            if categories is not None and feature in categories and value not in categories[feature]:
+                raise ValueError(f"{feature}: unknown category {value!r}; expected one of {list(categories[feature])}")
+            changed[feature] = changed[feature].astype(object)  # may be a Categorical (snapshot)
+            changed.loc[mask, feature] = value
+            continue
+
+        current = changed.loc[mask, feature].to_numpy(dtype=np.float64)
+        if op == "set":
+            new = np.full_like(current, float(value))
+        elif op == "add":
+            new = current + float(value)
+        else:
+            new = current * float(value)
+        lower, upper = field_bounds(feature)
+        new = np.clip(new, lower if lower is not None else -np.inf, upper if upper is not None else np.inf)
+        if field.annotation is int:
+            new = np.round(new)
+        changed[feature] = changed[feature].astype(np.float64)
+        changed.loc[mask, feature] = new
+    return changed
+
+
+def summarize(probabilities: np.ndarray) -> Dict[str, Any]:
+    """Risk-level mix, probability histogram and expected departures."""
+    levels = risk_levels(probabilities)
+    counts, _ = np.histogram(probabilities, bins=HISTOGRAM_EDGES)
+    return {
+        "risk_distribution": {level: int((levels == level).sum()) for level in ("low", "medium", "high")},
+        "histogram": counts.tolist(),
+        "mean_probability": round(float(probabilities.mean()), 4) if len(probabilities) else None,
+        "expected_departures": round(float(probabilities.sum()), 2),
+    }
+
+
+class Simulator:
+    """Runs scenarios on the roster snapshot, with an LRU result cache."""
+
+    def __init__(self, cache_size: int = SIMULATION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def run(self, frame: pd.DataFrame, version: int, scenario: Dict[str, Any], model) -> Dict[str, Any]:
+        """
+        Before/after comparison of a scenario, overall and per department.
+
+        Args:
+            frame: Roster snapshot (with `probability` column)
+            version: Roster version (part of the cache key)
+            scenario: {"filter": [...], "actions": [...]}
+            model: AttritionModel used for rescoring
+
+        Raises:
+            ValueError: Invalid feature, operation or category
+        """
+        key = (scenario_hash(scenario), version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return dict(self._cache[key], cached=True)
+
+        with stage("simulation"):
+            mask = select(frame, scenario.get("filter", []))
+            raw = frame[list(EmployeeInput.model_fields)]
+            changed = apply_actions(raw, mask, scenario.get("actions", []), model.categories)
+            after_frame = feature_engineer.engineer_features(changed)
+            before = frame["probability"].to_numpy()
+            after = model.predict_frame(after_frame)[1] if len(frame) else np.array([])
+
+            by_department = []
+            departments = frame["departement"].astype(object).fillna(UNKNOWN_GROUP).to_numpy()
+            for name in sorted(pd.unique(departments)):
+                rows = departments == name
+                by_department.append({
+                    "departement": name,
+                    "n_employees": int(rows.sum()),
+                    "n_affected": int((rows & mask).sum()),
+                    "expected_departures_before": round(float(before[rows].sum()), 2),
+                    "expected_departures_after": round(float(after[rows].sum()), 2),
+                    "delta": round(float(after[rows].sum() - before[rows].sum()), 2),
+                })
+
+            result = {
+                "scenario_hash": key[0],
+                "roster_version": version,
+                "n_employees": len(frame),
+                "n_affected": int(mask.sum()),
+                "before": summarize(before),
+                "after": summarize(after),
+                "by_department": by_department,
+            }
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(result, cached=False)
+
+
+# Singleton instance
+simulator = Simulator()
@@ -0,0 +1,192 @@
+"""
+Columnar, memory-mappable roster snapshot
+
+The roster (raw columns, optionally engineered features and current scores)
+is exported to a single file versioned by its UTC timestamp,
+roster-YYYYmmddTHHMMSSffffffZ.snap:
+
+    magic (4 bytes) | format version (uint32) | header length (uint64)
+    | JSON header | one array per column, each aligned to 64 bytes
+
+Numeric columns are stored as little-endian int64/float64 arrays; string
+columns are dictionary-encoded (integer codes, -1 = NULL, categories in
+the header), as in an Arrow IPC file. Loading memory-maps the file
+read-only: numeric columns are numpy views on the page cache and string
+columns pandas Categoricals over the mapped codes. Opening a snapshot
+costs O(columns), not O(rows), and processes share the same pages.
+"""
+
+import os
+import json
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.tracing import stage
+
+BASE_PATH = Path(__file__).parent.parent
+SNAPSHOT_DIR = Path(os.getenv("ROSTER_SNAPSHOT_DIR", str(BASE_PATH / "snapshots")))
+# Snapshots kept in SNAPSHOT_DIR (older ones are deleted on export)
+SNAPSHOT_KEEP = int(os.getenv("ROSTER_SNAPSHOT_KEEP", "5"))
+
+MAGIC = b"RSNP"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<4sIQ")
+
+# Sync bookkeeping columns of the employees table, not part of the snapshot
+EXCLUDED_COLUMNS = ("id", "created_at", "content_hash", "updated_at", "deleted_at")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _codes_dtype(n_categories: int) -> str:
+    """Smallest code type, the one pandas uses for Categorical codes (no copy on load)."""
+    if n_categories < 127:
+        return "|i1"
+    if n_categories < 32767:
+        return "<i2"
+    return "<i4"
+
+
+def encode_column(column: pd.Series) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Layout entry (without offset) and stored array of one column."""
+    if pd.api.types.is_bool_dtype(column) and not column.isna().any():
+        return {"kind": "bool"}, column.to_numpy(dtype="|b1")
+    if pd.api.types.is_integer_dtype(column) and not column.isna().any():
+        return {"kind": "int"}, column.to_numpy(dtype="<i8")
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return {"kind": "float"}, column.to_numpy(dtype="<f8", na_value=np.nan)
+    codes, categories = pd.factorize(column, use_na_sentinel=True)
+    categories = [str(c) for c in categories]
+    return {"kind": "category", "categories": categories}, codes.astype(_codes_dtype(len(categories)))
+
+
+def decode_column(entry: Dict[str, Any], values: np.ndarray):
+    """Column values from a stored array (Categorical over the codes for strings)."""
+    if entry["kind"] == "category":
+        return pd.Categorical.from_codes(values, entry["categories"])
+    return values
+
+
+def write_snapshot(frame: pd.DataFrame, directory: Path = SNAPSHOT_DIR,
+                   created_at: Optional[datetime] = None, metadata: Optional[Dict[str, Any]] = None,
+                   keep: int = SNAPSHOT_KEEP) -> Path:
+    """
+    Write a DataFrame as a new snapshot (atomic rename) and prune old ones.
+
+    Returns:
+        Path of the snapshot
+    """
+    created_at = created_at or datetime.utcnow()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    layout, arrays = [], []
+    offset = 0
+    for name in frame.columns:
+        entry, values = encode_column(frame[name])
+        offset = _aligned(offset)
+        layout.append({"name": name, "dtype": values.dtype.str, "offset": offset, **entry})
+        arrays.append(values)
+        offset += values.nbytes
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": created_at.isoformat(),
+        "n_rows": len(frame),
+        "columns": layout,
+        "payload_size": offset,
+        "metadata": metadata or {},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_offset = _aligned(_PREAMBLE.size + len(header_bytes))
+
+    path = directory / f"roster-{created_at:%Y%m%dT%H%M%S%f}Z.snap"
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for entry, values in zip(layout, arrays):
+            f.write(b"\0" * (data_offset + entry["offset"] - f.tell()))
+            f.write(values.tobytes())
+    os.replace(tmp_path, path)
+
+    for old in list_snapshots(directory)[:-keep] if keep > 0 else []:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_snapshots(directory: Path = SNAPSHOT_DIR) -> List[Path]:
+    """Snapshots of a directory, oldest first (names sort by timestamp)."""
+    return sorted(Path(directory).glob("roster-*Z.snap"))
+
+
+def latest_snapshot(directory: Path = SNAPSHOT_DIR) -> Optional[Path]:
+    snapshots = list_snapshots(directory)
+    return snapshots[-1] if snapshots else None
+
+
+def read_header(path: Path) -> Tuple[Dict[str, Any], int]:
+    """JSON header of a snapshot and the offset of its payload."""
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a roster snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} (expected {FORMAT_VERSION})")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    return header, _aligned(_PREAMBLE.size + header_len)
+
+
+def load_snapshot(path: Path) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Memory-map a snapshot read-only.
+
+    Returns:
+        (DataFrame whose columns are views on the file, header)
+    """
+    with stage("snapshot_load"):
+        header, data_offset = read_header(path)
+        n_rows = header["n_rows"]
+        mapped = np.memmap(path, dtype=np.uint8, mode="r")
+        columns = {}
+        for entry in header["columns"]:
+            values = np.frombuffer(mapped, dtype=entry["dtype"], count=n_rows,
+                                   offset=data_offset + entry["offset"])
+            columns[entry["name"]] = decode_column(entry, values)
+        frame = pd.DataFrame(columns, index=pd.RangeIndex(n_rows), copy=False)
+    return frame, header
+
+
+def export_snapshot(db: Session, features: bool = True, scores: bool = True,
+                    directory: Path = SNAPSHOT_DIR, keep: int = SNAPSHOT_KEEP) -> Path:
+    """
+    Export the current employees (deleted ones excluded) to a new snapshot.
+
+    Args:
+        features: Include the engineered features
+        scores: Include `probability` and `risk_level` (implies features)
+    """
+    from app.roster import read_employees, score_roster
+    from app.model import get_model
+
+    with stage("snapshot_export"):
+        frame = read_employees(db).drop(columns=list(EXCLUDED_COLUMNS), errors="ignore")
+        metadata = {"features": features or scores, "scores": scores}
+        if scores:
+            frame = score_roster(frame)
+            metadata["model_export_date"] = get_model().get_model_info()["export_date"]
+        elif features:
+            from app.feature_engineering import feature_engineer
+            frame = feature_engineer.engineer_features(frame)
+        return write_snapshot(frame, directory, metadata=metadata, keep=keep)
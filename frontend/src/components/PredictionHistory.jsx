@@ -35,6 +35,19 @@ export default function PredictionHistory() {
     fetchPredictions(page * limit)
   }, [page])
 
+  // Live feed on the first page: new predictions are pushed, no polling
+  useEffect(() => {
+    if (page !== 0) return
+    const source = new EventSource(`${API_URL}/predictions/stream`)
+    source.addEventListener('prediction', (e) => {
+      const p = JSON.parse(e.data)
+      setPredictions(prev => [p, ...prev.filter(x => x.id !== p.id)].slice(0, limit))
+    })
+    // Too far behind: the server dropped us, reload the page once
+    source.addEventListener('dropped', () => fetchPredictions(0))
+    return () => source.close()
+  }, [page])
+
   const formatDate = (dateStr) => {
     if (!dateStr) return '-'
     const d = new Date(dateStr)
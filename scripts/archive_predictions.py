@@ -0,0 +1,61 @@
+"""
+Apply the prediction log retention policy (app/archive.py)
+
+Run it on a schedule (e.g. daily cron). It creates the upcoming monthly
+partitions (PostgreSQL), then moves every month that ended more than
+PREDICTION_RETENTION_DAYS ago to a compressed columnar file in
+PREDICTION_ARCHIVE_DIR and drops it from the database. Running it twice is
+harmless. GET /predictions keeps serving archived months.
+
+Usage:
+    python scripts/archive_predictions.py [--retention-days 180] [--dir archive/]
+    python scripts/archive_predictions.py --partitions-only
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from app.database import SessionLocal  # noqa: E402
+from app.archive import (  # noqa: E402
+    ARCHIVE_DIR, RETENTION_DAYS, PARTITIONS_AHEAD, archive_predictions, ensure_partitions,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=ARCHIVE_DIR, help="Archive directory")
+    parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS, help="Days kept in the database")
+    parser.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD, help="Future monthly partitions created")
+    parser.add_argument("--partitions-only", action="store_true", help="Only create the upcoming partitions")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        partitions = ensure_partitions(db, ahead=args.ahead)
+        if partitions:
+            print(f"Partitions ready: {', '.join(partitions)}")
+        if args.partitions_only:
+            return
+
+        start = time.perf_counter()
+        archived = archive_predictions(db, retention_days=args.retention_days, directory=args.dir)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    for period in archived:
+        if period["path"]:
+            size = Path(period["path"]).stat().st_size
+            print(f"{period['period']}: {period['n_rows']} predictions -> {period['path']} ({size / 1e6:.2f} MB)")
+        else:
+            print(f"{period['period']}: empty partition dropped")
+    print(f"Archived {len(archived)} period(s) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
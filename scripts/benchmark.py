@@ -0,0 +1,246 @@
+"""
+Benchmark suite for the scoring and logging hot paths
+
+Runs offline: the database is the in-memory SQLite stand-in from
+tests/conftest.py and inputs are the rows of data/employees.csv.
+
+Cases:
+- engineer_features / model_predict: single-row latency
+- predict_batch[N]: AttritionModel.predict_batch throughput, N in 1/100/1k/10k
+- log_prediction: insert + commit of one prediction
+- endpoint_predict / endpoint_predict_batch[100]: HTTP round-trips (TestClient),
+  with tracing off, then again with tracing on (suffix "[traced]")
+
+Usage:
+    python scripts/benchmark.py run --output benchmarks/baseline.json
+    python scripts/benchmark.py run --output benchmarks/current.json --sizes 1 100 1000
+    python scripts/benchmark.py compare benchmarks/baseline.json benchmarks/current.json --threshold 1.2
+
+compare exits with status 1 when a case's median is slower than the
+baseline by more than the threshold ratio.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+CSV_PATH = BASE_PATH / "data" / "employees.csv"
+BENCHMARKS_DIR = BASE_PATH / "benchmarks"
+
+DEFAULT_SIZES = [1, 100, 1000, 10000]
+
+
+def load_raw_rows() -> List[Dict[str, Any]]:
+    """Raw employee inputs (engineered columns of the CSV are dropped)."""
+    import pandas as pd
+    from app.schemas import EmployeeInput
+
+    df = pd.read_csv(CSV_PATH)
+    return df[list(EmployeeInput.model_fields)].to_dict("records")
+
+
+def take(rows: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    """First n rows, cycling through the dataset when n exceeds it."""
+    return [rows[i % len(rows)] for i in range(n)]
+
+
+def measure(fn: Callable[[], Any], ops: int = 1, min_time: float = 1.0,
+            min_rounds: int = 3, max_rounds: int = 1000) -> Dict[str, Any]:
+    """
+    Time fn() repeatedly: at least min_rounds, until min_time has elapsed.
+
+    Args:
+        fn: Callable executing `ops` operations per round
+        ops: Operations per round (rows for batch cases)
+
+    Returns:
+        Per-round statistics in seconds and throughput in ops/s
+    """
+    fn()  # warmup
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_rounds and (
+        len(timings) < min_rounds or time.perf_counter() - started < min_time
+    ):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        "rounds": len(timings),
+        "ops_per_round": ops,
+        "min": timings[0],
+        "median": median,
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max": timings[-1],
+        "ops_per_sec": ops / median if median > 0 else None,
+    }
+
+
+def run_suite(sizes: List[int], min_time: float) -> Dict[str, Dict[str, Any]]:
+    """Run every benchmark case and return results keyed by case name."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.model import get_model
+    from app.database import Base, get_db, log_prediction
+    from app.feature_engineering import feature_engineer
+    from app.tracing import tracer
+    from app.whatif import axis_values, sweep
+    from tests.conftest import engine, TestingSessionLocal, override_get_db
+
+    rows = load_raw_rows()
+    model = get_model()
+    full_rows = [feature_engineer.engineer_features(r) for r in rows]
+    results = {}
+
+    def record(name: str, fn: Callable[[], Any], ops: int = 1, **kwargs) -> None:
+        results[name] = measure(fn, ops=ops, min_time=min_time, **kwargs)
+        r = results[name]
+        print(f"{name:<40} median {r['median'] * 1000:>10.3f} ms  "
+              f"{r['ops_per_sec']:>12.1f} ops/s  ({r['rounds']} rounds)")
+
+    record("engineer_features", lambda: feature_engineer.engineer_features(rows[0]))
+    record("model_predict", lambda: model.predict(full_rows[0]))
+
+    for size in sizes:
+        batch = take(full_rows, size)
+        # Large batches take seconds per round: a single measured round is enough
+        record(f"predict_batch[{size}]", lambda b=batch: model.predict_batch(b),
+               ops=size, min_rounds=1 if size >= 1000 else 3)
+
+    grid_axes = [
+        {"feature": feature, "values": axis_values(feature, None, start, stop, 100, model.categories)}
+        for feature, start, stop in [("revenu_mensuel", 1000, 20000), ("augementation_salaire_precedente", 0, 1)]
+    ]
+    record("whatif_grid[100x100]", lambda: sweep(model, rows[0], grid_axes), ops=10000)
+
+    Base.metadata.create_all(bind=engine)
+    try:
+        db = TestingSessionLocal()
+        try:
+            result = model.predict(full_rows[0])
+            record("log_prediction", lambda: log_prediction(
+                db=db,
+                input_data=full_rows[0],
+                prediction=result["prediction"],
+                probability=result["probability"],
+                risk_level=result["risk_level"],
+            ))
+        finally:
+            db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        tracing_enabled, sample_rate = tracer.enabled, tracer.sample_rate
+        tracer.sample_rate = 1.0  # worst case: every request traced
+        try:
+            with TestClient(app) as client:
+                payload = rows[0]
+                batch_payload = {"employees": take(rows, 100)}
+                for enabled, suffix in [(False, ""), (True, "[traced]")]:
+                    tracer.enabled = enabled
+                    record(f"endpoint_predict{suffix}", lambda: client.post("/predict", json=payload))
+                    record(f"endpoint_predict_batch[100]{suffix}",
+                           lambda: client.post("/predict/batch", json=batch_payload), ops=100)
+        finally:
+            tracer.enabled, tracer.sample_rate = tracing_enabled, sample_rate
+            app.dependency_overrides.clear()
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Context needed to interpret a baseline."""
+    from app.model import get_model
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_PATH,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model_format": get_model().model_format,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases."""
+    regressions = []
+    print(f"{'case':<40}{'baseline ms':>14}{'current ms':>14}{'ratio':>9}")
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            print(f"{name:<40}{base['median'] * 1000:>14.3f}{'missing':>14}")
+            continue
+        ratio = cur["median"] / base["median"] if base["median"] > 0 else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<40}{base['median'] * 1000:>14.3f}{cur['median'] * 1000:>14.3f}{ratio:>9.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the suite and save results as JSON")
+    run_parser.add_argument("--output", type=Path, default=BENCHMARKS_DIR / "results.json")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                            help="Batch sizes for predict_batch")
+    run_parser.add_argument("--min-time", type=float, default=1.0,
+                            help="Minimum measuring time per case (seconds)")
+
+    cmp_parser = sub.add_parser("compare", help="Compare results against a baseline")
+    cmp_parser.add_argument("baseline", type=Path)
+    cmp_parser.add_argument("current", type=Path)
+    cmp_parser.add_argument("--threshold", type=float, default=1.2,
+                            help="Slowdown ratio flagged as a regression")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_suite(args.sizes, args.min_time)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"Saved results to {args.output}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above x{args.threshold}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regression")
+
+
+if __name__ == "__main__":
+    main()
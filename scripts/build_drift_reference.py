@@ -0,0 +1,27 @@
+"""
+Build the reference profile used by the drift monitor
+
+Computes per-feature bins (numerical) and category proportions
+(categorical) from the `train` rows of data/employees.csv and writes
+models/drift_reference.json. Re-run after retraining the model.
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.drift import REFERENCE_PATH, build_reference_from_csv  # noqa: E402
+
+
+def main():
+    reference = build_reference_from_csv()
+    with open(REFERENCE_PATH, "w") as f:
+        json.dump(reference, f, indent=2, ensure_ascii=False)
+    print(f"Wrote {REFERENCE_PATH} ({len(reference['features'])} features, "
+          f"{reference['n_reference']} reference rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,39 +44,145 @@ CREATE TABLE IF NOT EXISTS employees (
     attrition_actual INTEGER,
     -- Dataset flag (train/test)
     dataset_type VARCHAR(10) DEFAULT 'test',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Roster sync (scripts/seed_db.py --sync)
+    content_hash VARCHAR(16),
+    updated_at TIMESTAMP,
+    deleted_at TIMESTAMP
+);
+
+-- Columns added after the first release (no-op on a fresh database)
+ALTER TABLE employees ADD COLUMN IF NOT EXISTS content_hash VARCHAR(16);
+ALTER TABLE employees ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+ALTER TABLE employees ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;
+
+-- Table: feature_vectors (prediction inputs, stored once per distinct content)
+-- hash = first 128 bits of the SHA-256 of the canonical JSON (sorted keys)
+CREATE TABLE IF NOT EXISTS feature_vectors (
+    hash VARCHAR(32) PRIMARY KEY,
+    data JSONB NOT NULL,  -- Contains raw + engineered features
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Columns changed after the first release (no-op on a fresh database);
+-- existing inline inputs are moved by scripts/migrate_feature_vectors.py
+ALTER TABLE IF EXISTS predictions ADD COLUMN IF NOT EXISTS input_hash VARCHAR(32) REFERENCES feature_vectors(hash);
+ALTER TABLE IF EXISTS predictions ALTER COLUMN input_data DROP NOT NULL;
+
+-- A prediction log created before partitioning is converted below
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'predictions' AND relkind = 'r') THEN
+        DROP INDEX IF EXISTS idx_predictions_created_at, idx_predictions_employee_id,
+            idx_predictions_risk_level, idx_predictions_input_hash;
+        ALTER TABLE predictions RENAME TO predictions_unpartitioned;
+    END IF;
+END $$;
+
 -- Table: predictions (log des appels API)
--- Stores input data (raw + computed features) and prediction results
+-- References its input data (raw + computed features), stores prediction results.
+-- Range-partitioned by month (predictions_pYYYYMM); the API's retention job
+-- (scripts/archive_predictions.py) creates upcoming partitions and moves old
+-- ones to archive files. The DEFAULT partition catches rows of months
+-- without a partition.
 CREATE TABLE IF NOT EXISTS predictions (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     employee_id INTEGER REFERENCES employees(employee_id),
-    input_data JSONB NOT NULL,  -- Contains raw + engineered features
+    input_hash VARCHAR(32) REFERENCES feature_vectors(hash),
+    input_data JSONB,  -- Inline inputs of rows logged before feature_vectors
     prediction INTEGER NOT NULL,
     probability FLOAT NOT NULL,
     risk_level VARCHAR(20),
     model_version VARCHAR(50) DEFAULT 'lr_v1.0',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS predictions_default PARTITION OF predictions DEFAULT;
+
+-- Monthly partitions from the oldest logged prediction to two months ahead,
+-- then copy of the unpartitioned log (if any)
+DO $$
+DECLARE
+    month DATE := date_trunc('month', CURRENT_DATE);
+BEGIN
+    IF to_regclass('predictions_unpartitioned') IS NOT NULL THEN
+        SELECT LEAST(month, COALESCE(date_trunc('month', MIN(created_at)), month))
+        INTO month FROM predictions_unpartitioned;
+    END IF;
+    WHILE month <= date_trunc('month', CURRENT_DATE) + INTERVAL '2 months' LOOP
+        EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF predictions FOR VALUES FROM (%L) TO (%L)',
+                       'predictions_p' || to_char(month, 'YYYYMM'), month, month + INTERVAL '1 month');
+        month := month + INTERVAL '1 month';
+    END LOOP;
+
+    IF to_regclass('predictions_unpartitioned') IS NOT NULL THEN
+        INSERT INTO predictions (id, employee_id, input_hash, input_data, prediction, probability,
+                                 risk_level, model_version, created_at)
+        SELECT id, employee_id, input_hash, input_data, prediction, probability,
+               risk_level, model_version, COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM predictions_unpartitioned;
+        PERFORM setval(pg_get_serial_sequence('predictions', 'id'),
+                       COALESCE((SELECT MAX(id) FROM predictions), 0) + 1, false);
+        DROP TABLE predictions_unpartitioned;
+    END IF;
+END $$;
 
 -- Indexes for faster queries
 CREATE INDEX IF NOT EXISTS idx_employees_employee_id ON employees(employee_id);
+CREATE INDEX IF NOT EXISTS idx_employees_updated_at ON employees(updated_at);
 CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_predictions_employee_id ON predictions(employee_id);
 CREATE INDEX IF NOT EXISTS idx_predictions_risk_level ON predictions(risk_level);
+CREATE INDEX IF NOT EXISTS idx_predictions_input_hash ON predictions(input_hash);
+
+-- Table: prediction_rollups (counters maintained on write by the API)
+-- One row per (granularity, bucket): minute, hour, day. All-time totals are
+-- summed over the day buckets (a single stored total row would serialize all
+-- writers on its lock). Statistics read O(buckets) rows instead of scanning
+-- predictions.
+CREATE TABLE IF NOT EXISTS prediction_rollups (
+    id SERIAL PRIMARY KEY,
+    granularity VARCHAR(10) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    n_predictions INTEGER NOT NULL DEFAULT 0,
+    n_attrition INTEGER NOT NULL DEFAULT 0,
+    sum_probability FLOAT NOT NULL DEFAULT 0,
+    n_low INTEGER NOT NULL DEFAULT 0,
+    n_medium INTEGER NOT NULL DEFAULT 0,
+    n_high INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (granularity, bucket_start)
+);
+
+-- Backfill from an existing prediction log (no-op on a fresh database)
+INSERT INTO prediction_rollups
+    (granularity, bucket_start, n_predictions, n_attrition, sum_probability, n_low, n_medium, n_high)
+SELECT g.granularity,
+       date_trunc(g.granularity, p.created_at) AS bucket_start,
+       COUNT(*),
+       COUNT(CASE WHEN p.prediction = 1 THEN 1 END),
+       SUM(p.probability),
+       COUNT(CASE WHEN p.risk_level = 'low' THEN 1 END),
+       COUNT(CASE WHEN p.risk_level = 'medium' THEN 1 END),
+       COUNT(CASE WHEN p.risk_level = 'high' THEN 1 END)
+FROM predictions p
+CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(granularity)
+WHERE NOT EXISTS (SELECT 1 FROM prediction_rollups)
+GROUP BY 1, 2;
 
--- View for prediction statistics
-CREATE OR REPLACE VIEW prediction_stats AS
+-- View for prediction statistics (sums the day buckets)
+DROP VIEW IF EXISTS prediction_stats;
+CREATE VIEW prediction_stats AS
 SELECT
-    COUNT(*) as total_predictions,
-    COUNT(CASE WHEN prediction = 1 THEN 1 END) as attrition_predicted,
-    COUNT(CASE WHEN prediction = 0 THEN 1 END) as no_attrition_predicted,
-    ROUND(AVG(probability)::numeric, 4) as avg_probability,
-    COUNT(CASE WHEN risk_level = 'high' THEN 1 END) as high_risk_count,
-    COUNT(CASE WHEN risk_level = 'medium' THEN 1 END) as medium_risk_count,
-    COUNT(CASE WHEN risk_level = 'low' THEN 1 END) as low_risk_count
-FROM predictions;
+    COALESCE(SUM(n_predictions), 0) as total_predictions,
+    COALESCE(SUM(n_attrition), 0) as attrition_predicted,
+    COALESCE(SUM(n_predictions - n_attrition), 0) as no_attrition_predicted,
+    ROUND((SUM(sum_probability) / NULLIF(SUM(n_predictions), 0))::numeric, 4) as avg_probability,
+    COALESCE(SUM(n_high), 0) as high_risk_count,
+    COALESCE(SUM(n_medium), 0) as medium_risk_count,
+    COALESCE(SUM(n_low), 0) as low_risk_count
+FROM prediction_rollups
+WHERE granularity = 'day';
 
 -- View for employee attrition summary
 CREATE OR REPLACE VIEW employee_summary AS
@@ -0,0 +1,115 @@
+"""
+Export the fitted pipeline to the compact memory-mappable format
+
+Reads models/lr_pipeline.pkl and writes models/lr_pipeline.bin next to
+features.json and model_metadata.json. The compact artifact is checked
+against the pickle on data/employees.csv before the script exits.
+
+Usage:
+    python scripts/export_compact_model.py            # export + verify
+    python scripts/export_compact_model.py --compare  # + load time / RSS comparison
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from app.compact_model import CompactPipeline, export_pipeline  # noqa: E402
+from app.model import MODEL_PATH, COMPACT_MODEL_PATH, FEATURES_PATH  # noqa: E402
+
+CSV_PATH = BASE_PATH / "data" / "employees.csv"
+
+# Run in a fresh interpreter so imports and RSS are not shared between formats.
+# numpy/pandas are imported first: both formats need them to score.
+# RSS is read from /proc (Linux only).
+LOAD_PROBE = """
+import os, sys, time
+import numpy, pandas
+sys.path.insert(0, {base!r})
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+rss_before = rss_kb()
+start = time.perf_counter()
+if {fmt!r} == "pickle":
+    import joblib
+    joblib.load({path!r})
+else:
+    from app.compact_model import CompactPipeline
+    CompactPipeline({path!r})
+elapsed = time.perf_counter() - start
+print(elapsed, rss_kb() - rss_before, "sklearn" in sys.modules)
+"""
+
+
+def verify(features_info: dict) -> float:
+    """Return the max absolute probability difference between both formats."""
+    import joblib
+
+    pipeline = joblib.load(MODEL_PATH)
+    compact = CompactPipeline(COMPACT_MODEL_PATH)
+
+    df = pd.read_csv(CSV_PATH)[features_info["features"]]
+    expected = pipeline.predict_proba(df)[:, 1]
+    actual = compact.predict_proba(df)[:, 1]
+
+    if not np.array_equal(pipeline.predict(df), compact.predict(df)):
+        raise AssertionError("Compact model predictions differ from the pickle")
+    return float(np.max(np.abs(expected - actual)))
+
+
+def measure(fmt: str, path: Path) -> dict:
+    """Load one artifact in a subprocess and report time, RSS growth and sklearn import."""
+    code = LOAD_PROBE.format(base=str(BASE_PATH), fmt=fmt, path=str(path))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, rss_kb, sklearn_loaded = out.stdout.split()
+    return {
+        "format": fmt,
+        "size_kb": round(path.stat().st_size / 1024, 1),
+        "load_ms": round(float(elapsed) * 1000, 2),
+        "load_rss_mb": round(int(rss_kb) / 1024, 1),
+        "sklearn_imported": sklearn_loaded == "True",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare", action="store_true", help="Compare load time and RSS with the pickle")
+    args = parser.parse_args()
+
+    import joblib
+
+    with open(FEATURES_PATH, "r") as f:
+        features_info = json.load(f)
+
+    print(f"Loading pipeline from {MODEL_PATH}...")
+    pipeline = joblib.load(MODEL_PATH)
+
+    header = export_pipeline(pipeline, COMPACT_MODEL_PATH, features_info)
+    print(f"Wrote {COMPACT_MODEL_PATH} ({header['payload_size']} parameters, "
+          f"format v{header['format_version']}, sklearn {header['sklearn_version']})")
+
+    max_diff = verify(features_info)
+    print(f"Verified against pickle on {CSV_PATH.name}: max |dp| = {max_diff:.2e}")
+
+    if args.compare:
+        print()
+        print(f"{'format':<10}{'size (KB)':>12}{'load (ms)':>12}{'+RSS (MB)':>16}  sklearn")
+        for fmt, path in [("pickle", MODEL_PATH), ("compact", COMPACT_MODEL_PATH)]:
+            r = measure(fmt, path)
+            print(f"{r['format']:<10}{r['size_kb']:>12}{r['load_ms']:>12}{r['load_rss_mb']:>16}  "
+                  f"{'yes' if r['sklearn_imported'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
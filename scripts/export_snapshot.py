@@ -0,0 +1,99 @@
+"""
+Export the employees roster to a columnar snapshot (app/snapshot.py)
+
+Run it on a schedule (e.g. cron) or after a sync (seed_db.py --sync
+--snapshot). API processes started with ROSTER_SOURCE=snapshot memory-map
+the newest file at their next roster refresh; scripts can use
+app.snapshot.load_snapshot(latest_snapshot()) without touching the database.
+
+Usage:
+    python scripts/export_snapshot.py [--no-scores] [--no-features] [--dir snapshots/]
+    python scripts/export_snapshot.py --compare   # load/query latency: database vs snapshot
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.roster import read_employees, score_roster, risk_aggregates  # noqa: E402
+from app.snapshot import SNAPSHOT_DIR, SNAPSHOT_KEEP, export_snapshot, latest_snapshot, load_snapshot  # noqa: E402
+
+
+def timed(fn, rounds: int = 5) -> float:
+    """Median wall time of fn() in milliseconds."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def compare(directory: Path) -> None:
+    """Print database vs snapshot latencies for loading and a grouped aggregate."""
+    import numpy as np
+
+    path = latest_snapshot(directory)
+    if path is None:
+        print(f"No snapshot in {directory}: run without --compare first")
+        return
+
+    db = SessionLocal()
+    try:
+        frame, header = load_snapshot(path)
+        everyone = np.ones(len(frame), dtype=bool)
+        cases = [
+            ("load raw roster", lambda: read_employees(db), lambda: load_snapshot(path)),
+            ("load scored roster", lambda: score_roster(read_employees(db)), lambda: load_snapshot(path)),
+            ("count + mean salary by departement",
+             lambda: db.execute(text(
+                 "SELECT departement, COUNT(*), AVG(revenu_mensuel) FROM employees "
+                 "WHERE deleted_at IS NULL GROUP BY departement")).all(),
+             lambda: frame.groupby("departement", observed=True)["revenu_mensuel"].agg(["count", "mean"])),
+        ]
+        if header["metadata"].get("scores"):
+            cases.append(("risk aggregates by poste", None, lambda: risk_aggregates(frame, "poste", everyone)))
+
+        print(f"Snapshot {path.name}: {header['n_rows']} rows, {len(header['columns'])} columns")
+        print(f"{'case':<36}{'database ms':>14}{'snapshot ms':>14}")
+        for name, from_db, from_snapshot in cases:
+            db_ms = f"{timed(from_db):>14.2f}" if from_db else f"{'-':>14}"
+            print(f"{name:<36}{db_ms}{timed(from_snapshot):>14.2f}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument("--keep", type=int, default=SNAPSHOT_KEEP, help="Snapshots kept")
+    parser.add_argument("--no-features", action="store_true", help="Raw columns only")
+    parser.add_argument("--no-scores", action="store_true", help="Without probability/risk_level")
+    parser.add_argument("--compare", action="store_true", help="Compare with database queries")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.dir)
+        return
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        path = export_snapshot(db, features=not args.no_features, scores=not args.no_scores,
+                               directory=args.dir, keep=args.keep)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"Snapshot written to {path} ({path.stat().st_size / 1e6:.1f} MB) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
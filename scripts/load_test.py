@@ -0,0 +1,317 @@
+"""
+Load generator replaying data/employees.csv against the API
+
+Builds EmployeeInput payloads from the CSV and drives /predict,
+/predict/batch and /employees/{id}/predict, either:
+
+- closed loop: --concurrency workers sending back-to-back requests
+- open loop: --rate requests/s with Poisson arrivals; latency is measured
+  from the scheduled send time so queueing is not hidden
+
+Targets:
+- in-process (default): the FastAPI app over ASGI with a temporary SQLite
+  database seeded from the CSV
+- --url: a running server, e.g. a local uvicorn on SQLite:
+
+    python scripts/load_test.py --seed-db sqlite:///./load.db
+    DATABASE_URL=sqlite:///./load.db uvicorn app.main:app --workers 2
+    python scripts/load_test.py --url http://localhost:8000 --rate 200 --duration 30
+
+Usage:
+    python scripts/load_test.py --concurrency 8 --duration 20
+    python scripts/load_test.py --mix predict=0.6,batch=0.2,employee=0.2 --batch-size 50
+    python scripts/load_test.py --rate 100 --duration 30 --output load.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+CSV_PATH = BASE_PATH / "data" / "employees.csv"
+
+ENDPOINTS = ("predict", "batch", "employee")
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+def load_dataset() -> Tuple[List[Dict[str, Any]], List[int]]:
+    """EmployeeInput payloads and employee ids from the CSV."""
+    import pandas as pd
+    from app.schemas import EmployeeInput
+
+    df = pd.read_csv(CSV_PATH)
+    payloads = df[list(EmployeeInput.model_fields)].to_dict("records")
+    return payloads, df["employee_id"].astype(int).tolist()
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'predict=0.7,batch=0.2,employee=0.1' into normalized weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (expected one of {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Mix weights must sum to a positive value")
+    return {name: w / total for name, w in weights.items()}
+
+
+class RequestFactory:
+    """Draws the next request (endpoint, method, path, body) from the mix."""
+
+    def __init__(self, payloads, employee_ids, mix: Dict[str, float], batch_size: int, seed: int):
+        self.payloads = payloads
+        self.employee_ids = employee_ids
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+
+    def next(self) -> Tuple[str, str, str, Optional[dict]]:
+        name = self.rng.choices(self.names, self.weights)[0]
+        if name == "predict":
+            return name, "POST", "/predict", self.rng.choice(self.payloads)
+        if name == "batch":
+            start = self.rng.randrange(len(self.payloads))
+            rows = [self.payloads[(start + i) % len(self.payloads)] for i in range(self.batch_size)]
+            return name, "POST", "/predict/batch", {"employees": rows}
+        return name, "GET", f"/employees/{self.rng.choice(self.employee_ids)}/predict", None
+
+
+class Recorder:
+    """Collects latencies and errors per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        self.errors: Dict[str, Dict[str, int]] = {name: {} for name in ENDPOINTS}
+        self.rows: Dict[str, int] = {name: 0 for name in ENDPOINTS}
+        self.dropped = 0
+
+    def record(self, name: str, latency: float, error: Optional[str], rows: int) -> None:
+        self.latencies[name].append(latency)
+        if error is not None:
+            self.errors[name][error] = self.errors[name].get(error, 0) + 1
+        else:
+            self.rows[name] += rows
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    """Throughput, latency percentiles and error rate per endpoint and overall."""
+    summary = {"elapsed_s": round(elapsed, 3), "dropped": recorder.dropped, "endpoints": {}}
+    all_latencies = []
+    total_errors = 0
+    total_rows = 0
+    for name in ENDPOINTS:
+        latencies = sorted(recorder.latencies[name])
+        if not latencies:
+            continue
+        errors = sum(recorder.errors[name].values())
+        all_latencies.extend(latencies)
+        total_errors += errors
+        total_rows += recorder.rows[name]
+        summary["endpoints"][name] = _stats(latencies, errors, recorder.rows[name], elapsed)
+        summary["endpoints"][name]["errors_by_type"] = recorder.errors[name]
+    summary["overall"] = _stats(sorted(all_latencies), total_errors, total_rows, elapsed)
+    return summary
+
+
+def _stats(latencies: List[float], errors: int, rows: int, elapsed: float) -> Dict[str, Any]:
+    count = len(latencies)
+    stats = {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "rows_per_s": round(rows / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+    }
+    for p in PERCENTILES:
+        stats[f"p{p:g}_ms"] = round(percentile(latencies, p) * 1000, 3)
+    stats["max_ms"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    return stats
+
+
+async def send(client, factory: RequestFactory, recorder: Recorder, scheduled: Optional[float] = None) -> None:
+    """Send one request and record its latency (from `scheduled` in open loop)."""
+    name, method, path, body = factory.next()
+    start = scheduled if scheduled is not None else time.perf_counter()
+    error = None
+    rows = len(body["employees"]) if name == "batch" else 1
+    try:
+        response = await client.request(method, path, json=body)
+        if response.status_code >= 400:
+            error = f"http_{response.status_code}"
+    except Exception as e:
+        error = type(e).__name__
+    recorder.record(name, time.perf_counter() - start, error, rows)
+
+
+async def closed_loop(client, factory, recorder, concurrency: int, duration: float, max_requests: int) -> None:
+    """N workers, each sending the next request as soon as the previous one completes."""
+    deadline = time.perf_counter() + duration
+    sent = 0
+
+    async def worker():
+        nonlocal sent
+        while time.perf_counter() < deadline and (not max_requests or sent < max_requests):
+            sent += 1
+            await send(client, factory, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(client, factory, recorder, rate: float, duration: float,
+                    max_requests: int, max_in_flight: int, seed: int) -> None:
+    """Poisson arrivals at `rate`/s, independent of response times."""
+    rng = random.Random(seed + 1)
+    in_flight = set()
+    start = time.perf_counter()
+    next_at = start
+    sent = 0
+    while next_at < start + duration and (not max_requests or sent < max_requests):
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            recorder.dropped += 1
+        else:
+            task = asyncio.create_task(send(client, factory, recorder, scheduled=next_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            sent += 1
+        next_at += rng.expovariate(rate)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+def seed_database(url: str) -> None:
+    """Create tables and load employees from the CSV into `url`."""
+    from sqlalchemy import create_engine
+    from app.database import Base
+    from scripts.seed_db import seed_employees
+
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    Base.metadata.create_all(bind=engine)
+    seed_employees(engine)
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    payloads, employee_ids = load_dataset()
+    factory = RequestFactory(payloads, employee_ids, parse_mix(args.mix), args.batch_size, args.seed)
+    recorder = Recorder()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=args.max_in_flight))
+        target = args.url
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://loadtest", timeout=args.timeout)
+        target = "in-process"
+
+    print(f"Target: {target} | mix: {args.mix} | batch size: {args.batch_size}")
+    if args.rate:
+        print(f"Open loop: {args.rate} req/s for {args.duration}s (max in flight {args.max_in_flight})")
+    else:
+        print(f"Closed loop: {args.concurrency} workers for {args.duration}s")
+
+    started = time.perf_counter()
+    async with client:
+        if args.rate:
+            await open_loop(client, factory, recorder, args.rate, args.duration,
+                            args.requests, args.max_in_flight, args.seed)
+        else:
+            await closed_loop(client, factory, recorder, args.concurrency, args.duration, args.requests)
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(recorder, elapsed)
+    summary["config"] = {
+        "target": target,
+        "mode": "open" if args.rate else "closed",
+        "rate": args.rate,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": args.mix,
+        "batch_size": args.batch_size,
+    }
+    return summary
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    columns = ["requests", "throughput_rps", "rows_per_s", "error_rate",
+               "p50_ms", "p95_ms", "p99_ms", "p99.9_ms", "max_ms"]
+    print()
+    print(f"{'endpoint':<10}" + "".join(f"{c:>15}" for c in columns))
+    rows = list(summary["endpoints"].items()) + [("overall", summary["overall"])]
+    for name, stats in rows:
+        print(f"{name:<10}" + "".join(f"{stats[c]:>15}" for c in columns))
+    if summary["dropped"]:
+        print(f"\n{summary['dropped']} arrivals dropped (max in flight reached)")
+    for name, stats in summary["endpoints"].items():
+        if stats["errors_by_type"]:
+            print(f"{name} errors: {stats['errors_by_type']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running API (default: in-process app)")
+    parser.add_argument("--seed-db", metavar="DATABASE_URL",
+                        help="Create tables and seed employees into DATABASE_URL, then exit")
+    parser.add_argument("--mix", default="predict=0.7,batch=0.1,employee=0.2",
+                        help="Endpoint weights (predict, batch, employee)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per /predict/batch call")
+    parser.add_argument("--concurrency", type=int, default=4, help="Closed-loop workers")
+    parser.add_argument("--rate", type=float, default=0.0, help="Open-loop arrival rate (req/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration (seconds)")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after N requests (0 = no limit)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Open-loop concurrency cap")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", type=Path, help="Write the JSON summary to this file")
+    args = parser.parse_args()
+
+    if args.seed_db:
+        os.environ["DATABASE_URL"] = args.seed_db
+        seed_database(args.seed_db)
+        return
+
+    if not args.url:
+        # In-process target: temporary SQLite database seeded from the CSV.
+        # Must be set before app.database is imported.
+        db_path = Path(tempfile.mkdtemp()) / "loadtest.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        seed_database(os.environ["DATABASE_URL"])
+
+    summary = asyncio.run(run(args))
+    print_report(summary)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Saved summary to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Move inline prediction inputs to the content-addressed feature_vectors table
+
+Predictions logged before feature_vectors existed carry their input JSON in
+predictions.input_data. This script hashes each of them, stores every
+distinct input once in feature_vectors, points the prediction at it
+(input_hash) and clears the inline copy. Rows are migrated in batches of
+--batch-size, each committed on its own: the migration can be interrupted
+and resumed, and running it again is a no-op.
+
+A storage report is printed afterwards (and alone with --report): input
+bytes if every prediction kept its own copy vs. distinct vectors plus one
+hash per prediction. On PostgreSQL, the space of cleared rows is reused by
+new rows; run VACUUM FULL predictions to return it to the OS.
+
+Usage:
+    python scripts/migrate_feature_vectors.py [--batch-size 5000]
+    python scripts/migrate_feature_vectors.py --report
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from sqlalchemy import bindparam, func, null, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import (  # noqa: E402
+    SessionLocal, FeatureVector, Prediction, canonical_json, store_feature_vectors,
+)
+
+BATCH_SIZE = 5000
+
+
+def migrate_inputs(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Move inline inputs to feature_vectors, one committed batch at a time.
+
+    Returns:
+        Number of predictions migrated
+    """
+    table = Prediction.__table__
+    statement = table.update().where(table.c.id == bindparam("match_id")).values(
+        input_hash=bindparam("new_hash"), input_data=null()
+    )
+    migrated, last_id = 0, 0
+    while True:
+        rows = db.query(Prediction.id, Prediction.input_data).filter(
+            Prediction.id > last_id, Prediction.input_hash.is_(None), Prediction.input_data.isnot(None)
+        ).order_by(Prediction.id).limit(batch_size).all()
+        if not rows:
+            return migrated
+        hashes = store_feature_vectors(db, [row.input_data for row in rows])
+        db.execute(statement, [{"match_id": row.id, "new_hash": h} for row, h in zip(rows, hashes)])
+        db.commit()
+        migrated += len(rows)
+        last_id = rows[-1].id
+
+
+def storage_report(db: Session) -> Dict[str, Any]:
+    """
+    Input storage with and without deduplication, in bytes of canonical JSON.
+
+    Returns:
+        n_predictions, n_inline (not migrated), n_vectors, inline_bytes
+        (every prediction with its own copy), stored_bytes (vectors + hash
+        references + remaining inline copies), saved_bytes and saved_ratio
+    """
+    hash_size = FeatureVector.hash.type.length
+    references = dict(
+        db.query(Prediction.input_hash, func.count()).filter(Prediction.input_hash.isnot(None))
+        .group_by(Prediction.input_hash).all()
+    )
+    n_predictions = db.query(func.count(Prediction.id)).scalar()
+
+    inline_bytes = stored_bytes = n_vectors = 0
+    for vector_hash, data in db.query(FeatureVector.hash, FeatureVector.data).yield_per(1000):
+        size = len(canonical_json(data).encode("utf-8"))
+        n_vectors += 1
+        stored_bytes += size
+        inline_bytes += size * references.get(vector_hash, 0)
+    stored_bytes += hash_size * sum(references.values())
+
+    n_inline = 0
+    for (data,) in db.query(Prediction.input_data).filter(
+        Prediction.input_hash.is_(None), Prediction.input_data.isnot(None)
+    ).yield_per(1000):
+        size = len(canonical_json(data).encode("utf-8"))
+        n_inline += 1
+        inline_bytes += size
+        stored_bytes += size
+
+    report = {
+        "n_predictions": n_predictions,
+        "n_inline": n_inline,
+        "n_vectors": n_vectors,
+        "inline_bytes": inline_bytes,
+        "stored_bytes": stored_bytes,
+        "saved_bytes": inline_bytes - stored_bytes,
+        "saved_ratio": round(1 - stored_bytes / inline_bytes, 4) if inline_bytes else 0.0,
+    }
+    if db.get_bind().dialect.name == "postgresql":
+        report["table_bytes"] = {
+            name: db.execute(text("SELECT pg_total_relation_size(:name)"), {"name": name}).scalar()
+            for name in ("predictions", "feature_vectors")
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Predictions: {report['n_predictions']} ({report['n_inline']} with inline inputs), "
+          f"distinct input vectors: {report['n_vectors']}")
+    print(f"Input storage: {report['inline_bytes'] / 1e6:.2f} MB as one copy per prediction, "
+          f"{report['stored_bytes'] / 1e6:.2f} MB deduplicated "
+          f"({report['saved_bytes'] / 1e6:.2f} MB, {report['saved_ratio']:.1%} saved)")
+    for name, size in report.get("table_bytes", {}).items():
+        print(f"  {name}: {size / 1e6:.2f} MB on disk")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Predictions per transaction")
+    parser.add_argument("--report", action="store_true", help="Only print the storage report")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not args.report:
+            start = time.perf_counter()
+            migrated = migrate_inputs(db, args.batch_size)
+            print(f"Migrated {migrated} predictions in {time.perf_counter() - start:.2f}s")
+        print_report(storage_report(db))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,47 @@ Seed the database with employee data from CSV
 
 Note: CSV may contain engineered features from P4, but we only store RAW data.
 Engineered features are computed on-the-fly during prediction.
+
+The CSV is streamed in chunks of SEED_CHUNK_SIZE rows, each chunk is
+validated against the Employee schema and bulk-loaded with PostgreSQL
+COPY FROM STDIN through psycopg 3 or psycopg2 (executemany on other
+databases and drivers, e.g. SQLite; the path taken is printed). Memory
+stays flat whatever the file size; the whole load is one transaction.
+
+With --sync, an already populated table is synchronized with the file
+instead: rows are matched by employee_id and compared by content hash, only
+new and changed rows are written, employees missing from the file are
+flagged (deleted_at). The changed employee ids are printed, and written as
+JSON with --changes, so caches and stored scores can be invalidated
+selectively.
+
+With --snapshot, a new columnar roster snapshot (app/snapshot.py) is
+exported after a load or a sync that changed rows.
+
+Usage:
+    python scripts/seed_db.py [path/to/employees.csv] [--snapshot]
+    python scripts/seed_db.py --sync [path/to/employees.csv] [--changes changes.json] [--snapshot]
 """
 
+import io
 import os
-import pandas as pd
-from sqlalchemy import create_engine, text
+import sys
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text, bindparam
+
+BASE_PATH = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from app.database import Employee, canonical_json  # noqa: E402
 
 # Database URL
 DATABASE_URL = os.getenv(
@@ -17,7 +52,10 @@ DATABASE_URL = os.getenv(
 )
 
 # Path to CSV
-CSV_PATH = Path(__file__).parent.parent / "data" / "employees.csv"
+CSV_PATH = BASE_PATH / "data" / "employees.csv"
+
+# Rows read, validated and loaded at a time
+CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", "10000"))
 
 # Engineered features to drop (computed on-the-fly in API)
 ENGINEERED_FEATURES = [
@@ -31,53 +69,295 @@ ENGINEERED_FEATURES = [
     'surcharge_travail',
 ]
 
+# Columns that may be absent from the CSV
+OPTIONAL_COLUMNS = {"attrition_actual": None, "dataset_type": "test"}
+# Columns maintained by the loader, never read from the CSV
+LOADER_COLUMNS = ("id", "created_at", "content_hash", "updated_at", "deleted_at")
 
-def seed_employees():
-    """Load employees from CSV into PostgreSQL."""
-    print(f"Connecting to database...")
-    engine = create_engine(DATABASE_URL)
+# Employee ids per statement when flagging deleted rows
+DELETE_BATCH_SIZE = 1000
+
+# PostgreSQL drivers loaded with COPY FROM STDIN (psycopg is psycopg 3)
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+
+def employee_columns() -> Dict[str, object]:
+    """Columns of the employees table read from the CSV -> SQLAlchemy column."""
+    return {c.name: c for c in Employee.__table__.columns if c.name not in LOADER_COLUMNS}
+
+
+def validate_chunk(chunk: pd.DataFrame, columns: Dict[str, object], first_line: int) -> pd.DataFrame:
+    """
+    Cast a chunk read from the CSV to the Employee schema.
+
+    Integer columns must hold whole numbers, float columns numbers and
+    string columns fit their VARCHAR length; empty cells become NULL.
+
+    Raises:
+        ValueError: Missing column or invalid value (with its CSV line number)
+    """
+    missing = [name for name in columns if name not in chunk.columns and name not in OPTIONAL_COLUMNS]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    out = {}
+    for name, column in columns.items():
+        if name not in chunk.columns:
+            out[name] = pd.Series(OPTIONAL_COLUMNS[name], index=chunk.index, dtype=object)
+            continue
+
+        raw = chunk[name]
+        python_type = column.type.python_type
+        if python_type is str:
+            values = raw.astype(object)
+            length = column.type.length
+            bad = values.notna() & (values.str.len() > length) if length else pd.Series(False, index=raw.index)
+        else:
+            values = pd.to_numeric(raw, errors="coerce")
+            bad = raw.notna() & values.isna()
+            if python_type is int:
+                bad |= values.notna() & (values != values.round())
+                values = values.round().astype("Int64")
+            else:
+                values = values.astype(np.float64)  # same dtype in every chunk, for stable hashes
+        if bad.any():
+            row = int(bad.to_numpy().argmax())
+            raise ValueError(f"Line {first_line + row}: invalid {name} {raw.iloc[row]!r} "
+                             f"(expected {python_type.__name__})")
+        out[name] = values
+
+    df = pd.DataFrame(out)
+    if df["employee_id"].isna().any():
+        row = int(df["employee_id"].isna().to_numpy().argmax())
+        raise ValueError(f"Line {first_line + row}: employee_id is required")
+    df["dataset_type"] = df["dataset_type"].fillna(OPTIONAL_COLUMNS["dataset_type"])
+    return df
+
+
+def content_hashes(df: pd.DataFrame) -> List[str]:
+    """
+    64-bit SHA-256 prefix of each row's loaded columns (canonical JSON), as
+    16 hex digits. Unlike pandas' own row hash it does not change across
+    pandas versions, so stored hashes stay comparable after an upgrade.
+    """
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    return [hashlib.sha256(canonical_json(record).encode("utf-8")).hexdigest()[:16] for record in records]
+
+
+def read_chunks(csv_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Validated chunks of the CSV with their content hash and load timestamps."""
+    columns = employee_columns()
+    # Numeric columns are parsed by the C reader; validate_chunk only re-parses
+    # the ones that came out as text (i.e. hold an invalid value)
+    text_columns = {name: str for name, column in columns.items() if column.type.python_type is str}
+    first_line = 2  # line 1 is the header
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=text_columns):
+        chunk = chunk.drop(columns=[c for c in ENGINEERED_FEATURES if c in chunk.columns])
+        df = validate_chunk(chunk, columns, first_line)
+        df["content_hash"] = content_hashes(df)
+        df["created_at"] = df["updated_at"] = datetime.utcnow()
+        yield df
+        first_line += len(chunk)
+
+
+def copy_chunk(conn, df: pd.DataFrame) -> None:
+    """PostgreSQL: stream a chunk as CSV through COPY FROM STDIN (psycopg2 or psycopg 3)."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, header=False, index=False)
+    sql = f"COPY employees ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        if conn.dialect.driver == "psycopg2":
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
 
-    print(f"Reading CSV from {CSV_PATH}...")
-    if not CSV_PATH.exists():
-        print(f"ERROR: CSV file not found at {CSV_PATH}")
-        return False
 
-    df = pd.read_csv(CSV_PATH)
-    print(f"Loaded {len(df)} employees from CSV")
+def chunk_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows as dicts of Python values, NULLs as None."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
 
-    # Drop engineered features (stored in CSV but computed on-the-fly in API)
-    cols_to_drop = [col for col in ENGINEERED_FEATURES if col in df.columns]
-    if cols_to_drop:
-        print(f"Dropping engineered features: {cols_to_drop}")
-        df = df.drop(columns=cols_to_drop)
+
+def insert_chunk(conn, df: pd.DataFrame) -> None:
+    """Other databases: one executemany INSERT per chunk."""
+    conn.execute(Employee.__table__.insert(), chunk_records(df))
+
+
+def chunk_loader(dialect) -> Callable:
+    """COPY on PostgreSQL through psycopg2 or psycopg 3 (default driver of postgresql://), else executemany."""
+    if dialect.name == "postgresql" and dialect.driver in COPY_DRIVERS:
+        return copy_chunk
+    return insert_chunk
+
+
+def load_mode(load_chunk: Callable, dialect) -> str:
+    """Loading path for the logs, e.g. 'COPY via psycopg'."""
+    return f"{'COPY' if load_chunk is copy_chunk else 'executemany'} via {dialect.driver}"
+
+
+def update_chunk(conn, df: pd.DataFrame) -> None:
+    """executemany UPDATE by employee_id (creation date kept, deleted flag cleared)."""
+    records = chunk_records(df.drop(columns=["created_at"]))
+    for record in records:
+        record["match_id"] = record.pop("employee_id")
+        record["deleted_at"] = None
+    table = Employee.__table__
+    conn.execute(table.update().where(table.c.employee_id == bindparam("match_id")), records)
+
+
+def flag_deleted(conn, employee_ids: List[int], when: datetime) -> None:
+    """Set deleted_at on employees missing from the source roster."""
+    table = Employee.__table__
+    for i in range(0, len(employee_ids), DELETE_BATCH_SIZE):
+        batch = employee_ids[i:i + DELETE_BATCH_SIZE]
+        conn.execute(table.update().where(table.c.employee_id.in_(batch)).values(deleted_at=when, updated_at=when))
+
+
+def seed_employees(engine=None, csv_path: Optional[Path] = None, chunk_size: int = CHUNK_SIZE):
+    """Load employees from CSV into PostgreSQL (or the given engine)."""
+    if engine is None:
+        print("Connecting to database...")
+        engine = create_engine(DATABASE_URL)
+    csv_path = Path(csv_path or CSV_PATH)
+
+    print(f"Reading CSV from {csv_path}...")
+    if not csv_path.exists():
+        print(f"ERROR: CSV file not found at {csv_path}")
+        return False
 
     # Check if data already exists
     with engine.connect() as conn:
         result = conn.execute(text("SELECT COUNT(*) FROM employees"))
         count = result.scalar()
         if count > 0:
-            print(f"Database already contains {count} employees. Skipping seed.")
+            print(f"Database already contains {count} employees. Skipping seed (use --sync to update).")
             return True
 
-    # Insert data
-    print("Inserting employees into database...")
-    df.to_sql(
-        "employees",
-        engine,
-        if_exists="append",
-        index=False,
-        method="multi"
-    )
+    load_chunk = chunk_loader(engine.dialect)
+    print(f"Inserting employees into database ({load_mode(load_chunk, engine.dialect)}, "
+          f"chunks of {chunk_size} rows)...")
+
+    start = time.perf_counter()
+    n_rows = 0
+    try:
+        with engine.begin() as conn:
+            for df in read_chunks(csv_path, chunk_size):
+                load_chunk(conn, df)
+                n_rows += len(df)
+                elapsed = time.perf_counter() - start
+                print(f"  {n_rows} rows ({n_rows / elapsed:,.0f} rows/s)")
+    except ValueError as e:
+        print(f"ERROR: {e}. Nothing was inserted.")
+        return False
+    elapsed = time.perf_counter() - start
 
     # Verify
     with engine.connect() as conn:
         result = conn.execute(text("SELECT COUNT(*) FROM employees"))
         count = result.scalar()
-        print(f"Successfully inserted {count} employees")
+        print(f"Successfully inserted {count} employees "
+              f"in {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
 
     return True
 
 
+def sync_employees(engine=None, csv_path: Optional[Path] = None,
+                   chunk_size: int = CHUNK_SIZE) -> Optional[Dict[str, Any]]:
+    """
+    Upsert the CSV into the employees table by employee_id.
+
+    Only the ids and content hashes of existing rows are read; new rows are
+    bulk-loaded, rows whose hash changed (or that were flagged deleted) are
+    updated, unchanged rows are not written. Active employees absent from
+    the file get deleted_at set. One transaction.
+
+    Returns:
+        {"inserted", "updated", "deleted": sorted employee ids, "unchanged": count},
+        or None if the file is missing or invalid
+    """
+    if engine is None:
+        engine = create_engine(DATABASE_URL)
+    csv_path = Path(csv_path or CSV_PATH)
+    if not csv_path.exists():
+        print(f"ERROR: CSV file not found at {csv_path}")
+        return None
+
+    load_chunk = chunk_loader(engine.dialect)
+    print(f"Syncing employees ({load_mode(load_chunk, engine.dialect)} for new rows, chunks of {chunk_size} rows)...")
+    table = Employee.__table__
+    inserted, updated, seen = [], [], set()
+    unchanged = 0
+
+    start = time.perf_counter()
+    try:
+        with engine.begin() as conn:
+            existing = {
+                row.employee_id: (row.content_hash, row.deleted_at is not None)
+                for row in conn.execute(
+                    table.select().with_only_columns(table.c.employee_id, table.c.content_hash, table.c.deleted_at)
+                )
+            }
+            for df in read_chunks(csv_path, chunk_size):
+                ids = df["employee_id"].to_numpy(dtype=np.int64)
+                for employee_id in ids.tolist():
+                    if employee_id in seen:
+                        raise ValueError(f"Duplicate employee_id {employee_id} in file")
+                    seen.add(employee_id)
+
+                state = [existing.get(i) for i in ids.tolist()]
+                is_new = np.array([s is None for s in state])
+                is_changed = np.array([s is not None and (s[0] != h or s[1])
+                                       for s, h in zip(state, df["content_hash"])])
+                if is_new.any():
+                    load_chunk(conn, df[is_new])
+                    inserted += ids[is_new].tolist()
+                if is_changed.any():
+                    update_chunk(conn, df[is_changed])
+                    updated += ids[is_changed].tolist()
+                unchanged += int((~is_new & ~is_changed).sum())
+
+            deleted = sorted(i for i, (_, is_deleted) in existing.items() if i not in seen and not is_deleted)
+            flag_deleted(conn, deleted, datetime.utcnow())
+    except ValueError as e:
+        print(f"ERROR: {e}. Nothing was written.")
+        return None
+
+    elapsed = time.perf_counter() - start
+    n_rows = len(inserted) + len(updated) + unchanged
+    print(f"Synced {n_rows} rows in {elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s): "
+          f"{len(inserted)} inserted, {len(updated)} updated, {len(deleted)} flagged deleted, "
+          f"{unchanged} unchanged")
+    return {"inserted": sorted(inserted), "updated": sorted(updated), "deleted": deleted, "unchanged": unchanged}
+
+
 if __name__ == "__main__":
-    success = seed_employees()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?", help="Roster CSV (default: data/employees.csv)")
+    parser.add_argument("--sync", action="store_true", help="Upsert into a populated table")
+    parser.add_argument("--changes", help="Write the changed employee ids to this JSON file (--sync)")
+    parser.add_argument("--snapshot", action="store_true", help="Export a roster snapshot afterwards (--sync: only if rows changed)")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    if args.sync:
+        changes = sync_employees(engine, csv_path=args.csv_path)
+        if changes is not None and args.changes:
+            Path(args.changes).write_text(json.dumps(changes))
+            print(f"Changed employee ids written to {args.changes}")
+        success = changes is not None
+        changed = success and any(changes[key] for key in ("inserted", "updated", "deleted"))
+    else:
+        success = seed_employees(engine, csv_path=args.csv_path)
+        changed = success
+
+    if args.snapshot and changed:
+        from sqlalchemy.orm import Session
+        from app.snapshot import export_snapshot
+
+        with Session(engine) as db:
+            print(f"Roster snapshot written to {export_snapshot(db)}")
     exit(0 if success else 1)
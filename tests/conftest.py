@@ -2,14 +2,18 @@
 Pytest fixtures for API testing
 """
 
+import pandas as pd
 import pytest
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, Employee, get_db
+from app.roster import roster
+from app.employee_cache import employee_cache
 
 
 # In-memory SQLite for testing
@@ -35,6 +39,8 @@ def override_get_db():
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test."""
+    roster.invalidate()
+    employee_cache.invalidate()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     yield db
@@ -53,6 +59,18 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function")
+def seeded_db(db_session):
+    """Database loaded with the employees of data/employees.csv (raw columns only)."""
+    df = pd.read_csv(Path(__file__).parent.parent / "data" / "employees.csv")
+    columns = [c.name for c in Employee.__table__.columns if c.name in df.columns]
+    db_session.bulk_insert_mappings(Employee, df[columns].to_dict("records"))
+    db_session.commit()
+    roster.invalidate()
+    employee_cache.invalidate()
+    return db_session
+
+
 @pytest.fixture
 def sample_employee_data():
     """Sample valid employee data for testing."""
@@ -2,8 +2,14 @@
 API endpoint tests for Employee Attrition Prediction API
 """
 
+import json
+import asyncio
+
 import pytest
 
+from app.database import Employee, Prediction
+from app.roster import roster
+
 
 class TestHealthEndpoints:
     """Tests for health check endpoints."""
@@ -189,6 +195,67 @@ class TestPredictionHistory:
         assert response.status_code == 404
 
 
+class TestPredictionStats:
+    """Tests for the incrementally maintained prediction statistics."""
+
+    def test_stats_empty(self, client):
+        """Test statistics before any prediction."""
+        data = client.get("/predictions/stats").json()
+        assert data["totals"]["total_predictions"] == 0
+        assert data["totals"]["avg_probability"] is None
+        assert data["buckets"] == []
+
+    def test_stats_match_full_scan(self, client, db_session, sample_employee_data, high_risk_employee_data):
+        """Test that counters updated on write equal an aggregate over the log."""
+        client.post("/predict", json=sample_employee_data)
+        client.post("/predict/batch", json={"employees": [sample_employee_data, high_risk_employee_data] * 3})
+
+        data = client.get("/predictions/stats?granularity=minute").json()
+        logged = db_session.query(Prediction).all()
+        totals = data["totals"]
+        assert totals["total_predictions"] == len(logged) == 7
+        assert totals["attrition_predicted"] == sum(p.prediction for p in logged)
+        assert totals["avg_probability"] == pytest.approx(sum(p.probability for p in logged) / 7, abs=1e-4)
+        for level in ("low", "medium", "high"):
+            assert totals["risk_levels"][level] == sum(p.risk_level == level for p in logged)
+        assert sum(b["total_predictions"] for b in data["buckets"]) == 7
+
+    def test_stats_day_bucket(self, client, sample_employee_data):
+        """Test that day buckets start at midnight."""
+        client.post("/predict", json=sample_employee_data)
+        bucket = client.get("/predictions/stats?granularity=day").json()["buckets"][0]
+        assert bucket["bucket_start"].endswith("T00:00:00")
+        assert bucket["total_predictions"] == 1
+
+    def test_totals_sum_day_buckets(self, client, db_session):
+        """Test that totals span several days and no all-time row is written."""
+        from datetime import datetime
+        from app.database import PredictionRollup, update_rollups
+        update_rollups(db_session, [
+            Prediction(prediction=int(probability > 0.5), probability=probability, risk_level="low",
+                       created_at=datetime(2026, 3, day, 10))
+            for day, probability in [(1, 0.2), (2, 0.6), (2, 0.9)]
+        ])
+        db_session.commit()
+        rollups = db_session.query(PredictionRollup).all()
+        assert {r.granularity for r in rollups} == {"minute", "hour", "day"}
+        assert sum(r.granularity == "day" for r in rollups) == 2
+
+        totals = client.get("/predictions/stats").json()["totals"]
+        assert totals["total_predictions"] == 3
+        assert totals["attrition_predicted"] == 2
+        assert totals["avg_probability"] == pytest.approx(1.7 / 3, abs=1e-4)
+        assert totals["risk_levels"]["low"] == 3
+
+    def test_stats_invalid_granularity(self, client):
+        """Test that only minute/hour/day buckets are accepted."""
+        assert client.get("/predictions/stats?granularity=week").status_code == 422
+
+    def test_stream_invalid_filter(self, client):
+        """Test that the live feed validates its risk level filter."""
+        assert client.get("/predictions/stream?risk_level=extreme").status_code == 422
+
+
 class TestEmployeeEndpoints:
     """Tests for employee endpoints."""
 
@@ -209,3 +276,482 @@ class TestEmployeeEndpoints:
         """Test predicting for non-existent employee."""
         response = client.get("/employees/99999/predict")
         assert response.status_code == 404
+
+    def test_get_employee(self, client, seeded_db):
+        """Test getting a seeded employee (engineered satisfaction computed on the fly)."""
+        response = client.get("/employees/1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["employee_id"] == 1
+        assert data["heure_supplementaires"] in ("Oui", "Non")
+        assert 1 <= data["satisfaction_globale"] <= 4
+
+
+class TestMetricsEndpoint:
+    """Tests for the Prometheus metrics endpoint."""
+
+    def test_metrics_format(self, client):
+        """Test metrics endpoint returns Prometheus text."""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE attrition_stage_duration_seconds histogram" in response.text
+        assert "attrition_predictions_total" in response.text
+
+    def test_metrics_record_predict_stages(self, client, sample_employee_data):
+        """Test that a prediction records every pipeline stage."""
+        client.post("/predict", json=sample_employee_data)
+        client.post("/predict/batch", json={"employees": [sample_employee_data] * 3})
+
+        text = client.get("/metrics").text
+        for stage in ["validation", "engineer_features", "model_predict", "db_log", "serialization"]:
+            assert f'attrition_stage_duration_seconds_count{{stage="{stage}"}}' in text
+        assert 'path="/predict",status="200"' in text
+        assert 'path="/predict/batch",status="200"' in text
+        assert 'attrition_batch_size_bucket{le="5"}' in text
+
+
+class TestProfiling:
+    """Tests for on-demand request profiling."""
+
+    @pytest.fixture
+    def admin(self, monkeypatch, tmp_path):
+        """Enable the admin token and store profiles in a temporary ring."""
+        from app import profiling
+        monkeypatch.setattr(profiling, "PROFILING_ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(profiling.profile_store, "directory", tmp_path)
+        monkeypatch.setattr(profiling.profile_store, "max_files", 2)
+        return {"X-Admin-Token": "secret"}
+
+    def test_request_not_profiled_by_default(self, client, sample_employee_data):
+        """Test that requests without the admin header are not profiled."""
+        response = client.post("/predict", json=sample_employee_data)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+    def test_profile_predict(self, client, admin, sample_employee_data):
+        """Test that a request carrying the profile token is profiled with stage breakdown."""
+        response = client.post("/predict", json=sample_employee_data, headers={"X-Profile-Token": "secret"})
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        profile = client.get(f"/profiles/{profile_id}", headers=admin).json()
+        assert profile["path"] == "/predict"
+        assert profile["status"] == 200
+        assert "model_predict" in profile["stages"]
+        assert "engineer_features" in profile["collapsed"]
+
+        speedscope = client.get(f"/profiles/{profile_id}/speedscope", headers=admin).json()
+        events = speedscope["profiles"][0]["events"]
+        assert speedscope["profiles"][0]["type"] == "evented"
+        assert sum(1 for e in events if e["type"] == "O") == sum(1 for e in events if e["type"] == "C")
+
+    def test_profile_ring_is_bounded(self, client, admin, tmp_path):
+        """Test that the oldest profiles are evicted."""
+        for _ in range(4):
+            client.get("/health", headers={"X-Profile-Token": "secret"})
+
+        assert len(list(tmp_path.glob("*.speedscope.json"))) == 2
+        assert len(list(tmp_path.glob("*.collapsed.txt"))) == 2
+        assert client.get("/profiles", headers=admin).json()["count"] == 2
+
+    def test_list_reads_summary_only(self, client, admin, tmp_path):
+        """Test that collapsed stacks are kept out of the listed metadata file."""
+        profile_id = client.get("/health", headers={"X-Profile-Token": "secret"}).headers["x-profile-id"]
+        assert "collapsed" not in json.loads((tmp_path / f"{profile_id}.json").read_text())
+        assert "collapsed" not in client.get("/profiles", headers=admin).json()["profiles"][0]
+        assert "health" in client.get(f"/profiles/{profile_id}", headers=admin).json()["collapsed"]
+
+    def test_profiles_require_admin(self, client, admin):
+        """Test that profile endpoints reject missing or wrong tokens."""
+        assert client.get("/profiles").status_code == 403
+        assert client.get("/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        assert client.get("/profiles", headers={"X-Profile-Token": "secret"}).status_code == 403
+        assert client.get("/profiles/unknown", headers=admin).status_code == 404
+
+    def test_one_profile_at_a_time(self, admin, tmp_path):
+        """Test that overlapping requests are neither mixed into nor break the running profile."""
+        from app.profiling import ProfileStore, ProfilingMiddleware
+
+        def profiled_work():
+            return sum(range(100))
+
+        def other_work():
+            return sum(range(100))
+
+        async def app(scope, receive, send):
+            for _ in range(5):
+                profiled_work() if scope["path"] == "/profiled" else other_work()
+                await asyncio.sleep(0.001)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        middleware = ProfilingMiddleware(app, store=ProfileStore(tmp_path))
+
+        async def call(path, token):
+            headers = [(b"x-profile-token", token)] if token else []
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            await middleware({"type": "http", "method": "GET", "path": path, "headers": headers}, None, send)
+            return messages[0]
+
+        async def main():
+            return await asyncio.gather(call("/profiled", b"secret"), call("/other", None),
+                                        call("/profiled", b"secret"))
+
+        profiled, other, rejected = asyncio.run(main())
+        assert profiled["status"] == other["status"] == 200
+        assert rejected["status"] == 409
+        assert not middleware.active
+
+        profiles = ProfileStore(tmp_path).list()
+        assert len(profiles) == 1
+        collapsed = ProfileStore(tmp_path).get(profiles[0]["id"])["collapsed"]
+        assert "profiled_work" in collapsed and "other_work" not in collapsed
+
+    def test_saved_off_event_loop(self, admin, tmp_path):
+        """Test that profile files are written from a worker thread, not the event loop."""
+        import threading
+        from app.profiling import ProfileStore, ProfilingMiddleware
+
+        threads = []
+
+        class RecordingStore(ProfileStore):
+            def save(self, meta, speedscope):
+                threads.append(threading.get_ident())
+                super().save(meta, speedscope)
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        async def noop(message):
+            pass
+
+        middleware = ProfilingMiddleware(app, store=RecordingStore(tmp_path))
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"x-profile-token", b"secret")]}
+        asyncio.run(middleware(scope, None, noop))
+        assert threads and threads[0] != threading.get_ident()
+        assert len(RecordingStore(tmp_path).list()) == 1
+
+    def test_admin_calls_not_profiled(self, client, admin, tmp_path):
+        """Test that admin endpoints do not write profiles."""
+        response = client.get("/profiles", headers=admin)
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert list(tmp_path.glob("*.json")) == []
+
+
+class TestTracing:
+    """Tests for request tracing and the trace endpoints."""
+
+    @pytest.fixture
+    def admin(self, monkeypatch, tmp_path):
+        """Enable the admin token and start from an empty trace ring."""
+        from app import profiling
+        from app.tracing import tracer
+        monkeypatch.setattr(profiling, "PROFILING_ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(profiling.profile_store, "directory", tmp_path)
+        monkeypatch.setattr(tracer, "sample_rate", 1.0)
+        tracer.exporter.clear()
+        return {"X-Admin-Token": "secret"}
+
+    def test_trace_predict_spans(self, client, admin, sample_employee_data):
+        """Test that a prediction produces stage and DB statement spans."""
+        response = client.post("/predict", json=sample_employee_data)
+        trace_id = response.headers["x-trace-id"]
+
+        trace = client.get(f"/traces/{trace_id}", headers=admin).json()
+        names = [s["name"] for s in trace["spans"]]
+        assert names[0] == "http.request"
+        for name in ["validation", "engineer_features", "model_predict", "db_log", "serialization"]:
+            assert name in names
+        assert "db.statement" in names
+        assert trace["attributes"]["route"] == "/predict"
+        assert trace["attributes"]["status"] == 200
+
+    def test_trace_batch_rows(self, client, admin, sample_employee_data):
+        """Test that each batch row gets its own span and the batch is scored once."""
+        response = client.post("/predict/batch", json={"employees": [sample_employee_data] * 3})
+        trace = client.get(f"/traces/{response.headers['x-trace-id']}", headers=admin).json()
+
+        rows = [s for s in trace["spans"] if s["name"] == "batch.row"]
+        assert [r["attributes"]["index"] for r in rows] == [0, 1, 2]
+        row_ids = {r["span_id"] for r in rows}
+        assert sum(1 for s in trace["spans"] if s["name"] == "engineer_features" and s["parent_id"] in row_ids) == 3
+        model_spans = [s for s in trace["spans"] if s["name"] == "model_predict"]
+        assert len(model_spans) == 1 and model_spans[0]["parent_id"] not in row_ids
+
+    def test_traceparent_propagation(self, client, admin):
+        """Test that an incoming W3C traceparent is continued."""
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        response = client.get("/health", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+        assert response.headers["x-trace-id"] == trace_id
+
+        trace = client.get(f"/traces/{trace_id}", headers=admin).json()
+        assert trace["spans"][0]["parent_id"] == "00f067aa0ba902b7"
+
+    def test_traceparent_not_sampled(self, client, admin):
+        """Test that an unsampled traceparent is not recorded."""
+        response = client.get("/health", headers={
+            "traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"
+        })
+        assert "x-trace-id" not in response.headers
+
+    def test_traces_list_and_auth(self, client, admin):
+        """Test listing traces with a duration filter and admin check."""
+        client.get("/health")
+        assert client.get("/traces").status_code == 403
+        assert client.get("/traces", headers=admin).json()["count"] >= 1
+        assert client.get("/traces?min_duration_ms=100000", headers=admin).json()["count"] == 0
+        assert client.get("/traces/unknown", headers=admin).status_code == 404
+
+
+class TestDriftEndpoint:
+    """Tests for the drift monitoring endpoints."""
+
+    def test_drift_updated_by_predict(self, client, sample_employee_data):
+        """Test that predictions feed the drift monitor."""
+        from app.drift import drift_monitor
+        drift_monitor.reset()
+
+        client.post("/predict", json=sample_employee_data)
+        client.post("/predict/batch", json={"employees": [sample_employee_data] * 2})
+
+        data = client.get("/drift").json()
+        assert data["n_observations"] == 3
+        assert data["features"]["age"]["n"] == 3
+        assert "psi" in data["features"]["revenu_mensuel"]
+        assert data["features"]["age"]["status"] == "insufficient_data"
+
+    def test_drift_reset_requires_admin(self, client):
+        """Test that resetting the drift window needs the admin token."""
+        assert client.post("/drift/reset").status_code == 403
+
+
+class TestEvaluationEndpoints:
+    """Tests for live evaluation endpoints."""
+
+    def test_employee_predict_updates_live_metrics(self, client, seeded_db):
+        """Test that a held-out employee counts once and training employees are ignored."""
+        from app.evaluation import evaluator
+        evaluator.reset()
+
+        # 1177 belongs to the test split, 1 to the training split
+        for employee_id in (1177, 1177, 1):
+            assert client.get(f"/employees/{employee_id}/predict").status_code == 200
+
+        data = client.get("/evaluation").json()
+        assert data["n_labeled"] == 1
+        assert client.get("/model/info").json()["live_metrics"]["n_labeled"] == 1
+
+    def test_backfill(self, client, seeded_db, monkeypatch, tmp_path):
+        """Test that the admin backfill rescores the test split."""
+        from app import profiling
+        monkeypatch.setattr(profiling, "PROFILING_ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(profiling.profile_store, "directory", tmp_path)
+
+        assert client.post("/evaluation/backfill").status_code == 403
+        response = client.post("/evaluation/backfill", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rows_scored"] == 294
+        assert data["metrics"]["auc_roc"] > 0.8
+
+
+class TestExplanation:
+    """Tests for the ?explain=k option of the predict endpoints."""
+
+    def test_predict_without_explain(self, client, sample_employee_data):
+        """Test that no explanation is returned by default."""
+        response = client.post("/predict", json=sample_employee_data)
+        assert response.json()["explanation"] is None
+
+    def test_predict_with_explain(self, client, sample_employee_data):
+        """Test that the top-k contributions are returned."""
+        response = client.post("/predict?explain=3", json=sample_employee_data)
+        assert response.status_code == 200
+        explanation = response.json()["explanation"]
+        assert len(explanation["contributions"]) == 3
+        assert {"feature", "kind", "value", "contribution"} <= set(explanation["contributions"][0])
+
+    def test_batch_with_explain(self, client, sample_employee_data, high_risk_employee_data):
+        """Test that every batch row gets its own explanation."""
+        payload = {"employees": [sample_employee_data, high_risk_employee_data]}
+        data = client.post("/predict/batch?explain=2", json=payload).json()
+        explanations = [p["explanation"] for p in data["predictions"]]
+        assert all(len(e["contributions"]) == 2 for e in explanations)
+        assert explanations[0] != explanations[1]
+
+    def test_explain_out_of_range(self, client, sample_employee_data):
+        """Test that k is validated."""
+        response = client.post("/predict?explain=100", json=sample_employee_data)
+        assert response.status_code == 422
+
+
+class TestWhatIf:
+    """Tests for the what-if endpoint."""
+
+    def test_two_axis_surface(self, client, sample_employee_data):
+        """Test a 2D sweep returns a probability surface of the right shape."""
+        payload = {
+            "employee": sample_employee_data,
+            "axes": [
+                {"feature": "revenu_mensuel", "start": 1000, "stop": 20000, "steps": 100},
+                {"feature": "satisfaction_employee_equilibre_pro_perso", "start": 1, "stop": 4, "steps": 4},
+            ],
+        }
+        response = client.post("/predict/whatif", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["shape"] == [100, 4]
+        assert len(data["probabilities"]) == 100
+        assert all(len(row) == 4 for row in data["probabilities"])
+        assert data["base"]["risk_level"] in ["low", "medium", "high"]
+
+    def test_categorical_axis(self, client, sample_employee_data):
+        """Test that overtime raises the predicted risk."""
+        payload = {"employee": sample_employee_data,
+                   "axes": [{"feature": "heure_supplementaires", "values": ["Non", "Oui"]}]}
+        data = client.post("/predict/whatif", json=payload).json()
+        assert data["probabilities"][1] > data["probabilities"][0]
+
+    def test_invalid_axis(self, client, sample_employee_data):
+        """Test that an unknown feature, category or an empty axis is rejected."""
+        for axis in [{"feature": "unknown", "values": [1, 2]},
+                     {"feature": "heure_supplementaires", "values": ["Peut-etre"]},
+                     {"feature": "heure_supplementaires", "values": []}]:
+            payload = {"employee": sample_employee_data, "axes": [axis]}
+            assert client.post("/predict/whatif", json=payload).status_code == 422
+
+    def test_whatif_not_logged(self, client, sample_employee_data):
+        """Test that what-if requests do not write predictions."""
+        payload = {"employee": sample_employee_data,
+                   "axes": [{"feature": "age", "start": 20, "stop": 60, "steps": 5}]}
+        client.post("/predict/whatif", json=payload)
+        assert client.get("/predictions").json()["count"] == 0
+
+
+class TestCounterfactuals:
+    """Tests for counterfactual endpoints."""
+
+    def test_predict_counterfactual(self, client, high_risk_employee_data):
+        """Test that a high-risk employee gets ranked counterfactuals."""
+        response = client.post("/predict/counterfactual",
+                               json={"employee": high_risk_employee_data, "max_results": 3})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "found"
+        assert 1 <= len(data["counterfactuals"]) <= 3
+        assert data["counterfactuals"][0]["risk_level"] == "low"
+
+    def test_invalid_target(self, client, high_risk_employee_data):
+        """Test that high is not a valid target."""
+        response = client.post("/predict/counterfactual",
+                               json={"employee": high_risk_employee_data, "target_risk": "high"})
+        assert response.status_code == 422
+
+    def test_non_actionable_weight(self, client, high_risk_employee_data):
+        """Test that weights on non-actionable features are rejected."""
+        response = client.post("/predict/counterfactual",
+                               json={"employee": high_risk_employee_data, "weights": {"age": 1.0}})
+        assert response.status_code == 422
+
+    def test_department(self, client, seeded_db):
+        """Test department batch mode."""
+        response = client.get("/departments/Ressources Humaines/counterfactuals?target_risk=medium")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["n_employees"] == 63
+        assert data["n_above_target"] == len(data["results"])
+        assert all(r["employee_id"] is not None for r in data["results"])
+
+    def test_unknown_department(self, client, seeded_db):
+        """Test unknown department returns 404."""
+        assert client.get("/departments/Inconnu/counterfactuals").status_code == 404
+
+
+class TestSimulation:
+    """Tests for the policy simulation endpoint."""
+
+    SCENARIO = {
+        "filter": [{"feature": "departement", "op": "eq", "value": "Consulting"}],
+        "actions": [{"feature": "heure_supplementaires", "op": "set", "value": "Non"}],
+    }
+
+    def test_simulate(self, client, seeded_db):
+        """Test a scenario over the seeded roster."""
+        response = client.post("/simulate", json=self.SCENARIO)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["n_employees"] == 1470
+        assert data["n_affected"] == 961
+        assert data["after"]["expected_departures"] < data["before"]["expected_departures"]
+        assert {d["departement"] for d in data["by_department"]} == {
+            "Commercial", "Consulting", "Ressources Humaines"}
+
+    def test_simulate_cached(self, client, seeded_db):
+        """Test that repeating a scenario hits the cache."""
+        from app.simulation import simulator
+        simulator.clear()
+        first = client.post("/simulate", json=self.SCENARIO).json()
+        second = client.post("/simulate", json=self.SCENARIO).json()
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert first["scenario_hash"] == second["scenario_hash"]
+
+    def test_simulate_invalid(self, client, seeded_db):
+        """Test that invalid operations return 422."""
+        scenario = {"actions": [{"feature": "age", "op": "pow", "value": 2}]}
+        assert client.post("/simulate", json=scenario).status_code == 422
+        scenario = {"actions": [{"feature": "departement", "op": "set", "value": "Marketing"}]}
+        response = client.post("/simulate", json=scenario)
+        assert response.status_code == 422
+        assert "unknown category" in response.json()["detail"]
+
+
+class TestRiskEndpoints:
+    """Tests for the leaderboard and aggregate endpoints."""
+
+    def test_leaderboard(self, client, seeded_db):
+        """Test top-k with a department filter."""
+        response = client.get("/risk/leaderboard?k=10&departement=Commercial")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 10
+        assert data["n_matching"] == 446
+        probabilities = [e["probability"] for e in data["employees"]]
+        assert probabilities == sorted(probabilities, reverse=True)
+
+    def test_leaderboard_missing_department(self, client, seeded_db):
+        """Test that an employee with a NULL department is listed, not a 500."""
+        employee = seeded_db.query(Employee).filter(Employee.employee_id == 1).first()
+        employee.departement = None
+        seeded_db.commit()
+        roster.invalidate()
+
+        response = client.get("/risk/leaderboard?k=1000&poste=Senior Manager")
+        assert response.status_code == 200
+        entry = next(e for e in response.json()["employees"] if e["employee_id"] == 1)
+        assert entry["departement"] is None
+        assert client.get("/risk/aggregates?by=departement").status_code == 200
+
+    def test_leaderboard_empty_roster(self, client):
+        """Test that an empty roster returns no employees."""
+        data = client.get("/risk/leaderboard").json()
+        assert data["count"] == 0
+
+    def test_aggregates(self, client, seeded_db):
+        """Test group-by aggregates over the roster."""
+        response = client.get("/risk/aggregates?by=poste")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["n_employees"] == 1470
+        assert sum(g["count"] for g in data["groups"]) == 1470
+
+    def test_aggregates_invalid_field(self, client, seeded_db):
+        """Test that only supported group fields are accepted."""
+        assert client.get("/risk/aggregates?by=age").status_code == 422
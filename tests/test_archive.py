@@ -0,0 +1,136 @@
+"""
+Tests for the prediction log retention and archive
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.archive import (
+    PredictionArchive, archive_predictions, list_predictions, load_archive, next_period, period_start,
+    prediction_archive,
+)
+from app.database import Prediction, log_prediction, count_predictions
+
+
+def add_predictions(db, timestamps, employee_id=None):
+    """Predictions with given creation times (inputs deduplicated as in production)."""
+    ids = []
+    for i, created_at in enumerate(timestamps):
+        prediction = log_prediction(db, {"age": 30 + i % 3}, i % 2, 0.1 + (i % 9) / 10,
+                                    ["low", "medium", "high"][i % 3], employee_id=employee_id)
+        prediction.created_at = created_at
+        db.commit()
+        ids.append(prediction.id)
+    return ids
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return PredictionArchive(tmp_path / "archive")
+
+
+@pytest.fixture
+def history(db_session):
+    """Three months of predictions: January, February (archived at NOW) and May."""
+    timestamps = [datetime(2026, 1, d, 12) for d in (5, 20)] + \
+        [datetime(2026, 2, d, 8) for d in (1, 14, 28)] + [datetime(2026, 5, 3, 9)]
+    return add_predictions(db_session, timestamps)
+
+
+NOW = datetime(2026, 5, 10)
+
+
+class TestPeriods:
+    """Tests for the monthly period helpers."""
+
+    def test_period_bounds(self):
+        """Test month truncation and rollover."""
+        assert period_start(datetime(2026, 3, 17, 5, 4)) == datetime(2026, 3, 1)
+        assert next_period(datetime(2026, 12, 1)) == datetime(2027, 1, 1)
+
+
+class TestRetention:
+    """Tests for moving old periods to archive files."""
+
+    def test_old_periods_archived(self, db_session, history, archive):
+        """Test that periods past retention leave the database for compressed files."""
+        archived = archive_predictions(db_session, retention_days=60, directory=archive.directory, now=NOW)
+
+        assert [(p["period"], p["n_rows"]) for p in archived] == [("2026-01", 2), ("2026-02", 3)]
+        assert count_predictions(db_session) == 1
+        frame, header = load_archive(archive.directory / "predictions-202602.npz")
+        assert header["n_rows"] == 3 and header["period_end"] == "2026-03-01T00:00:00"
+        assert frame["id"].tolist() == history[2:5]
+        assert frame["input_hash"].notna().all()
+        assert archive.boundary() == datetime(2026, 3, 1)
+
+        # Idempotent
+        assert archive_predictions(db_session, retention_days=60, directory=archive.directory, now=NOW) == []
+
+    def test_late_rows_merged(self, db_session, history, archive):
+        """Test that rows found for an already archived period are merged by id."""
+        archive_predictions(db_session, retention_days=60, directory=archive.directory, now=NOW)
+        late = add_predictions(db_session, [datetime(2026, 2, 20)])
+        archive_predictions(db_session, retention_days=60, directory=archive.directory, now=NOW)
+
+        frame, _ = load_archive(archive.directory / "predictions-202602.npz")
+        assert frame["id"].tolist() == history[2:5] + late
+
+    def test_legacy_inline_inputs_archived(self, db_session, archive):
+        """Test that rows logged before feature_vectors keep their inputs."""
+        legacy = Prediction(input_data={"age": 44}, prediction=0, probability=0.2, risk_level="low",
+                            created_at=datetime(2026, 1, 2), employee_id=None)
+        db_session.add(legacy)
+        db_session.commit()
+        legacy_id = legacy.id
+        archive_predictions(db_session, retention_days=60, directory=archive.directory, now=NOW)
+
+        assert archive.get(db_session, legacy_id)["input_data"] == {"age": 44}
+
+
+class TestArchivedReads:
+    """Tests for listings and lookups across the database and the archive."""
+
+    @pytest.fixture
+    def archived(self, db_session, history, archive):
+        archive_predictions(db_session, retention_days=60, directory=archive.directory, now=NOW)
+        return history
+
+    def test_listing_spans_database_and_archive(self, db_session, archived, archive):
+        """Test newest-first paging from hot rows into archive files."""
+        rows = list_predictions(db_session, limit=10, archive=archive)
+        assert [r["id"] for r in rows] == archived[::-1]
+        assert [r["archived"] for r in rows] == [False] + [True] * 5
+
+        page = list_predictions(db_session, skip=2, limit=2, archive=archive)
+        assert [r["id"] for r in page] == archived[::-1][2:4]
+
+    def test_time_range(self, db_session, archived, archive):
+        """Test that a range only reads matching periods."""
+        rows = list_predictions(db_session, start=datetime(2026, 1, 10), end=datetime(2026, 2, 15),
+                                archive=archive)
+        assert [r["created_at"] for r in rows] == [
+            "2026-02-14T08:00:00", "2026-02-01T08:00:00", "2026-01-20T12:00:00",
+        ]
+        assert list_predictions(db_session, start=datetime(2026, 4, 1), archive=archive)[0]["id"] == archived[-1]
+
+    def test_get_archived_prediction(self, db_session, archived, archive):
+        """Test that an archived prediction keeps its full input data."""
+        row = archive.get(db_session, archived[1])
+        assert row["input_data"] == {"age": 31}
+        assert row["created_at"] == "2026-01-20T12:00:00"
+        assert archive.get(db_session, 10 ** 6) is None
+
+    def test_endpoints(self, client, db_session, archived, archive, monkeypatch):
+        """Test GET /predictions and /predictions/{id} on archived periods."""
+        monkeypatch.setattr(prediction_archive, "directory", archive.directory)
+
+        data = client.get("/predictions", params={"start": "2026-02-01T00:00:00Z", "limit": 10}).json()
+        assert data["start"] == "2026-02-01T00:00:00"
+        assert [p["id"] for p in data["predictions"]] == archived[:1:-1]
+
+        response = client.get(f"/predictions/{archived[0]}")
+        assert response.status_code == 200
+        assert response.json()["archived"] is True
+        assert client.get("/predictions/999999").status_code == 404
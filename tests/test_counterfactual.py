@@ -0,0 +1,119 @@
+"""
+Tests for counterfactual search
+"""
+
+import itertools
+
+import pandas as pd
+import pytest
+
+from app.counterfactual import CounterfactualEngine, ACTIONABLE_FEATURES
+from app.feature_engineering import feature_engineer
+from app.model import get_model, BASE_PATH
+from app.schemas import EmployeeInput
+
+
+@pytest.fixture
+def engine():
+    return CounterfactualEngine(get_model())
+
+
+@pytest.fixture(scope="module")
+def dataset_high_risk():
+    """First employee of the dataset in the high risk band."""
+    model = get_model()
+    df = pd.read_csv(BASE_PATH / "data" / "employees.csv")
+    for row in df[list(EmployeeInput.model_fields)].to_dict("records"):
+        if model.predict(feature_engineer.engineer_features(row))["risk_level"] == "high":
+            return row
+
+
+class TestCounterfactualEngine:
+    """Tests for the CounterfactualEngine class."""
+
+    def test_high_risk_reaches_target(self, engine, high_risk_employee_data):
+        """Test that counterfactuals are found, ranked by cost and below target."""
+        result = engine.search([high_risk_employee_data])[0]
+
+        assert result["risk_level"] == "high"
+        assert result["status"] == "found"
+        costs = [c["cost"] for c in result["counterfactuals"]]
+        assert costs == sorted(costs)
+        for counterfactual in result["counterfactuals"]:
+            assert counterfactual["probability"] < 0.20
+            assert all(c["feature"] in ACTIONABLE_FEATURES for c in counterfactual["changes"])
+
+    def test_exact_probability(self, engine, high_risk_employee_data):
+        """Test that the reported probability is that of the changed employee."""
+        counterfactual = engine.search([high_risk_employee_data])[0]["counterfactuals"][0]
+        data = dict(high_risk_employee_data)
+        for change in counterfactual["changes"]:
+            data[change["feature"]] = change["proposed"]
+
+        expected = get_model().predict(feature_engineer.engineer_features(data))["probability"]
+        assert counterfactual["probability"] == pytest.approx(expected, abs=1e-4)
+
+    def test_matches_exhaustive_search(self, engine, dataset_high_risk):
+        """Test that the cheapest counterfactual equals brute force on a small action set."""
+        weights = {"heure_supplementaires": 2.0, "frequence_deplacement": 1.5,
+                   "satisfaction_employee_environnement": 1.0, "revenu_mensuel": 0.25}
+        result = engine.search([dataset_high_risk], weights=weights)[0]
+
+        specs = {name: dict(ACTIONABLE_FEATURES[name], weight=w) for name, w in weights.items()}
+        choices = []
+        for name, spec in specs.items():
+            if "values" in spec:
+                options = [(v, spec["weight"]) for v in spec["values"] if v != dataset_high_risk[name]]
+            else:
+                bound = spec.get("max", float("inf"))
+                options = [(dataset_high_risk[name] + spec["step"] * k, spec["weight"] * k)
+                           for k in range(1, spec["max_steps"] + 1)
+                           if dataset_high_risk[name] + spec["step"] * k <= bound]
+            choices.append([(name, None, 0.0)] + [(name, v, c) for v, c in options])
+
+        model = get_model()
+        best = float("inf")
+        for combination in itertools.product(*choices):
+            cost = sum(c for _, _, c in combination)
+            if cost >= best:
+                continue
+            data = dict(dataset_high_risk)
+            data.update({name: v for name, v, _ in combination if v is not None})
+            if model.predict(feature_engineer.engineer_features(data))["probability"] < 0.20:
+                best = cost
+
+        assert best < float("inf")
+        assert result["counterfactuals"][0]["cost"] == pytest.approx(best)
+
+    def test_counterfactuals_are_minimal(self, engine, high_risk_employee_data):
+        """Test that dropping any single change misses the target."""
+        model = get_model()
+        for counterfactual in engine.search([high_risk_employee_data])[0]["counterfactuals"]:
+            for dropped in counterfactual["changes"]:
+                data = dict(high_risk_employee_data)
+                for change in counterfactual["changes"]:
+                    if change is not dropped:
+                        data[change["feature"]] = change["proposed"]
+                probability = model.predict(feature_engineer.engineer_features(data))["probability"]
+                assert probability >= 0.20 - 1e-4
+
+    def test_already_at_target(self, engine, sample_employee_data):
+        """Test that low-risk employees need no change."""
+        result = engine.search([sample_employee_data], target_risk="medium")[0]
+        if result["probability"] < 0.45:
+            assert result["status"] == "at_target"
+            assert result["counterfactuals"] == []
+
+    def test_weights_restrict_features(self, engine, high_risk_employee_data):
+        """Test that only weighted features are changed."""
+        result = engine.search([high_risk_employee_data], target_risk="medium",
+                               weights={"heure_supplementaires": 1.0, "revenu_mensuel": 0.1})[0]
+        for counterfactual in result["counterfactuals"]:
+            assert {c["feature"] for c in counterfactual["changes"]} <= {"heure_supplementaires", "revenu_mensuel"}
+
+    def test_invalid_arguments(self, engine, high_risk_employee_data):
+        """Test that unknown targets and non-actionable features are rejected."""
+        with pytest.raises(ValueError):
+            engine.search([high_risk_employee_data], target_risk="high")
+        with pytest.raises(ValueError):
+            engine.search([high_risk_employee_data], weights={"age": 1.0})
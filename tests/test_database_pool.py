@@ -0,0 +1,121 @@
+"""
+Tests for the connection pool configuration and telemetry
+"""
+
+import pandas as pd
+import pytest
+from pathlib import Path
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import (
+    Base, Employee, InstrumentedQueuePool, engine_options, get_db, pool_counters,
+)
+from app.employee_cache import employee_cache
+from app.metrics import metrics
+
+
+class TestEngineOptions:
+    """Tests for the create_engine() arguments."""
+
+    def test_server_pool(self):
+        """Test pool sizing, pre-ping, recycle and the statement timeout option."""
+        options = engine_options("postgresql+psycopg2://u@db/attrition", pgbouncer=False, statement_timeout_ms=5000)
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_pre_ping"] is True
+        assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+        engine = create_engine("postgresql+psycopg2://u@db/attrition", **options)
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+
+    def test_pgbouncer(self):
+        """Test that PgBouncer mode sends no startup options and disables prepared statements."""
+        assert engine_options("postgresql+psycopg2://u@pgbouncer/attrition", pgbouncer=True,
+                              statement_timeout_ms=5000)["connect_args"] == {}
+        options = engine_options("postgresql+psycopg://u@pgbouncer/attrition", pgbouncer=True)
+        assert options["connect_args"] == {"prepare_threshold": None}
+
+    def test_sqlite_defaults(self):
+        """Test that SQLite keeps SQLAlchemy's own pool."""
+        assert engine_options("sqlite:///./load.db") == {"connect_args": {"check_same_thread": False}}
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    """File SQLite behind a small instrumented pool (1 connection + 1 overflow)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", connect_args={"check_same_thread": False},
+                           poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05)
+    yield engine
+    engine.dispose()
+
+
+class TestPoolTelemetry:
+    """Tests for the pool counters and wait time."""
+
+    def test_counters(self, pooled_engine):
+        """Test checkouts, overflow, timeouts and new connections."""
+        before = dict(pool_counters)
+        metrics.reset()
+        first = pooled_engine.connect()
+        second = pooled_engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            pooled_engine.connect()
+        first.close()
+        second.close()
+        with pooled_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        delta = {key: pool_counters[key] - before[key] for key in pool_counters}
+        assert delta == {"checkouts": 3, "overflow_checkouts": 1, "timeouts": 1, "connects": 2, "invalidations": 0}
+        assert metrics.stages["db_pool_wait"].count == 4
+        assert metrics.stages["db_pool_wait"].sum >= 0.05
+
+    def test_gauge_exposed(self, client):
+        """Test that the pool family is rendered on /metrics."""
+        assert "# TYPE attrition_db_pool gauge" in client.get("/metrics").text
+
+
+class TestConnectionUse:
+    """Tests that requests only check out a connection when they query."""
+
+    @pytest.fixture
+    def pooled_client(self, pooled_engine):
+        Base.metadata.create_all(bind=pooled_engine)
+        df = pd.read_csv(Path(__file__).parent.parent / "data" / "employees.csv").head(20)
+        columns = [c.name for c in Employee.__table__.columns if c.name in df.columns]
+        with pooled_engine.begin() as conn:
+            conn.execute(Employee.__table__.insert(), df[columns].to_dict("records"))
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=pooled_engine)
+
+        def pooled_get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        employee_cache.invalidate()
+        app.dependency_overrides[get_db] = pooled_get_db
+        with TestClient(app) as test_client:
+            yield test_client, int(df["employee_id"].iloc[0])
+        app.dependency_overrides.clear()
+        employee_cache.invalidate()
+
+    def test_cached_lookup_takes_no_connection(self, pooled_client):
+        """Test that a cache hit and a model endpoint never touch the pool."""
+        client, employee_id = pooled_client
+        assert client.get(f"/employees/{employee_id}").status_code == 200
+
+        checkouts = pool_counters["checkouts"]
+        for _ in range(5):
+            assert client.get(f"/employees/{employee_id}").status_code == 200
+        assert client.get("/model/features").status_code == 200
+        assert pool_counters["checkouts"] == checkouts
+
+    def test_prediction_returns_connection(self, pooled_client, sample_employee_data, pooled_engine):
+        """Test that the connection is back in the pool once the prediction is logged."""
+        client, _ = pooled_client
+        assert client.post("/predict", json=sample_employee_data).status_code == 200
+        assert pooled_engine.pool.checkedout() == 0
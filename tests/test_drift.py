@@ -0,0 +1,91 @@
+"""
+Tests for the streaming drift monitor
+"""
+
+import pandas as pd
+import pytest
+from app.drift import DriftMonitor, build_reference, psi, ks, REFERENCE_PATH, OTHER
+from app.feature_engineering import feature_engineer
+from app.model import BASE_PATH
+
+
+@pytest.fixture(scope="module")
+def rows():
+    """Engineered rows of the employees dataset, by split."""
+    df = pd.read_csv(BASE_PATH / "data" / "employees.csv")
+    return {
+        split: [feature_engineer.engineer_features(r) for r in df[df["dataset_type"] == split].to_dict("records")]
+        for split in ["train", "test"]
+    }
+
+
+class TestStatistics:
+    """Tests for PSI and KS."""
+
+    def test_identical_distributions(self):
+        """Test that identical distributions give zero PSI and KS."""
+        p = [0.2, 0.3, 0.5]
+        assert psi(p, p) == 0
+        assert ks(p, p) == 0
+
+    def test_shifted_distribution(self):
+        """Test that a shifted distribution gives large PSI and KS."""
+        assert psi([0.0, 0.1, 0.9], [0.5, 0.4, 0.1]) > 0.25
+        assert abs(ks([0.0, 0.1, 0.9], [0.5, 0.4, 0.1]) - 0.8) < 1e-9
+
+
+class TestDriftMonitor:
+    """Tests for the DriftMonitor class."""
+
+    def test_reference_file_covers_all_features(self):
+        """Test that the shipped reference has all 35 features."""
+        monitor = DriftMonitor()
+        assert REFERENCE_PATH.exists()
+        assert len(monitor.sketches) == 35
+
+    def test_test_split_does_not_drift(self, rows):
+        """Test that the held-out split matches the training distribution."""
+        monitor = DriftMonitor()
+        for row in rows["test"]:
+            monitor.update(row)
+
+        report = monitor.report()
+        assert report["n_observations"] == len(rows["test"])
+        assert report["drifted_features"] == []
+
+    def test_shifted_inputs_drift(self, rows):
+        """Test that older, better paid employees with overtime are flagged."""
+        monitor = DriftMonitor()
+        for row in rows["test"]:
+            shifted = dict(row, age=row["age"] + 15, revenu_mensuel=row["revenu_mensuel"] * 3,
+                           heure_supplementaires="Oui")
+            monitor.update(shifted)
+
+        drifted = monitor.report()["drifted_features"]
+        assert "age" in drifted
+        assert "revenu_mensuel" in drifted
+        assert "heure_supplementaires" in drifted
+        assert "satisfaction_globale" not in drifted
+
+    def test_unseen_category(self, rows):
+        """Test that unknown categories land in the 'other' bucket."""
+        reference = build_reference(rows["train"], ["age"], ["genre"])
+        assert reference["features"]["genre"]["proportions"][-1] == 0.0
+
+        monitor = DriftMonitor(reference)
+        for _ in range(60):
+            monitor.update({"age": 30, "genre": "X"})
+
+        report = monitor.report()["features"]["genre"]
+        assert report["unseen_share"] == 1.0
+        assert report["status"] == "drift"
+        assert OTHER not in reference["features"]["genre"]["categories"]
+
+    def test_insufficient_data_and_reset(self, rows):
+        """Test the min sample guard and resetting the window."""
+        monitor = DriftMonitor()
+        monitor.update(rows["test"][0])
+        assert monitor.report()["features"]["age"]["status"] == "insufficient_data"
+
+        monitor.reset()
+        assert monitor.report()["n_observations"] == 0
@@ -0,0 +1,79 @@
+"""
+Tests for the employee record cache
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.database import Employee
+from app.employee_cache import EmployeeCache, EmployeeRecord, load_record
+
+
+@pytest.fixture
+def employees(db_session):
+    db_session.add_all([Employee(employee_id=i, age=30 + i, departement="Commercial") for i in range(1, 4)])
+    db_session.commit()
+    return db_session
+
+
+class TestEmployeeCache:
+    """Tests for the read-through LRU."""
+
+    def test_read_through(self, employees):
+        """Test that a second lookup is served from memory, unknown ids included."""
+        cache = EmployeeCache(max_size=10, check_interval=60)
+        assert cache.get(employees, 1).age == 31
+        assert cache.get(employees, 1).age == 31
+        assert cache.get(employees, 99) is None
+        assert cache.get(employees, 99) is None
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+    def test_record_is_compact_and_read_only(self, employees):
+        """Test that records carry Employee attributes without ORM state."""
+        record = load_record(employees, 2)
+        assert isinstance(record, EmployeeRecord)
+        assert record.departement == "Commercial" and record.deleted_at is None
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.age = 50
+
+    def test_lru_eviction(self, employees):
+        """Test the size bound and least-recently-used eviction."""
+        cache = EmployeeCache(max_size=2, check_interval=60)
+        cache.get(employees, 1)
+        cache.get(employees, 2)
+        cache.get(employees, 1)
+        cache.get(employees, 3)  # evicts 2
+        assert cache.stats()["size"] == 2 and cache.stats()["evictions"] == 1
+        cache.get(employees, 1)
+        assert cache.stats()["hits"] == 2
+        cache.get(employees, 2)
+        assert cache.stats()["misses"] == 4
+
+    def test_version_stamp_invalidates(self, employees):
+        """Test that a sync stamping updated_at clears the cache."""
+        cache = EmployeeCache(max_size=10, check_interval=0)
+        assert cache.get(employees, 1).age == 31
+
+        employees.query(Employee).filter_by(employee_id=1).update({"age": 45, "updated_at": datetime.utcnow()})
+        employees.commit()
+        assert cache.get(employees, 1).age == 45
+        assert cache.stats()["invalidations"] == 1
+
+    def test_stamp_checked_at_interval(self, employees):
+        """Test that lookups within the check interval skip the database."""
+        cache = EmployeeCache(max_size=10, check_interval=60)
+        cache.get(employees, 1)
+        employees.query(Employee).filter_by(employee_id=1).update({"age": 45, "updated_at": datetime.utcnow()})
+        employees.commit()
+        assert cache.get(employees, 1).age == 31
+
+        cache.invalidate([1])
+        assert cache.get(employees, 1).age == 45
+
+    def test_disabled(self, employees):
+        """Test that a zero size reads through without caching."""
+        cache = EmployeeCache(max_size=0)
+        assert cache.get(employees, 3).age == 33
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,85 @@
+"""
+Tests for incremental online evaluation
+"""
+
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score, f1_score, precision_score, recall_score
+
+from app.evaluation import OnlineEvaluator, backfill_test_split
+from app.model import get_model
+
+
+class TestOnlineEvaluator:
+    """Tests for the OnlineEvaluator class."""
+
+    @pytest.fixture
+    def labeled(self):
+        rng = np.random.default_rng(0)
+        actual = rng.integers(0, 2, 500)
+        probabilities = np.clip(rng.normal(0.35 + 0.3 * actual, 0.2), 0, 1)
+        return actual, (probabilities > 0.5).astype(int), probabilities
+
+    def test_empty_report(self):
+        """Test that metrics are undefined before any label arrives."""
+        report = OnlineEvaluator().report()
+        assert report["n_labeled"] == 0
+        assert report["metrics"]["auc_roc"] is None
+
+    def test_metrics_match_sklearn(self, labeled):
+        """Test incremental metrics against sklearn on the same data."""
+        actual, predictions, probabilities = labeled
+        evaluator = OnlineEvaluator()
+        for a, p, s in zip(actual, predictions, probabilities):
+            evaluator.update(int(a), int(p), float(s))
+
+        metrics = evaluator.report()["metrics"]
+        assert abs(metrics["precision"] - precision_score(actual, predictions)) < 1e-9
+        assert abs(metrics["recall"] - recall_score(actual, predictions)) < 1e-9
+        assert abs(metrics["f1_score"] - f1_score(actual, predictions)) < 1e-9
+        assert abs(metrics["auc_roc"] - roc_auc_score(actual, probabilities)) < 0.005
+
+    def test_batch_equals_incremental(self, labeled):
+        """Test that update_batch gives the same counts as single updates."""
+        actual, predictions, probabilities = labeled
+        single, batch = OnlineEvaluator(), OnlineEvaluator()
+        for a, p, s in zip(actual, predictions, probabilities):
+            single.update(int(a), int(p), float(s))
+        batch.update_batch(actual, predictions, probabilities)
+
+        assert single.report() == batch.report()
+
+    def test_employee_counted_once(self, labeled):
+        """Test that rescoring an employee replaces its previous contribution."""
+        actual, predictions, probabilities = labeled
+        ids = np.arange(len(actual))
+        evaluator = OnlineEvaluator()
+        evaluator.update_batch(actual, predictions, probabilities, employee_ids=ids)
+        report = evaluator.report()
+
+        evaluator.update_batch(actual, predictions, probabilities, employee_ids=ids)
+        evaluator.update(int(actual[0]), int(predictions[0]), float(probabilities[0]), employee_id=0)
+        assert evaluator.report() == report
+
+        evaluator.update(int(actual[0]), 1 - int(predictions[0]), float(probabilities[0]), employee_id=0)
+        assert evaluator.report()["n_labeled"] == len(actual)
+
+
+class TestBackfill:
+    """Tests for the vectorized test split backfill."""
+
+    def test_backfill_matches_model_metadata(self, seeded_db):
+        """Test that rescoring the test split reproduces the exported metrics."""
+        model = get_model()
+        evaluator = OnlineEvaluator()
+
+        n_rows = backfill_test_split(seeded_db, model, evaluator)
+
+        assert n_rows == 294
+        metrics = evaluator.report()["metrics"]
+        assert abs(metrics["auc_roc"] - model.metadata["metrics"]["auc_roc"]) < 0.005
+        assert abs(metrics["recall"] - model.metadata["metrics"]["recall"]) < 1e-6
+
+        # A second backfill (reset=false) does not count the split twice
+        backfill_test_split(seeded_db, model, evaluator)
+        assert evaluator.report()["n_labeled"] == 294
@@ -0,0 +1,66 @@
+"""
+Tests for per-feature prediction explanations
+"""
+
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.explain import LinearExplainer, get_explainer
+from app.model import get_model, MODEL_PATH, BASE_PATH
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Full employee dataset restricted to model features."""
+    model = get_model()
+    return pd.read_csv(BASE_PATH / "data" / "employees.csv")[model.feature_names]
+
+
+class TestLinearExplainer:
+    """Tests for the LinearExplainer class."""
+
+    def test_contributions_sum_to_logit(self, dataset):
+        """Test that intercept + contributions equals the model log-odds."""
+        model = get_model()
+        explainer = get_explainer()
+
+        logit = explainer.intercept + explainer.contributions(dataset).sum(axis=1)
+        np.testing.assert_allclose(logit, model.model.decision_function(dataset), atol=1e-9)
+
+    def test_pickle_and_compact_agree(self, dataset):
+        """Test that both artifact formats give the same contributions."""
+        model = get_model()
+        pickle_model = SimpleNamespace(
+            model=joblib.load(MODEL_PATH), model_format="pickle", feature_names=model.feature_names
+        )
+        from_pickle = LinearExplainer.from_model(pickle_model)
+
+        np.testing.assert_allclose(
+            from_pickle.contributions(dataset), get_explainer().contributions(dataset), atol=1e-9
+        )
+
+    def test_top_k_sorted_by_magnitude(self, dataset):
+        """Test that top-k contributions are the largest, in decreasing magnitude."""
+        explainer = get_explainer()
+        rows = dataset.iloc[:20]
+        full = explainer.contributions(rows)
+
+        for row, explanation in enumerate(explainer.explain(rows, 5)):
+            magnitudes = [abs(c["contribution"]) for c in explanation["contributions"]]
+            assert len(magnitudes) == 5
+            assert magnitudes == sorted(magnitudes, reverse=True)
+            assert magnitudes[0] == pytest.approx(np.abs(full[row]).max(), abs=1e-6)
+
+    def test_kinds_and_values(self, dataset):
+        """Test that features are labeled raw/engineered with their input value."""
+        explanation = get_explainer().explain(dataset.iloc[[0]], 35)[0]
+        by_feature = {c["feature"]: c for c in explanation["contributions"]}
+
+        assert len(by_feature) == 35
+        assert by_feature["satisfaction_globale"]["kind"] == "engineered"
+        assert by_feature["age"]["kind"] == "raw"
+        assert by_feature["genre"]["value"] == dataset.iloc[0]["genre"]
@@ -0,0 +1,112 @@
+"""
+Tests for the streaming CSV / NDJSON exports
+"""
+
+import io
+import csv
+import json
+from datetime import datetime
+
+import pytest
+
+from app.archive import PredictionArchive, archive_predictions, prediction_archive
+from app.database import log_prediction
+from app.export import serialize, prediction_batches, employee_batches
+
+
+def add_predictions(db, timestamps):
+    ids = []
+    for i, created_at in enumerate(timestamps):
+        prediction = log_prediction(db, {"age": 30 + i}, i % 2, 0.2 + i / 10,
+                                    ["low", "medium", "high"][i % 3], employee_id=None)
+        prediction.created_at = created_at
+        db.commit()
+        ids.append(prediction.id)
+    return ids
+
+
+@pytest.fixture
+def history(db_session, tmp_path, monkeypatch):
+    """Six predictions, the three of January archived."""
+    ids = add_predictions(db_session, [datetime(2026, 1, d) for d in (3, 10, 20)] +
+                          [datetime(2026, 5, d) for d in (2, 4, 6)])
+    archive = PredictionArchive(tmp_path / "archive")
+    archive_predictions(db_session, retention_days=60, directory=archive.directory, now=datetime(2026, 5, 10))
+    monkeypatch.setattr(prediction_archive, "directory", archive.directory)
+    return ids
+
+
+def read_csv(content):
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+class TestSerialize:
+    """Tests for batch serialization."""
+
+    def test_csv_and_ndjson(self):
+        """Test one chunk per batch, CSV header first, ISO timestamps."""
+        batches = [[{"a": 1, "b": datetime(2026, 1, 2)}], [{"a": None, "b": "x,y"}]]
+        chunks = list(serialize(iter(batches), ["a", "b"], "csv"))
+        assert len(chunks) == 3
+        assert b"".join(chunks).decode() == 'a,b\n1,2026-01-02T00:00:00\n,"x,y"\n'
+
+        lines = b"".join(serialize(iter(batches), ["a", "b"], "ndjson")).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{"a": 1, "b": "2026-01-02T00:00:00"}, {"a": None, "b": "x,y"}]
+
+
+class TestPredictionExport:
+    """Tests for the prediction log export."""
+
+    def test_batches_span_archive_and_database(self, db_session, history):
+        """Test that the export is ordered by id across the archive and the database."""
+        batches = list(prediction_batches(db_session, batch_size=2))
+        assert [len(b) for b in batches] == [2, 1, 2, 1]
+        assert [r["id"] for b in batches for r in b] == history
+        assert [r["archived"] for b in batches for r in b] == [True] * 3 + [False] * 3
+
+    def test_filters(self, db_session, history):
+        """Test time range and risk level filters on both sources."""
+        rows = [r for b in prediction_batches(db_session, start=datetime(2026, 1, 5), end=datetime(2026, 5, 5),
+                                              risk_level="medium") for r in b]
+        assert [r["id"] for r in rows] == [history[1], history[4]]
+
+    def test_endpoint_csv(self, client, history):
+        """Test GET /predictions/export as a CSV download."""
+        response = client.get("/predictions/export", params={"start": "2026-01-05T00:00:00Z"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = read_csv(response.text)
+        assert [int(r["id"]) for r in rows] == history[1:]
+        assert rows[0]["archived"] == "True" and rows[0]["risk_level"] == "medium"
+
+    def test_endpoint_ndjson(self, client, history):
+        """Test the NDJSON format and the risk level filter."""
+        response = client.get("/predictions/export", params={"format": "ndjson", "risk_level": "high"})
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["id"] for r in rows] == [history[2], history[5]]
+        assert rows[0]["created_at"] == "2026-01-20T00:00:00"
+
+    def test_invalid_range(self, client, history):
+        """Test that an empty time range is rejected."""
+        response = client.get("/predictions/export", params={"start": "2026-02-01T00:00:00",
+                                                             "end": "2026-01-01T00:00:00"})
+        assert response.status_code == 422
+
+
+class TestEmployeeExport:
+    """Tests for the roster export."""
+
+    def test_full_roster(self, client, seeded_db):
+        """Test that every current employee is exported with its raw columns."""
+        rows = read_csv(client.get("/employees/export").text)
+        assert len(rows) == 1470
+        assert "content_hash" not in rows[0] and "revenu_mensuel" in rows[0]
+        assert [int(r["employee_id"]) for r in rows] == sorted(int(r["employee_id"]) for r in rows)
+
+    def test_filters(self, db_session, seeded_db):
+        """Test department filter and batching."""
+        batches = list(employee_batches(db_session, departement="Commercial", batch_size=100))
+        assert all(len(b) <= 100 for b in batches)
+        assert {r["departement"] for b in batches for r in b} == {"Commercial"}
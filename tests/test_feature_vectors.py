@@ -0,0 +1,76 @@
+"""
+Tests for the content-addressed prediction inputs
+"""
+
+from datetime import datetime
+
+from app.database import (
+    FeatureVector, Prediction, input_hash, log_prediction, log_predictions, get_prediction_with_input,
+)
+from scripts.migrate_feature_vectors import migrate_inputs, storage_report
+
+
+def legacy_prediction(db, input_data):
+    """Prediction logged with its inputs inline, as before feature_vectors."""
+    prediction = Prediction(input_data=input_data, prediction=0, probability=0.2,
+                            risk_level="low", created_at=datetime.utcnow())
+    db.add(prediction)
+    db.commit()
+    return prediction.id
+
+
+class TestFeatureVectors:
+    """Tests for deduplicated input storage."""
+
+    def test_hash_ignores_key_order(self):
+        """Test that the content address does not depend on key order."""
+        assert input_hash({"age": 30, "genre": "M"}) == input_hash({"genre": "M", "age": 30})
+        assert input_hash({"age": 30}) != input_hash({"age": 31})
+
+    def test_identical_inputs_stored_once(self, db_session):
+        """Test that repeated inputs share one vector, single and bulk logging alike."""
+        first = log_prediction(db_session, {"age": 30, "genre": "M"}, 0, 0.1, "low")
+        log_predictions(db_session, [
+            {"input_data": {"genre": "M", "age": 30}, "prediction": 0, "probability": 0.1, "risk_level": "low"},
+            {"input_data": {"age": 40}, "prediction": 1, "probability": 0.7, "risk_level": "high"},
+            {"input_data": {"age": 40}, "prediction": 1, "probability": 0.7, "risk_level": "high"},
+        ])
+
+        assert db_session.query(FeatureVector).count() == 2
+        assert first.input_hash == input_hash({"age": 30, "genre": "M"})
+        assert db_session.query(Prediction).filter(Prediction.input_data.isnot(None)).count() == 0
+
+    def test_prediction_returns_joined_input(self, client, sample_employee_data):
+        """Test that GET /predictions/{id} still returns the full input data."""
+        prediction_id = client.post("/predict", json=sample_employee_data).json()["prediction_id"]
+        client.post("/predict", json=sample_employee_data)
+
+        data = client.get(f"/predictions/{prediction_id}").json()["input_data"]
+        assert data["age"] == sample_employee_data["age"]
+        assert "satisfaction_globale" in data
+
+    def test_migration(self, db_session):
+        """Test that legacy rows are moved, deduplicated and still readable."""
+        ids = [legacy_prediction(db_session, {"age": 30, "genre": "F"}) for _ in range(3)]
+        log_prediction(db_session, {"genre": "F", "age": 30}, 0, 0.2, "low")
+
+        report = storage_report(db_session)
+        assert report["n_inline"] == 3 and report["n_vectors"] == 1
+
+        assert migrate_inputs(db_session, batch_size=2) == 3
+        assert migrate_inputs(db_session) == 0
+        assert db_session.query(FeatureVector).count() == 1
+        assert get_prediction_with_input(db_session, ids[0])[1] == {"age": 30, "genre": "F"}
+
+        report = storage_report(db_session)
+        assert report["n_predictions"] == 4 and report["n_inline"] == 0
+        assert report["inline_bytes"] == 4 * len('{"age":30,"genre":"F"}')
+        assert report["stored_bytes"] == len('{"age":30,"genre":"F"}') + 4 * 32
+
+    def test_legacy_row_read_inline(self, db_session):
+        """Test that a prediction not migrated yet returns its inline inputs."""
+        prediction_id = legacy_prediction(db_session, {"age": 50})
+        prediction, data = get_prediction_with_input(db_session, prediction_id)
+        assert prediction.id == prediction_id
+        assert data == {"age": 50}
+        assert get_prediction_with_input(db_session, 99999) is None
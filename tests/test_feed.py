@@ -0,0 +1,117 @@
+"""
+Tests for the live prediction feed
+"""
+
+import json
+import asyncio
+import threading
+
+import pytest
+
+from app.database import log_prediction, log_predictions
+from app.feed import Broadcaster, DROPPED, broadcaster
+
+
+def event(prediction_id, risk_level="low", employee_id=None):
+    return {"id": prediction_id, "employee_id": employee_id, "prediction": 0,
+            "probability": 0.1, "risk_level": risk_level, "created_at": None}
+
+
+class TestBroadcaster:
+    """Tests for the fan-out broadcaster."""
+
+    def test_fan_out_with_filters(self):
+        """Test that each subscriber only receives matching events."""
+        async def scenario():
+            broadcaster = Broadcaster()
+            everyone = broadcaster.subscribe()
+            high = broadcaster.subscribe(risk_level="high")
+            employee = broadcaster.subscribe(employee_id=7)
+            broadcaster.publish([event(1), event(2, "high"), event(3, employee_id=7)])
+            return [[e["id"] for e in list(s.queue._queue)] for s in (everyone, high, employee)]
+
+        assert asyncio.run(scenario()) == [[1, 2, 3], [2], [3]]
+
+    def test_slow_consumer_dropped(self):
+        """Test that a full buffer drops the subscriber without blocking writers."""
+        async def scenario():
+            broadcaster = Broadcaster(buffer_size=3)
+            slow = broadcaster.subscribe()
+            fast = broadcaster.subscribe(risk_level="high")
+            broadcaster.publish([event(i) for i in range(5)])
+            return broadcaster, slow, fast
+
+        broadcaster, slow, fast = asyncio.run(scenario())
+        assert slow.dropped
+        assert list(slow.queue._queue) == [DROPPED]
+        assert broadcaster.n_subscribers == 1
+        assert broadcaster.dropped == 1
+        assert not fast.dropped
+
+    def test_publish_from_other_thread(self):
+        """Test delivery when the logging path runs outside the event loop."""
+        async def scenario():
+            broadcaster = Broadcaster()
+            subscription = broadcaster.subscribe()
+            thread = threading.Thread(target=broadcaster.publish, args=([event(1)],))
+            thread.start()
+            thread.join()
+            return await asyncio.wait_for(subscription.queue.get(), 1)
+
+        assert asyncio.run(scenario())["id"] == 1
+
+    def test_max_subscribers(self):
+        """Test the subscriber limit."""
+        async def scenario():
+            broadcaster = Broadcaster(max_subscribers=1)
+            broadcaster.subscribe()
+            broadcaster.subscribe()
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(scenario())
+
+    def test_stream_format_and_unsubscribe(self):
+        """Test SSE framing, the dropped notice and cleanup on close."""
+        async def scenario():
+            broadcaster = Broadcaster(buffer_size=1)
+            subscription = broadcaster.subscribe()
+            stream = broadcaster.stream(subscription, heartbeat=0.01)
+            chunks = [await stream.__anext__()]
+            chunks.append(await stream.__anext__())
+            broadcaster.publish([event(42, "high")])
+            chunks.append(await stream.__anext__())
+            broadcaster.publish([event(43), event(44)])
+            chunks.append(await stream.__anext__())
+            await stream.aclose()
+            return chunks, broadcaster.n_subscribers
+
+        chunks, n_subscribers = asyncio.run(scenario())
+        assert chunks[0] == ": connected\n\n"
+        assert chunks[1] == ": keepalive\n\n"
+        assert chunks[2].startswith("id: 42\nevent: prediction\ndata: ")
+        assert json.loads(chunks[2].split("data: ")[1])["risk_level"] == "high"
+        assert chunks[3].startswith("event: dropped")
+        assert n_subscribers == 0
+
+
+class TestLoggingPath:
+    """Tests for publication from the prediction log."""
+
+    def test_logged_predictions_published(self, db_session):
+        """Test that single and bulk logging both feed subscribers."""
+        async def scenario():
+            subscription = broadcaster.subscribe(risk_level="high")
+            try:
+                log_prediction(db_session, {"age": 30}, 1, 0.9, "high", employee_id=None)
+                ids = log_predictions(db_session, [
+                    {"input_data": {"age": 40}, "prediction": 0, "probability": 0.1, "risk_level": "low"},
+                    {"input_data": {"age": 50}, "prediction": 1, "probability": 0.8, "risk_level": "high"},
+                ])
+                return ids, list(subscription.queue._queue)
+            finally:
+                broadcaster.unsubscribe(subscription)
+
+        ids, events = asyncio.run(scenario())
+        assert [e["id"] for e in events] == [1, ids[1]]
+        assert events[1]["probability"] == 0.8
+        assert events[1]["created_at"] is not None
@@ -0,0 +1,100 @@
+"""
+Tests for the HTTP conditional requests (ETag / Last-Modified)
+"""
+
+from datetime import datetime
+
+from app.database import Employee
+from app.employee_cache import employee_cache
+from app.evaluation import evaluator
+from app.http_cache import etag_matches, http_date, make_etag, not_modified_since
+
+
+class TestValidators:
+    """Tests for ETag and date comparisons."""
+
+    def test_etag_matches(self):
+        """Test lists, weak tags and the wildcard."""
+        etag = make_etag("x", 1)
+        assert etag.startswith('"') and etag != make_etag("x", 2)
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+
+    def test_modified_since(self):
+        """Test second resolution and invalid dates."""
+        last_modified = datetime(2026, 2, 5, 16, 31, 26, 375346)
+        assert http_date(last_modified) == "Thu, 05 Feb 2026 16:31:26 GMT"
+        assert not_modified_since("Thu, 05 Feb 2026 16:31:26 GMT", last_modified)
+        assert not not_modified_since("Thu, 05 Feb 2026 16:31:25 GMT", last_modified)
+        assert not not_modified_since("yesterday", last_modified)
+
+
+class TestModelEndpoints:
+    """Tests for /model/features and /model/info."""
+
+    def test_features_not_modified(self, client):
+        """Test a 304 with an empty body when the ETag matches."""
+        response = client.get("/model/features")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        assert "last-modified" in response.headers
+
+        revalidated = client.get("/model/features", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        since = client.get("/model/features", headers={"If-Modified-Since": response.headers["last-modified"]})
+        assert since.status_code == 304
+        assert client.get("/model/features", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+    def test_info_follows_live_metrics(self, client):
+        """Test that a labeled prediction changes the /model/info ETag."""
+        etag = client.get("/model/info").headers["etag"]
+        assert client.get("/model/info", headers={"If-None-Match": etag}).status_code == 304
+
+        evaluator.update(1, 1, 0.9)
+        response = client.get("/model/info", headers={"If-None-Match": etag})
+        evaluator.reset()
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.headers["cache-control"] == "no-cache"
+
+
+class TestEmployeeEndpoints:
+    """Tests for /employees and /employees/{id}."""
+
+    def test_employee_not_modified_from_cache(self, client, seeded_db):
+        """Test that a revalidation is answered from the record cache."""
+        response = client.get("/employees/1")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        misses = employee_cache.misses
+        assert client.get("/employees/1", headers={"If-None-Match": etag}).status_code == 304
+        assert employee_cache.misses == misses
+
+        assert client.get("/employees/2", headers={"If-None-Match": etag}).status_code == 200
+        assert client.get("/employees/999999", headers={"If-None-Match": etag}).status_code == 404
+
+    def test_employee_change_invalidates_etag(self, client, seeded_db, db_session):
+        """Test that updating the row changes the ETag."""
+        etag = client.get("/employees/1").headers["etag"]
+        employee = db_session.query(Employee).filter(Employee.employee_id == 1).first()
+        employee.revenu_mensuel += 100
+        employee.updated_at = datetime.utcnow()
+        db_session.commit()
+        employee_cache.invalidate([1])
+
+        response = client.get("/employees/1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_list_depends_on_query(self, client, seeded_db):
+        """Test that the list ETag varies with the page."""
+        etag = client.get("/employees", params={"limit": 10}).headers["etag"]
+        assert client.get("/employees", params={"limit": 10}, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/employees", params={"limit": 20}, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,140 @@
+"""
+Tests for the Idempotency-Key support of the prediction endpoints
+"""
+
+import time
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app import idempotency
+from app.database import count_predictions
+from app.idempotency import (
+    IdempotencyConflict, IdempotencyStore, REPLAY_HEADER, idempotency_store, request_fingerprint, run_idempotent,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    idempotency_store.clear()
+    yield
+    idempotency_store.clear()
+
+
+class TestIdempotencyStore:
+    """Tests for key reservation, expiry and bounds."""
+
+    def test_reserve_and_replay(self):
+        """Test that only the first caller owns a key."""
+        store = IdempotencyStore()
+        entry, owner = store.reserve("k", "a")
+        assert owner
+        store.complete("k", entry, {"id": 1})
+        entry, owner = store.reserve("k", "a")
+        assert not owner and entry.response == {"id": 1}
+        with pytest.raises(IdempotencyConflict):
+            store.reserve("k", "b")
+        assert store.stats()["replays"] == 1 and store.stats()["conflicts"] == 1
+
+    def test_fingerprint_is_canonical(self):
+        """Test that key order does not change the fingerprint."""
+        first = request_fingerprint("/predict", {"a": 1, "b": 2}, 0)
+        assert first == request_fingerprint("/predict", {"b": 2, "a": 1}, 0)
+        assert first != request_fingerprint("/predict", {"a": 1, "b": 2}, 3)
+
+    def test_ttl_and_max_keys(self, monkeypatch):
+        """Test that expired and least recent keys are dropped."""
+        clock = [1000.0]
+        monkeypatch.setattr(idempotency.time, "monotonic", lambda: clock[0])
+        store = IdempotencyStore(max_keys=2, ttl=60)
+        for key in ("a", "b", "c"):
+            store.complete(key, store.reserve(key, key)[0], key)
+        assert store.stats()["size"] == 2 and store.stats()["evictions"] == 1
+        assert store.reserve("a", "other")[1]
+
+        clock[0] += 59
+        with pytest.raises(IdempotencyConflict):
+            store.reserve("c", "other")
+        clock[0] += 1
+        assert store.reserve("c", "other")[1]
+
+    def test_failure_not_stored(self):
+        """Test that a failed computation releases the key."""
+        store = IdempotencyStore()
+
+        def fail():
+            raise HTTPException(status_code=500)
+
+        with pytest.raises(HTTPException):
+            asyncio.run(run_idempotent("k", "a", Response(), fail, store=store))
+        assert asyncio.run(run_idempotent("k", "a", Response(), lambda: "ok", store=store)) == "ok"
+
+    def test_concurrent_duplicate_waits(self):
+        """Test that a duplicate in flight waits for the first result instead of computing."""
+        store = IdempotencyStore()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"prediction_id": len(calls)}
+
+        results = [None, None]
+
+        def call(index):
+            response = Response()
+            results[index] = (asyncio.run(run_idempotent("k", "a", response, compute, store=store)),
+                              response.headers.get(REPLAY_HEADER))
+
+        first = threading.Thread(target=call, args=(0,))
+        first.start()
+        time.sleep(0.05)
+        second = threading.Thread(target=call, args=(1,))
+        second.start()
+        first.join()
+        second.join()
+
+        assert len(calls) == 1
+        assert results == [({"prediction_id": 1}, None), ({"prediction_id": 1}, "true")]
+        assert store.stats()["waits"] == 1
+
+
+class TestPredictEndpoints:
+    """Tests for retried /predict and /predict/batch requests."""
+
+    def test_retry_replays_prediction(self, client, db_session, sample_employee_data):
+        """Test that a retry returns the same prediction and logs no new row."""
+        headers = {"Idempotency-Key": "retry-1"}
+        first = client.post("/predict", json=sample_employee_data, headers=headers)
+        retry = client.post("/predict", json=sample_employee_data, headers=headers)
+
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.headers[REPLAY_HEADER] == "true" and REPLAY_HEADER not in first.headers
+        assert count_predictions(db_session) == 1
+
+    def test_key_reused_for_other_body(self, client, sample_employee_data, high_risk_employee_data):
+        """Test that a key cannot be reused for a different request."""
+        headers = {"Idempotency-Key": "retry-2"}
+        client.post("/predict", json=sample_employee_data, headers=headers)
+        response = client.post("/predict", json=high_risk_employee_data, headers=headers)
+        assert response.status_code == 422
+        assert client.post("/predict?explain=3", json=sample_employee_data, headers=headers).status_code == 422
+
+    def test_without_key(self, client, db_session, sample_employee_data):
+        """Test that requests without a key are all scored and logged."""
+        client.post("/predict", json=sample_employee_data)
+        client.post("/predict", json=sample_employee_data)
+        assert count_predictions(db_session) == 2
+
+    def test_batch_retry(self, client, db_session, sample_employee_data, high_risk_employee_data):
+        """Test that a retried batch keeps its prediction ids."""
+        body = {"employees": [sample_employee_data, high_risk_employee_data]}
+        headers = {"Idempotency-Key": "batch-1"}
+        first = client.post("/predict/batch", json=body, headers=headers).json()
+        retry = client.post("/predict/batch", json=body, headers=headers).json()
+
+        assert [p["prediction_id"] for p in retry["predictions"]] == [p["prediction_id"] for p in first["predictions"]]
+        assert count_predictions(db_session) == 2
@@ -0,0 +1,51 @@
+"""
+Tests for the in-process metrics registry
+"""
+
+from app.metrics import Histogram, MetricsRegistry, LATENCY_BUCKETS
+
+
+class TestHistogram:
+    """Tests for the Histogram class."""
+
+    def test_observe_buckets(self):
+        """Test that values land in the first bucket whose bound is >= value."""
+        hist = Histogram((1, 5, 10))
+        for value in [0.5, 1, 3, 10, 50]:
+            hist.observe(value)
+
+        assert hist.counts == [2, 1, 1, 1]
+        assert hist.cumulative() == [2, 3, 4, 5]
+        assert hist.count == 5
+        assert hist.sum == 64.5
+
+
+class TestMetricsRegistry:
+    """Tests for Prometheus rendering."""
+
+    def test_render_histogram_series(self):
+        """Test that each stage renders buckets, +Inf, sum and count."""
+        registry = MetricsRegistry()
+        registry.observe_stage("model_predict", 0.002)
+
+        text = registry.render()
+        assert f'attrition_stage_duration_seconds_bucket{{stage="model_predict",le="{LATENCY_BUCKETS[0]}"}} 0' in text
+        assert 'attrition_stage_duration_seconds_bucket{stage="model_predict",le="+Inf"} 1' in text
+        assert 'attrition_stage_duration_seconds_count{stage="model_predict"} 1' in text
+
+    def test_render_gauges(self):
+        """Test that gauge callbacks are evaluated at render time."""
+        registry = MetricsRegistry()
+        registry.register_gauge("attrition_test_gauge", "Test gauge", lambda: {"size": 5})
+
+        assert 'attrition_test_gauge{key="size"} 5' in registry.render()
+
+    def test_reset(self):
+        """Test that reset clears recorded values."""
+        registry = MetricsRegistry()
+        registry.observe_stage("db_log", 0.01)
+        registry.observe_batch(10)
+        registry.reset()
+
+        assert registry.stages == {}
+        assert registry.predictions_total == 0
@@ -2,8 +2,14 @@
 Tests for ML model and feature engineering modules
 """
 
+from datetime import timedelta
+
+import joblib
+import numpy as np
+import pandas as pd
 import pytest
-from app.model import get_model, AttritionModel
+from app.model import get_model, AttritionModel, MODEL_PATH, COMPACT_MODEL_PATH, BASE_PATH
+from app.compact_model import CompactPipeline, export_pipeline
 from app.feature_engineering import FeatureEngineer, feature_engineer
 
 
@@ -135,6 +141,13 @@ class TestAttritionModel:
         assert result["risk_level"] in ["low", "medium", "high"]
         assert result["attrition_label"] in ["Oui", "Non"]
 
+    def test_predict_batch_matches_predict(self, dataset):
+        """Test that vectorized batch scoring gives the per-row results."""
+        model = get_model()
+        rows = dataset.head(20).to_dict("records")
+        assert model.predict_batch(rows) == [model.predict(row) for row in rows]
+        assert model.predict_batch([]) == []
+
     def test_model_info(self):
         """Test that model info returns correct data."""
         model = get_model()
@@ -146,6 +159,78 @@ class TestAttritionModel:
         assert "metrics" in info
         assert "hyperparameters" in info
 
+    def test_fingerprint_without_export_date(self, monkeypatch):
+        """Test that the artifact mtime fallback is an aware UTC datetime."""
+        model = get_model()
+        monkeypatch.setattr(model, "metadata", {})
+        _, last_modified = model._fingerprint()
+        assert last_modified.utcoffset() == timedelta(0)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """Full employee dataset restricted to model features."""
+    model = get_model()
+    return pd.read_csv(BASE_PATH / "data" / "employees.csv")[model.feature_names]
+
+
+class TestCompactPipeline:
+    """Tests for the compact memory-mapped model artifact."""
+
+    def test_default_model_uses_compact_artifact(self):
+        """Test that the compact artifact is preferred when present."""
+        model = get_model()
+        assert model.model_format == "compact"
+        assert isinstance(model.model, CompactPipeline)
+
+    def test_compact_matches_pickle(self, dataset):
+        """Test that compact scoring reproduces the sklearn pipeline."""
+        pipeline = joblib.load(MODEL_PATH)
+        compact = CompactPipeline(COMPACT_MODEL_PATH)
+
+        np.testing.assert_allclose(
+            compact.predict_proba(dataset), pipeline.predict_proba(dataset), atol=1e-12
+        )
+        np.testing.assert_array_equal(compact.predict(dataset), pipeline.predict(dataset))
+
+    def test_unknown_category_encoded_as_zeros(self, dataset):
+        """Test that unseen categories behave like sklearn's handle_unknown='ignore'."""
+        pipeline = joblib.load(MODEL_PATH)
+        compact = CompactPipeline(COMPACT_MODEL_PATH)
+
+        row = dataset.iloc[[0]].copy()
+        row["poste"] = "Poste inconnu"
+        with pytest.warns(UserWarning):
+            expected = pipeline.predict_proba(row)
+        np.testing.assert_allclose(compact.predict_proba(row), expected, atol=1e-12)
+
+    def test_categorical_columns_encoded_from_codes(self, dataset):
+        """Test that Categorical columns (codes path) encode like plain strings."""
+        compact = CompactPipeline(COMPACT_MODEL_PATH)
+        frame = dataset.head(50).copy()
+        frame.loc[frame.index[0], "poste"] = "Poste inconnu"
+        frame.loc[frame.index[1], "departement"] = None
+        categorical = frame.astype({col: "category" for col in compact.categorical_features})
+        np.testing.assert_array_equal(compact.transform(categorical), compact.transform(frame))
+
+    def test_export_roundtrip(self, tmp_path):
+        """Test that a freshly exported artifact loads and is memory-mapped."""
+        model = get_model()
+        path = tmp_path / "model.bin"
+        header = export_pipeline(joblib.load(MODEL_PATH), path, model.features_info)
+
+        compact = CompactPipeline(path)
+        assert compact.header == header
+        assert isinstance(compact._payload, np.memmap)
+        assert compact.n_encoded == 48
+
+    def test_rejects_invalid_file(self, tmp_path):
+        """Test that a file without the magic header is rejected."""
+        path = tmp_path / "bogus.bin"
+        path.write_bytes(b"\0" * 64)
+        with pytest.raises(ValueError):
+            CompactPipeline(path)
+
 
 class TestFeatureEngineer:
     """Tests for the FeatureEngineer class."""
@@ -0,0 +1,107 @@
+"""
+Tests for the roster snapshot, leaderboard and aggregates
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.database import Employee
+from app.feature_engineering import feature_engineer
+from app.model import get_model, risk_levels, BASE_PATH
+from app.roster import Roster, filter_mask, top_at_risk, risk_aggregates
+
+
+@pytest.fixture(scope="module")
+def frame():
+    """Scored roster snapshot built from the dataset."""
+    df = feature_engineer.engineer_features(pd.read_csv(BASE_PATH / "data" / "employees.csv"))
+    df["probability"] = get_model().predict_frame(df)[1]
+    df["risk_level"] = risk_levels(df["probability"])
+    return df
+
+
+class TestRoster:
+    """Tests for the Roster snapshot."""
+
+    def test_load_scores_everyone(self, seeded_db):
+        """Test that the snapshot holds every employee with a probability."""
+        snapshot = Roster()
+        frame = snapshot.get(seeded_db)
+        assert len(frame) == 1470
+        assert frame["probability"].between(0, 1).all()
+        assert set(frame["risk_level"]) <= {"low", "medium", "high"}
+
+    def test_deleted_employees_excluded(self, seeded_db):
+        """Test that employees flagged deleted by a sync leave the snapshot."""
+        seeded_db.query(Employee).filter(Employee.employee_id == 1).update({"deleted_at": datetime.utcnow()})
+        seeded_db.commit()
+        frame = Roster().get(seeded_db)
+        assert len(frame) == 1469
+        assert 1 not in set(frame["employee_id"])
+
+    def test_reload_on_invalidate(self, seeded_db):
+        """Test that the version changes only when the snapshot is reloaded."""
+        snapshot = Roster()
+        first = snapshot.get(seeded_db)
+        assert snapshot.get(seeded_db) is first
+        assert snapshot.version == 1
+        snapshot.invalidate()
+        snapshot.get(seeded_db)
+        assert snapshot.version == 2
+
+
+class TestLeaderboard:
+    """Tests for top-k selection."""
+
+    def test_matches_full_sort(self, frame):
+        """Test that the partial sort returns the same employees as a full sort."""
+        mask = filter_mask(frame, {"departement": "Consulting", "poste": None})
+        top = top_at_risk(frame, 50, mask)
+
+        expected = frame[mask].sort_values(["probability", "employee_id"], ascending=[False, True]).head(50)
+        assert [e["employee_id"] for e in top] == expected["employee_id"].tolist()
+        assert all(e["departement"] == "Consulting" for e in top)
+
+    def test_k_larger_than_population(self, frame):
+        """Test that k above the number of matches returns every match."""
+        mask = filter_mask(frame, {"departement": "Ressources Humaines"})
+        assert len(top_at_risk(frame, 1000, mask)) == mask.sum()
+
+
+class TestAggregates:
+    """Tests for grouped aggregates."""
+
+    def test_matches_pandas_groupby(self, frame):
+        """Test bincount aggregates against a pandas groupby."""
+        mask = np.ones(len(frame), dtype=bool)
+        groups = {g["value"]: g for g in risk_aggregates(frame, "poste", mask)}
+        expected = frame.groupby("poste")["probability"].agg(["count", "mean", "sum"])
+
+        assert set(groups) == set(expected.index)
+        for poste, row in expected.iterrows():
+            assert groups[poste]["count"] == row["count"]
+            assert groups[poste]["mean_probability"] == pytest.approx(row["mean"], abs=1e-4)
+            assert sum(groups[poste]["risk_levels"].values()) == row["count"]
+
+    def test_missing_values_grouped_as_unknown(self, frame):
+        """Test that missing group values form an "unknown" group instead of failing."""
+        frame = frame.copy()
+        frame.loc[frame.index[:3], "departement"] = None
+        mask = np.ones(len(frame), dtype=bool)
+        groups = {g["value"]: g for g in risk_aggregates(frame, "departement", mask)}
+        assert groups["unknown"]["count"] == 3
+        assert sum(g["count"] for g in groups.values()) == len(frame)
+
+        categorical = frame.astype({"departement": "category"})
+        assert {g["value"]: g["count"] for g in risk_aggregates(categorical, "departement", mask)} == \
+            {value: g["count"] for value, g in groups.items()}
+
+    def test_sorted_by_mean_risk(self, frame):
+        """Test that groups come highest mean risk first."""
+        groups = risk_aggregates(frame, "niveau_hierarchique_poste", np.ones(len(frame), dtype=bool))
+        means = [g["mean_probability"] for g in groups]
+        assert means == sorted(means, reverse=True)
+        assert all(isinstance(g["value"], int) for g in groups)
@@ -0,0 +1,183 @@
+"""
+Tests for the chunked CSV loader (scripts/seed_db.py)
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.database import Base, Employee
+from scripts.seed_db import (
+    CSV_PATH, chunk_loader, content_hashes, copy_chunk, insert_chunk, seed_employees, sync_employees,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Empty SQLite database file."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def count(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM employees")).scalar()
+
+
+class TestSeed:
+    """Tests for the streaming loader."""
+
+    def test_load_in_chunks(self, engine):
+        """Test that a chunked load stores every row with typed values."""
+        assert seed_employees(engine, chunk_size=500)
+        assert count(engine) == 1470
+
+        df = pd.read_csv(CSV_PATH).set_index("employee_id")
+        with engine.connect() as conn:
+            row = conn.execute(Employee.__table__.select().where(Employee.employee_id == 1000)).mappings().one()
+        assert row["age"] == df.loc[1000, "age"]
+        assert row["revenu_mensuel"] == pytest.approx(df.loc[1000, "revenu_mensuel"])
+        assert row["departement"] == df.loc[1000, "departement"]
+        assert row["dataset_type"] == df.loc[1000, "dataset_type"]
+        assert row["created_at"] is not None
+
+    def test_invalid_value_rolls_back(self, engine, tmp_path, capsys):
+        """Test that a bad value reports its line and inserts nothing."""
+        df = pd.read_csv(CSV_PATH).head(30)
+        df["age"] = df["age"].astype(object)
+        df.loc[25, "age"] = "trente"
+        path = tmp_path / "bad.csv"
+        df.to_csv(path, index=False)
+
+        assert not seed_employees(engine, csv_path=path, chunk_size=10)
+        assert "Line 27: invalid age 'trente'" in capsys.readouterr().out
+        assert count(engine) == 0
+
+    def test_non_integral_integer(self, engine, tmp_path, capsys):
+        """Test that integer columns reject fractional values."""
+        df = pd.read_csv(CSV_PATH).head(5)
+        df["niveau_hierarchique_poste"] = df["niveau_hierarchique_poste"].astype(float)
+        df.loc[0, "niveau_hierarchique_poste"] = 2.5
+        path = tmp_path / "bad.csv"
+        df.to_csv(path, index=False)
+
+        assert not seed_employees(engine, csv_path=path)
+        assert "invalid niveau_hierarchique_poste" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("url, loader", [
+        ("postgresql://u@db/attrition", copy_chunk),
+        ("postgresql+psycopg://u@db/attrition", copy_chunk),
+        ("postgresql+psycopg2://u@db/attrition", copy_chunk),
+        ("postgresql+asyncpg://u@db/attrition", insert_chunk),
+        ("sqlite:///seed.db", insert_chunk),
+    ])
+    def test_loader_per_driver(self, url, loader):
+        """Test that COPY is used with both psycopg drivers, including the postgresql:// default."""
+        assert chunk_loader(make_url(url).get_dialect()) is loader
+
+    def test_copy_with_psycopg3(self):
+        """Test that psycopg 3 connections stream the chunk through cursor.copy()."""
+        written = []
+
+        class Copy:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def write(self, data):
+                written.append(data)
+
+        class Cursor:
+            def copy(self, sql):
+                written.append(sql)
+                return Copy()
+
+            def close(self):
+                pass
+
+        conn = SimpleNamespace(dialect=SimpleNamespace(driver="psycopg"),
+                               connection=SimpleNamespace(driver_connection=SimpleNamespace(cursor=Cursor)))
+        copy_chunk(conn, pd.DataFrame({"employee_id": [1, 2], "departement": ["Consulting", None]}))
+        assert written == ["COPY employees (employee_id, departement) FROM STDIN WITH (FORMAT csv)",
+                           "1,Consulting\n2,\n"]
+
+    def test_skip_when_not_empty(self, engine, capsys):
+        """Test that an already seeded database is left untouched."""
+        seed_employees(engine)
+        assert seed_employees(engine)
+        assert "Skipping seed" in capsys.readouterr().out
+        assert count(engine) == 1470
+
+
+class TestSync:
+    """Tests for the incremental roster sync."""
+
+    @pytest.fixture
+    def roster_csv(self, tmp_path):
+        """Editable copy of the dataset."""
+        df = pd.read_csv(CSV_PATH)
+        path = tmp_path / "roster.csv"
+        df.to_csv(path, index=False)
+        return df, path
+
+    def test_unchanged_file_writes_nothing(self, engine):
+        """Test that re-syncing the same file (other chunking) finds no change."""
+        seed_employees(engine, chunk_size=500)
+        changes = sync_employees(engine, chunk_size=1000)
+        assert changes == {"inserted": [], "updated": [], "deleted": [], "unchanged": 1470}
+
+    def test_content_hash_is_stable(self):
+        """Test that the row hash is a fixed SHA-256 of the values, not pandas' own hash."""
+        df = pd.DataFrame({"employee_id": pd.array([1, None], dtype="Int64"), "age": [30.0, None],
+                           "departement": ["Consulting", None]})
+        assert content_hashes(df) == ["30594964a483e550", "526276b25b2f4acb"]
+        assert content_hashes(df.assign(age=[31.0, None]))[0] != content_hashes(df)[0]
+
+    def test_changes_detected(self, engine, roster_csv):
+        """Test inserted, updated and deleted ids after an HRIS refresh."""
+        df, path = roster_csv
+        seed_employees(engine)
+
+        df.loc[df["employee_id"] == 5, "revenu_mensuel"] += 100
+        new = df[df["employee_id"] == 6].assign(employee_id=5000)
+        df = pd.concat([df[df["employee_id"] != 10], new])
+        df.to_csv(path, index=False)
+
+        changes = sync_employees(engine, csv_path=path)
+        assert changes == {"inserted": [5000], "updated": [5], "deleted": [10], "unchanged": 1468}
+
+        with engine.connect() as conn:
+            rows = {r.employee_id: r for r in conn.execute(Employee.__table__.select().where(
+                Employee.employee_id.in_([5, 10, 5000])))}
+        assert rows[5].revenu_mensuel == df.loc[df["employee_id"] == 5, "revenu_mensuel"].iloc[0]
+        assert rows[10].deleted_at is not None
+        assert rows[5000].deleted_at is None
+        assert count(engine) == 1471
+
+        # Idempotent; a deleted employee coming back is revived
+        assert sync_employees(engine, csv_path=path)["unchanged"] == 1470
+        changes = sync_employees(engine)
+        assert changes["updated"] == [5, 10] and changes["deleted"] == [5000]
+
+    def test_sync_empty_table(self, engine):
+        """Test that syncing into an empty table inserts everything."""
+        changes = sync_employees(engine)
+        assert len(changes["inserted"]) == 1470
+        assert count(engine) == 1470
+
+    def test_duplicate_ids_rejected(self, engine, roster_csv):
+        """Test that duplicated employee ids abort the sync."""
+        df, path = roster_csv
+        seed_employees(engine)
+        pd.concat([df, df.head(1)]).to_csv(path, index=False)
+
+        assert sync_employees(engine, csv_path=path, chunk_size=100) is None
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM employees WHERE deleted_at IS NOT NULL")).scalar() == 0
@@ -0,0 +1,111 @@
+"""
+Tests for the population-level policy simulator
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.feature_engineering import feature_engineer
+from app.model import get_model, BASE_PATH
+from app.simulation import Simulator, select, apply_actions, scenario_hash
+
+SCENARIO = {
+    "filter": [
+        {"feature": "departement", "op": "eq", "value": "Consulting"},
+        {"feature": "annees_depuis_la_derniere_promotion", "op": "gt", "value": 3},
+    ],
+    "actions": [{"feature": "revenu_mensuel", "op": "multiply", "value": 1.10}],
+}
+
+
+@pytest.fixture(scope="module")
+def frame():
+    """Scored roster snapshot built from the dataset."""
+    df = feature_engineer.engineer_features(pd.read_csv(BASE_PATH / "data" / "employees.csv"))
+    df["probability"] = get_model().predict_frame(df)[1]
+    return df
+
+
+class TestScenarioOperations:
+    """Tests for filters and actions."""
+
+    def test_select(self, frame):
+        """Test that conditions are combined with AND."""
+        mask = select(frame, SCENARIO["filter"])
+        expected = (frame["departement"] == "Consulting") & (frame["annees_depuis_la_derniere_promotion"] > 3)
+        assert mask.sum() == expected.sum() > 0
+
+    def test_actions_only_touch_selected_rows(self, frame):
+        """Test that unselected employees are unchanged."""
+        mask = select(frame, SCENARIO["filter"])
+        changed = apply_actions(frame, mask, SCENARIO["actions"])
+        np.testing.assert_allclose(changed.loc[mask, "revenu_mensuel"], frame.loc[mask, "revenu_mensuel"] * 1.1)
+        np.testing.assert_array_equal(changed.loc[~mask, "revenu_mensuel"], frame.loc[~mask, "revenu_mensuel"])
+
+    def test_actions_clipped_to_bounds(self, frame):
+        """Test that numerical results stay within EmployeeInput bounds."""
+        mask = np.ones(len(frame), dtype=bool)
+        changed = apply_actions(frame, mask, [{"feature": "satisfaction_employee_equipe", "op": "add", "value": 3}])
+        assert changed["satisfaction_employee_equipe"].max() == 5
+
+    def test_invalid_actions(self, frame):
+        """Test that invalid operations are rejected."""
+        mask = np.ones(len(frame), dtype=bool)
+        with pytest.raises(ValueError):
+            apply_actions(frame, mask, [{"feature": "heure_supplementaires", "op": "add", "value": 1}])
+        with pytest.raises(ValueError):
+            apply_actions(frame, mask, [{"feature": "satisfaction_globale", "op": "set", "value": 4}])
+        with pytest.raises(ValueError):
+            select(frame, [{"feature": "age", "op": "between", "value": 3}])
+
+    def test_unknown_category_rejected(self, frame):
+        """Test that a categorical action outside the training categories is rejected."""
+        mask = np.ones(len(frame), dtype=bool)
+        categories = get_model().categories
+        with pytest.raises(ValueError, match="unknown category"):
+            apply_actions(frame, mask, [{"feature": "departement", "op": "set", "value": "Marketing"}], categories)
+        changed = apply_actions(frame, mask, [{"feature": "departement", "op": "set", "value": "Consulting"}],
+                                categories)
+        assert (changed["departement"] == "Consulting").all()
+
+    def test_hash_ignores_key_order(self):
+        """Test that equivalent scenarios share a cache key."""
+        reordered = {"actions": SCENARIO["actions"], "filter": SCENARIO["filter"]}
+        assert scenario_hash(reordered) == scenario_hash(SCENARIO)
+
+
+class TestSimulator:
+    """Tests for scenario runs."""
+
+    def test_noop_scenario(self, frame):
+        """Test that a neutral action leaves the distribution unchanged."""
+        result = Simulator().run(frame, 1, {"filter": [], "actions": [
+            {"feature": "revenu_mensuel", "op": "multiply", "value": 1.0}]}, get_model())
+        assert result["before"] == result["after"]
+        assert result["n_affected"] == len(frame)
+
+    def test_raise_reduces_departures_in_target_department(self, frame):
+        """Test that a raise lowers expected departures only where applied."""
+        result = Simulator().run(frame, 1, SCENARIO, get_model())
+        by_department = {d["departement"]: d for d in result["by_department"]}
+
+        assert by_department["Consulting"]["delta"] < 0
+        assert by_department["Commercial"]["delta"] == 0
+        assert result["after"]["expected_departures"] < result["before"]["expected_departures"]
+        assert sum(result["after"]["risk_distribution"].values()) == len(frame)
+
+    def test_missing_department(self, frame):
+        """Test that employees without a department are reported in an "unknown" group."""
+        frame = frame.copy()
+        frame.loc[frame.index[:2], "departement"] = None
+        result = Simulator().run(frame, 1, SCENARIO, get_model())
+        by_department = {d["departement"]: d for d in result["by_department"]}
+        assert by_department["unknown"]["n_employees"] == 2
+
+    def test_cache(self, frame):
+        """Test that results are cached per scenario and roster version."""
+        simulator = Simulator()
+        assert simulator.run(frame, 1, SCENARIO, get_model())["cached"] is False
+        assert simulator.run(frame, 1, SCENARIO, get_model())["cached"] is True
+        assert simulator.run(frame, 2, SCENARIO, get_model())["cached"] is False
@@ -0,0 +1,113 @@
+"""
+Tests for the columnar roster snapshot
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.model import get_model
+from app.roster import Roster, risk_aggregates
+from app.simulation import Simulator
+from app.snapshot import write_snapshot, load_snapshot, latest_snapshot, list_snapshots, export_snapshot
+
+
+@pytest.fixture
+def frame():
+    """Small frame with every column kind and NULLs."""
+    return pd.DataFrame({
+        "employee_id": np.arange(1, 6),
+        "age": [30, 41, 25, 38, 52],
+        "revenu_mensuel": [2500.0, np.nan, 4100.5, 3000.0, 9000.0],
+        "attrition_actual": [1, None, 0, 0, None],
+        "departement": ["Commercial", "Consulting", None, "Commercial", "Ressources Humaines"],
+        "flag": [True, False, True, True, False],
+    })
+
+
+class TestSnapshotFile:
+    """Tests for the snapshot file format."""
+
+    def test_roundtrip(self, frame, tmp_path):
+        """Test that every column comes back with its values and NULLs."""
+        loaded, header = load_snapshot(write_snapshot(frame, tmp_path, metadata={"scores": False}))
+        assert header["n_rows"] == 5
+        assert header["metadata"] == {"scores": False}
+        assert list(loaded.columns) == list(frame.columns)
+        for name in frame.columns:
+            expected = frame[name].astype(object).where(frame[name].notna(), None).tolist()
+            actual = loaded[name].astype(object).where(loaded[name].notna(), None).tolist()
+            assert actual == expected, name
+
+    def test_columns_are_read_only_views(self, frame, tmp_path):
+        """Test that loading maps the file instead of copying it."""
+        loaded, _ = load_snapshot(write_snapshot(frame, tmp_path))
+        age = loaded["age"].to_numpy()
+        assert not age.flags.owndata and not age.flags.writeable
+        assert isinstance(loaded["departement"].dtype, pd.CategoricalDtype)
+        assert not loaded["departement"].array.codes.flags.owndata
+
+    def test_versions_and_pruning(self, frame, tmp_path):
+        """Test timestamp ordering and that only `keep` snapshots remain."""
+        start = datetime(2026, 1, 1)
+        paths = [write_snapshot(frame, tmp_path, created_at=start + timedelta(hours=h), keep=3)
+                 for h in range(5)]
+        assert list_snapshots(tmp_path) == paths[2:]
+        assert latest_snapshot(tmp_path) == paths[-1]
+        assert latest_snapshot(tmp_path / "missing") is None
+
+    def test_not_a_snapshot(self, tmp_path):
+        """Test that foreign files are rejected."""
+        path = tmp_path / "roster-1Z.snap"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError):
+            load_snapshot(path)
+
+
+class TestSnapshotRoster:
+    """Tests for the roster served from snapshots."""
+
+    def test_export_scored(self, seeded_db, tmp_path):
+        """Test that an exported snapshot matches the database roster."""
+        path = export_snapshot(seeded_db, directory=tmp_path)
+        loaded, header = load_snapshot(path)
+        from_db = Roster(source="db").get(seeded_db)
+
+        assert header["metadata"]["scores"]
+        assert "deleted_at" not in loaded.columns
+        np.testing.assert_allclose(loaded["probability"], from_db["probability"])
+        assert loaded["risk_level"].astype(str).tolist() == from_db["risk_level"].tolist()
+
+    def test_roster_uses_latest_snapshot(self, seeded_db, tmp_path):
+        """Test loading from the snapshot, reloading only when a newer file exists."""
+        roster = Roster(ttl=0, source="snapshot", snapshot_dir=tmp_path)
+        roster.get(seeded_db)
+        assert roster.snapshot_path is None  # no snapshot yet: database
+
+        first = export_snapshot(seeded_db, directory=tmp_path)
+        frame = roster.get(seeded_db)
+        assert roster.snapshot_path == first and roster.version == 2
+        assert not frame["probability"].to_numpy().flags.writeable  # scores reused, not recomputed
+
+        assert roster.get(seeded_db) is frame and roster.version == 2
+        export_snapshot(seeded_db, directory=tmp_path)
+        roster.get(seeded_db)
+        assert roster.version == 3
+
+    def test_analytics_on_snapshot(self, seeded_db, tmp_path):
+        """Test aggregates and simulations on a mapped (categorical) roster."""
+        export_snapshot(seeded_db, directory=tmp_path)
+        roster = Roster(source="snapshot", snapshot_dir=tmp_path)
+        frame = roster.get(seeded_db)
+        from_db = Roster(source="db").get(seeded_db)
+
+        everyone = np.ones(len(frame), dtype=bool)
+        assert risk_aggregates(frame, "poste", everyone) == risk_aggregates(from_db, "poste", everyone)
+
+        scenario = {"filter": [{"feature": "departement", "op": "eq", "value": "Consulting"}],
+                    "actions": [{"feature": "heure_supplementaires", "op": "set", "value": "Non"}]}
+        result = Simulator().run(frame, roster.version, scenario, get_model())
+        expected = Simulator().run(from_db, 1, scenario, get_model())
+        assert result["after"] == expected["after"]
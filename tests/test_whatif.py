@@ -0,0 +1,80 @@
+"""
+Tests for what-if grid evaluation
+"""
+
+import pytest
+
+from app.feature_engineering import feature_engineer
+from app.model import get_model
+from app.whatif import axis_values, build_grid, sweep
+
+
+class TestAxisValues:
+    """Tests for swept value resolution."""
+
+    def test_categorical_defaults_to_all_categories(self):
+        """Test that a categorical axis without values uses training categories."""
+        model = get_model()
+        values = axis_values("heure_supplementaires", None, None, None, 10, model.categories)
+        assert sorted(values) == ["Non", "Oui"]
+
+    def test_integer_range_rounded(self):
+        """Test that integer fields are rounded and deduplicated."""
+        values = axis_values("satisfaction_employee_equipe", None, 1, 4, 7, get_model().categories)
+        assert values == [1.0, 2.0, 3.0, 4.0]
+
+    def test_out_of_bounds_rejected(self):
+        """Test that values outside EmployeeInput constraints are rejected."""
+        with pytest.raises(ValueError):
+            axis_values("satisfaction_employee_equipe", [0, 3], None, None, 10, get_model().categories)
+
+    def test_unknown_category_rejected(self):
+        """Test that explicit categories must exist in the training data."""
+        categories = get_model().categories
+        assert axis_values("heure_supplementaires", ["Oui"], None, None, 10, categories) == ["Oui"]
+        with pytest.raises(ValueError, match="unknown categories"):
+            axis_values("heure_supplementaires", ["Oui", "Peut-etre"], None, None, 10, categories)
+
+    def test_empty_values_rejected(self):
+        """Test that an empty explicit list is rejected for both kinds of axis."""
+        for feature in ("heure_supplementaires", "age"):
+            with pytest.raises(ValueError, match="must not be empty"):
+                axis_values(feature, [], None, None, 10, get_model().categories)
+
+    def test_engineered_feature_rejected(self):
+        """Test that engineered features cannot be swept directly."""
+        with pytest.raises(ValueError):
+            axis_values("satisfaction_globale", [1, 2], None, None, 10, get_model().categories)
+
+
+class TestSweep:
+    """Tests for grid construction and scoring."""
+
+    def test_grid_matches_single_predictions(self, sample_employee_data):
+        """Test that every grid point equals a single prediction of the same input."""
+        model = get_model()
+        axes = [
+            {"feature": "revenu_mensuel", "values": [2000.0, 5000.0, 9000.0]},
+            {"feature": "heure_supplementaires", "values": ["Non", "Oui"]},
+        ]
+        surface = sweep(model, sample_employee_data, axes)
+
+        assert surface["shape"] == [3, 2]
+        for i, revenu in enumerate(axes[0]["values"]):
+            for j, overtime in enumerate(axes[1]["values"]):
+                data = dict(sample_employee_data, revenu_mensuel=revenu, heure_supplementaires=overtime)
+                expected = model.predict(feature_engineer.engineer_features(data))["probability"]
+                assert surface["probabilities"][i][j] == pytest.approx(expected, abs=1e-4)
+
+    def test_engineered_features_recomputed(self, sample_employee_data):
+        """Test that dependent engineered features follow the swept input."""
+        grid = build_grid(sample_employee_data, [{"feature": "revenu_mensuel", "values": [1100.0, 2200.0]}])
+        assert grid["salaire_par_experience"].tolist() == [100.0, 200.0]
+
+    def test_grid_size_limited(self, sample_employee_data, monkeypatch):
+        """Test that oversized grids are rejected."""
+        from app import whatif
+        monkeypatch.setattr(whatif, "WHATIF_MAX_POINTS", 10)
+        axes = [{"feature": "age", "values": [float(a) for a in range(20, 40)]}]
+        with pytest.raises(ValueError):
+            sweep(get_model(), sample_employee_data, axes)